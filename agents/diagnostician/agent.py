@@ -1,68 +1,101 @@
+import asyncio
 import json
-from typing import Dict, List, Any
+import logging
+import time
+from typing import Awaitable, Dict, List, Any, Tuple
 import google.generativeai as genai
 import sys
 import os
-import re
 
 # Use existing project infrastructure
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from app.services.rag_engine import retrieve_context
-
-async def analyze_logs(ticket_id: str, error_keywords: List[str]) -> Dict:
-    """Search logs for error patterns"""
-    # Mock log analysis - in production query logging service
-    logs = [
-        f"2026-01-31 Error: SSLHandshakeError for ticket {ticket_id}",
-        f"2026-01-31 Warning: Rate limit approaching for merchant",
-        f"2026-01-31 Info: Migration stage 2 initiated"
-    ]
-    # Simple keyword match
-    relevant = [log for log in logs if any(kw in log for kw in error_keywords)]
-    return {"logs_found": len(relevant), "relevant_logs": relevant[:3]}
+from app.services.rag_engine import retrieve_context, get_corpus
+from app.services.diagnosis_cache import get_diagnosis_cache
+from app.core.config import get_settings
+from app.core.instrumentation import record_cache, record_fallback
+from app.core.llm import aembed_text, token_usage
+from app.services.context_packer import ContextPacker, Evidence, clip_to_tokens, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+async def analyze_logs(ticket_id: str, error_keywords: List[str], ticket_text: str = "") -> Dict:
+    """Search indexed logs from the lookback window for error lines matching the ticket"""
+    from app.services.log_index import ensure_log_index
+
+    index = await ensure_log_index()
+    end = time.time()
+    start = end - get_settings().LOG_LOOKBACK_H * 3600
+    return index.search([*error_keywords, ticket_text], start=start, end=end, limit=8)
 
 async def check_patterns(error_signature: str) -> Dict:
     """Check pattern library for similar issues"""
-    # Inline import
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-    from app.core.database import SessionLocal
-    
-    db = SessionLocal()
-    try:
-        # Simple regex matching for hackathon
-        patterns = [
-            {
-                "id": "pat_001",
-                "signature": "SSL.*webhook",
-                "solution": "Renew SSL certificate for webhook endpoint",
-                "success_rate": 0.94
-            },
-            {
-                "id": "pat_002", 
-                "signature": "checkout.*500",
-                "solution": "Check payment processor configuration",
-                "success_rate": 0.89
-            },
-            {
-                "id": "pat_003",
-                "signature": "api.*401",
-                "solution": "Rotate API keys",
-                "success_rate": 0.92
-            }
-        ]
-        
-        matches = []
-        for p in patterns:
-            if re.search(p["signature"], error_signature, re.IGNORECASE):
-                matches.append(p)
-        
-        return {
-            "matches_found": len(matches),
-            "top_match": matches[0] if matches else None,
-            "all_matches": matches
-        }
-    finally:
-        db.close()
+    from app.services.pattern_engine import get_pattern_engine
+
+    engine = get_pattern_engine()
+    await engine.ensure_loaded()
+    matches = [p.as_match() for p in engine.match(error_signature)]
+
+    return {
+        "matches_found": len(matches),
+        "top_match": matches[0] if matches else None,
+        "all_matches": matches
+    }
+
+# Stand-ins used when a source fails or misses its deadline
+EMPTY_EVIDENCE = {
+    "docs": [],
+    "logs": {"logs_found": 0, "relevant_logs": []},
+    "patterns": {"matches_found": 0, "top_match": None, "all_matches": []},
+}
+
+async def gather_evidence(sources: Dict[str, Awaitable], budgets_ms: Dict[str, float]) -> Tuple[Dict[str, Any], Dict]:
+    """
+    Run independent evidence sources concurrently, each under its own deadline.
+    A source that fails or runs over budget is dropped (its EMPTY_EVIDENCE
+    stand-in is used) and noted in the report alongside per-source timings.
+    """
+    async def run(name: str, source: Awaitable):
+        start = time.perf_counter()
+        try:
+            value = await asyncio.wait_for(source, timeout=budgets_ms[name] / 1000)
+            status, note = "ok", None
+        except asyncio.TimeoutError:
+            value, status = EMPTY_EVIDENCE[name], "timeout"
+            note = f"{name} dropped: exceeded {budgets_ms[name]:.0f}ms budget"
+        except Exception as e:
+            logger.warning(f"Evidence source {name} failed: {e}")
+            value, status = EMPTY_EVIDENCE[name], "error"
+            note = f"{name} dropped: {type(e).__name__}"
+        return name, value, status, note, round((time.perf_counter() - start) * 1000, 1)
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(run(name, source) for name, source in sources.items()))
+
+    evidence = {name: value for name, value, *_ in outcomes}
+    report = {
+        "sources": {name: {"status": status, "ms": ms} for name, _, status, _, ms in outcomes},
+        "notes": [note for *_, note, _ in outcomes if note],
+        "total_ms": round((time.perf_counter() - start) * 1000, 1)
+    }
+    return evidence, report
+
+def evidence_items(evidence: Dict[str, Any]) -> List[Evidence]:
+    """Flatten gathered evidence into scored items for the context packer."""
+    items = [Evidence("docs", r["content"], r.get("score", 0.0), label=r.get("id")) for r in evidence["docs"]]
+    # Log lines arrive best first
+    logs = evidence["logs"]["relevant_logs"]
+    items += [Evidence("logs", line, len(logs) - i) for i, line in enumerate(logs) if line]
+    items += [
+        Evidence("patterns", f"{m['signature']}: {m['solution'] or 'no known fix'} (success rate {m['success_rate']:.0%})",
+                 m["success_rate"])
+        for m in evidence["patterns"]["all_matches"]
+    ]
+    return items
+
+def _corpus_version():
+    """Docs corpus the evidence came from; None for the pgvector backend, which has no in-process snapshot."""
+    corpus = get_corpus()
+    return corpus.version if corpus else None
 
 class DiagnosticianAgent:
     def __init__(self, **kwargs):
@@ -71,43 +104,80 @@ class DiagnosticianAgent:
         
         # Use existing project infrastructure
         sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-        from app.core.llm import get_model
+        from app.core.llm import get_llm_gateway
         
-        try:
-            self.model = get_model("gemini-2.0-flash-001")
-        except:
-            self.model = get_model("gemini-1.5-flash") # Fallback
+        self.llm = get_llm_gateway()
+        self.model_name = "gemini-2.0-flash-001"
+
+        settings = get_settings()
+        self.evidence_budgets_ms = {
+            "docs": settings.DIAG_DOCS_BUDGET_MS,
+            "logs": settings.DIAG_LOGS_BUDGET_MS,
+            "patterns": settings.DIAG_PATTERNS_BUDGET_MS,
+        }
+        self.cache = get_diagnosis_cache()
+        # Evidence shares one token budget; patterns are short and the most specific signal
+        self.packer = ContextPacker(
+            budget_tokens=settings.DIAG_CONTEXT_TOKEN_BUDGET,
+            weights={"patterns": 1.2, "docs": 1.0, "logs": 0.9}
+        )
+        self.ticket_max_tokens = settings.DIAG_TICKET_MAX_TOKENS
         
     async def diagnose(self, ticket_text: str, classification: str, merchant_context: Dict) -> Dict:
         """
         Generate 3 hypotheses with evidence
-        Returns structured reasoning chain
+        Returns structured reasoning chain, reused from a similar recent ticket when cached
         """
+        probe = await self._cache_probe(ticket_text, classification, merchant_context)
+        if probe is not None:
+            cached = self.cache.get(*probe, corpus_version=_corpus_version())
+            record_cache("diagnostician", "diagnosis", hit=cached is not None)
+            if cached is not None:
+                logger.info(f"Diagnosis cache hit ({cached['cache']['similarity']} similarity) for {classification}")
+                return cached
+        return await self.diagnose_with_llm(ticket_text, classification, merchant_context, probe=probe)
+
+    async def _cache_probe(self, ticket_text: str, classification: str, merchant_context: Dict):
+        """(embedding, scope) for the diagnosis cache, or None if caching is off or the embed fails."""
+        if self.cache is None:
+            return None
         try:
-            # Inline import removed, assuming top-level works now
-            
-            # 1. Gather Evidence
-            try:
-                rag_results = await retrieve_context(ticket_text, top_k=3)
-            except Exception as e:
-                # Log usage but continue
-                rag_results = []
+            vector = await asyncio.wait_for(aembed_text(ticket_text, call_site="diagnosis_cache"), timeout=self.evidence_budgets_ms["docs"] / 1000)
+        except Exception as e:
+            logger.warning(f"Diagnosis cache skipped, could not embed ticket: {type(e).__name__}")
+            return None
+        return vector, (classification, str(merchant_context.get("tier", "")))
 
-            log_results = await analyze_logs(ticket_id="temp", error_keywords=[classification, "error", "fail"])
-            pattern_results = await check_patterns(ticket_text)
+    async def diagnose_with_llm(self, ticket_text: str, classification: str, merchant_context: Dict,
+                                probe=None) -> Dict:
+        """Full diagnosis (evidence + Gemini); successful results are cached under `probe`."""
+        started = time.perf_counter()
+        evidence_report = None
+        try:
+            # 1. Gather Evidence (sources are independent, so fan out)
+            evidence, evidence_report = await gather_evidence({
+                "docs": retrieve_context(ticket_text, top_k=5),
+                "logs": analyze_logs(ticket_id="temp", error_keywords=[classification, "error", "fail"], ticket_text=ticket_text),
+                "patterns": check_patterns(ticket_text),
+            }, self.evidence_budgets_ms)
+            packed = self.packer.pack(evidence_items(evidence))
             
             # 2. Construct Few-Shot Prompt for Gemini
             prompt = f"""
     You are a senior Site Reliability Engineer diagnosing an e-commerce platform issue.
             
-    TICKET: {ticket_text}
+    TICKET: {clip_to_tokens(ticket_text, self.ticket_max_tokens)}
     CLASSIFICATION: {classification}
     MERCHANT CONTEXT: {json.dumps(merchant_context)}
             
     EVIDENCE FROM SYSTEM:
-    - Documentation Retrieved: {json.dumps([r['content'][:200] for r in rag_results]) if rag_results else "None"}
-    - Recent Logs: {json.dumps(log_results['relevant_logs'])}
-    - Historical Patterns: {json.dumps(pattern_results['top_match'] if pattern_results['top_match'] else 'None')}
+    - Documentation Retrieved:
+{packed.render("docs", indent="      ")}
+    - Recent Logs:
+{packed.render("logs", indent="      ")}
+    - Historical Patterns:
+{packed.render("patterns", indent="      ")}
+    - Unavailable Sources: {"; ".join(evidence_report["notes"]) or "None"}
             
     Generate exactly 3 hypotheses for the root cause. Be specific and technical.
             
@@ -153,14 +223,18 @@ class DiagnosticianAgent:
             
             # 3. Call Gemini
             try:
-                response = self.model.generate_content(
+                llm_started = time.perf_counter()
+                response = await self.llm.generate(
                     prompt,
+                    model_name=self.model_name,
                     generation_config=genai.GenerationConfig(
                         temperature=0.2,
                         response_mime_type="application/json"
-                    )
+                    ),
+                    call_site="diagnostician"
                 )
                 
+                llm_ms = (time.perf_counter() - llm_started) * 1000
                 result = json.loads(response.text)
                 
                 # Validate structure
@@ -174,6 +248,16 @@ class DiagnosticianAgent:
                         # Normalize
                         for h in result["hypotheses"]:
                             h["confidence"] = round(h["confidence"] / total_conf, 2)
+                    result["evidence_gathering"] = evidence_report
+                    result["prompt_usage"] = {
+                        "estimated_tokens": estimate_tokens(prompt),
+                        **token_usage(response),
+                        "llm_ms": round(llm_ms, 1),
+                        "context": packed.report()
+                    }
+                    if probe is not None:
+                        cost_ms = (time.perf_counter() - started) * 1000
+                        self.cache.put(*probe, corpus_version=_corpus_version(), result=result, cost_ms=cost_ms)
                     return result
                 
             except Exception as e:
@@ -181,6 +265,7 @@ class DiagnosticianAgent:
                 
         except Exception as outer_e:
             # Fallback if anything fails - SANITIZED for Demo
+            record_fallback("diagnostician")
             return {
                 "hypotheses": [
                     {
@@ -206,5 +291,11 @@ class DiagnosticianAgent:
                     }
                 ],
                 "recommended_action": "Verify configuration against schema and rollback if necessary.",
+                "evidence_gathering": evidence_report,
                 # "error": str(outer_e) # HIDDEN FOR DEMO
             }
+
+def get_diagnostician() -> DiagnosticianAgent:
+    """Process-wide agent from the component registry, built on first use rather than at import."""
+    from app.core.registry import get_registry
+    return get_registry().get("diagnostician")
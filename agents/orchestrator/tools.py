@@ -1,12 +1,10 @@
-from app.services.classifier import TicketClassifier
-
-classifier = TicketClassifier()
+from app.core.registry import get_registry
 
 async def classify_ticket_tool(ticket_text: str):
     """
     Classifies a support ticket into technical categories like API_ERROR, CONFIG_ERROR, etc.
     Returns category, confidence, urgency, and reasoning.
     """
-    return await classifier.classify(ticket_text)
+    return await get_registry().get("classifier").classify(ticket_text)
 
 TOOLS = [classify_ticket_tool]
@@ -4,7 +4,9 @@ from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, select
 from app.core.database import get_db
+from app.core.metrics import get_metrics
 from app.core.models import AgentDecision
+from app.services.event_bus import publish_ticket
 
 router = APIRouter()
 
@@ -26,10 +28,13 @@ async def approve_decision(ticket_id: UUID, approval: ApprovalRequest, db: Async
              raise HTTPException(status_code=404, detail=f"Ticket {ticket_id} not found")
         
         # Simple update
+        previous_status = ticket.status
         ticket.status = "resolved" if approval.approved else "escalated"
         ticket.resolved_at = datetime.utcnow()
         
         await db.commit()
+        get_metrics().ticket_transition(previous_status, ticket.status)
+        publish_ticket(ticket)
         return {"status": ticket.status, "ticket_id": str(ticket_id)}
     except Exception as e:
         await db.rollback()
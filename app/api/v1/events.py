@@ -0,0 +1,47 @@
+from typing import Optional
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+from app.core.config import get_settings
+from app.services.event_bus import get_event_bus
+
+router = APIRouter()
+
+settings = get_settings()
+
+@router.get("/stream")
+async def stream_events(
+    last_event_id: Optional[str] = Query(None, description="Resume after this event (for clients that can't set the header)"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-Sent Events: {"type": "new_ticket" | "ticket_update", "payload": <ticket>},
+    {"type": "diagnosis", "payload": {"ticket_id", "diagnosis"}} and
+    {"type": "metrics", "payload": <changed /metrics fields>}.
+
+    A client that falls SSE_BUFFER_EVENTS behind is disconnected; on
+    reconnect with Last-Event-ID it gets the events it missed, or
+    {"type": "resync"} if they are no longer kept and it should refetch.
+    """
+    bus = get_event_bus()
+    subscriber = bus.subscribe(last_event_id_header or last_event_id)
+
+    async def frames():
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                batch = await subscriber.next_frames(settings.SSE_HEARTBEAT_S)
+                if subscriber.shed:
+                    break
+                if batch:
+                    yield b"".join(batch)
+                elif subscriber.closed:
+                    break
+                else:
+                    yield b": ping\n\n"  # keeps proxies from timing out an idle stream
+        finally:
+            bus.unsubscribe(subscriber)
+
+    return StreamingResponse(frames(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # nginx: don't buffer the stream
+    })
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from app.core.database import get_db
+from app.services.warmup import readiness
 
 router = APIRouter()
 
@@ -11,10 +12,16 @@ async def liveness_check():
 
 @router.get("/ready")
 async def readiness_check(response: Response, db: AsyncSession = Depends(get_db)):
+    warmup = readiness()
     try:
         # Try a simple query
         await db.execute(text("SELECT 1"))
-        return {"status": "ok", "database": "connected"}
+        database = "connected"
     except Exception as e:
         response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
-        return {"status": "error", "database": str(e)}
+        return {"status": "error", "database": str(e), "warmup": warmup}
+
+    if not warmup["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "warming", "database": database, "warmup": warmup}
+    return {"status": "ok", "database": database, "warmup": warmup}
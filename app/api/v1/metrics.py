@@ -1,108 +1,87 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, text
-from app.core.database import get_db
-from app.core.models import Ticket
+from fastapi import APIRouter, Request, Response
+from app.core.database import pool_stats
+from app.core.instrumentation import OPENMETRICS_CONTENT_TYPE, PROMETHEUS_CONTENT_TYPE, registry
+from app.core.metrics import get_metrics
+from app.services.classification_cache import get_classification_cache
+from app.services.diagnosis_service import diagnosis_stats
+from app.services.diagnosis_cache import get_diagnosis_cache
+from app.services.event_bus import get_event_bus
+from app.core.llm import get_llm_gateway
 import time
-import random
 
 router = APIRouter()
 
-# Track last API call time for latency display
-last_gemini_latency_ms = 0
-
 @router.get("/metrics")
-async def get_system_metrics(db: AsyncSession = Depends(get_db)):
+async def get_system_metrics():
     """
     Real-time system metrics for dashboard telemetry
-    Returns agent load, ticket processing rate, and LLM performance
+    Returns agent load, ticket processing rate, and LLM performance.
+    Served from in-memory counters (app.core.metrics), no table scans.
     """
-    global last_gemini_latency_ms
-    
-    try:
-        # Count tickets by status
-        result = await db.execute(
-            select(Ticket.status, func.count(Ticket.id))
-            .group_by(Ticket.status)
-        )
-        status_counts = dict(result.all())
-        
-        # Tickets in flight (excluding resolved/escalated)
-        queue_depth = (
-            status_counts.get('open', 0) + 
-            status_counts.get('analyzing', 0) + 
-            status_counts.get('diagnosed', 0)
-        )
-        
-        # Calculate tickets resolved in last minute (mock for now)
-        recent_result = await db.execute(
-            select(func.count(Ticket.id))
-            .where(Ticket.status == 'resolved')
-        )
-        total_resolved = recent_result.scalar() or 0
-        
-        # Tickets per minute (estimated based on queue activity)
-        tickets_per_min = min(queue_depth * 2, 25)  # Cap at realistic value
-        
-        # Agent activity (based on queue depth)
-        agents_active = 0
-        if queue_depth > 0:
-            agents_active = 1  # Orchestrator always active if queue exists
-        if queue_depth > 2:
-            agents_active = 2  # Diagnostician kicks in
-        if status_counts.get('awaiting_approval', 0) > 0:
-            agents_active = 3  # Healer waiting
-        
-        # Neural brain activity % (based on queue pressure)
-        # 0 tickets = 30%, 10 tickets = 90%, with realistic variation
-        base_activity = min(30 + (queue_depth * 6), 95)
-        neural_activity = base_activity + random.uniform(-3, 3)
-        neural_activity = max(30, min(neural_activity, 99))  # Clamp 30-99%
-        
-        # LLM latency (use last recorded or estimate based on load)
-        if last_gemini_latency_ms > 0:
-            llm_latency = last_gemini_latency_ms
-        else:
-            # Estimate: 600-1200ms for Gemini Flash, higher under load
-            llm_latency = random.randint(650, 900) + (queue_depth * 50)
-        
-        
-        # Count awaiting approval tickets (diagnosed tickets are waiting for healer/human)
-        awaiting_approval = status_counts.get('awaiting_approval', 0) + status_counts.get('diagnosed', 0)
-        
-        return {
-            "queue_depth": queue_depth,
-            "agents_active": agents_active,
-            "awaiting_approval": awaiting_approval,
-            "tickets_per_minute": tickets_per_min,
-            "llm_latency_ms": llm_latency,
-            "neural_activity_percent": round(neural_activity, 1),
-            "total_tickets": sum(status_counts.values()),
-            "resolved_count": status_counts.get('resolved', 0),
-            "open_count": status_counts.get('open', 0),
-            "analyzing_count": status_counts.get('analyzing', 0),
-            "awaiting_approval_count": awaiting_approval,
-            "timestamp": time.time()
-        }
-    
-    except Exception as e:
-        # Fallback to mock data if DB query fails
-        return {
-            "queue_depth": 5,
-            "agents_active": 2,
-            "tickets_per_minute": 12,
-            "llm_latency_ms": 850,
-            "neural_activity_percent": 88.4,
-            "total_tickets": 22,
-            "resolved_count": 8,
-            "open_count": 5,
-            "analyzing_count": 3,
-            "awaiting_approval_count": 1,
-            "timestamp": time.time(),
-            "error": str(e)
-        }
+    snapshot = get_metrics().snapshot()
+    status_counts = snapshot["status_counts"]
+    queue_depth = snapshot["queue_depth"]
+
+    # Agent activity (based on queue depth)
+    agents_active = 0
+    if queue_depth > 0:
+        agents_active = 1  # Orchestrator always active if queue exists
+    if queue_depth > 2:
+        agents_active = 2  # Diagnostician kicks in
+    if status_counts.get('awaiting_approval', 0) > 0:
+        agents_active = 3  # Healer waiting
+
+    # Neural brain activity %: share of LLM slots busy, or queue pressure, whichever is higher
+    llm = get_llm_gateway()
+    llm_busy = llm.in_flight() / llm.max_concurrency
+    neural_activity = 30 + 69 * max(llm_busy, min(queue_depth / 10, 1.0))
+
+    # Mean latency of real Gemini calls over the last few minutes (0 until the first call)
+    llm_latency = snapshot["llm_latency"]
+
+    # Count awaiting approval tickets (diagnosed tickets are waiting for healer/human)
+    awaiting_approval = status_counts.get('awaiting_approval', 0) + status_counts.get('diagnosed', 0)
 
-def set_gemini_latency(latency_ms: int):
-    """Called by LLM service to track API response times"""
-    global last_gemini_latency_ms
-    last_gemini_latency_ms = latency_ms
+    # LLM calls avoided by reusing classifications of duplicate tickets
+    classification_cache = get_classification_cache()
+    diagnosis_cache = get_diagnosis_cache()
+
+    return {
+        "queue_depth": queue_depth,
+        "agents_active": agents_active,
+        "awaiting_approval": awaiting_approval,
+        "tickets_per_minute": round(snapshot["created_per_minute"], 1),
+        "classified_per_minute": round(snapshot["classified_per_minute"], 1),
+        "resolved_per_minute": round(snapshot["resolved_per_minute"], 1),
+        "llm_latency_ms": round(llm_latency["avg_ms"] or 0),
+        "llm_latency_p95_ms": llm_latency["p95_ms"],
+        "llm_calls_window": llm_latency["count"],
+        "neural_activity_percent": round(neural_activity, 1),
+        "total_tickets": sum(status_counts.values()),
+        "resolved_count": status_counts.get('resolved', 0),
+        "open_count": status_counts.get('open', 0),
+        "analyzing_count": status_counts.get('analyzing', 0),
+        "awaiting_approval_count": awaiting_approval,
+        "counts_reconciled_at": snapshot["last_reconciled"],
+        "classification_cache": classification_cache.stats() if classification_cache else None,
+        "diagnoses": diagnosis_stats(),
+        "diagnosis_cache": diagnosis_cache.stats() if diagnosis_cache else None,
+        "llm_usage": llm.usage.stats(),
+        "db_pool": pool_stats(),
+        "live_updates": get_event_bus().stats(),
+        "timestamp": time.time()
+    }
+
+@router.get("/metrics/prometheus")
+async def get_prometheus_metrics(request: Request):
+    """
+    LLM call instrumentation (latency histograms, tokens, errors, fallbacks,
+    cache hits per call site and model) for Prometheus scraping.
+    Served as OpenMetrics, with ticket-id exemplars on the latency buckets,
+    when the scraper accepts it; plain Prometheus text otherwise.
+    """
+    openmetrics = "application/openmetrics-text" in request.headers.get("accept", "")
+    return Response(
+        content=registry.render(openmetrics=openmetrics),
+        media_type=OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE
+    )
@@ -1,13 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+import base64
+import logging
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query, Response, status
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from uuid import UUID
 from datetime import datetime
 from app.core.database import get_db
+from app.core.metrics import get_metrics
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.models import Ticket, AgentDecision
-from app.services.agent_runner import run_diagnostician
-from sqlalchemy import select, desc
+from app.services.event_bus import publish_ticket
+from app.services.intake_queue import get_intake_queue
+from app.services.intake_worker import process_ticket
+from sqlalchemy import select, desc, tuple_
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -25,6 +32,7 @@ class TicketResponse(BaseModel):
     merchant_id: Optional[UUID] = None
     priority: Optional[int] = 0
     confidence: Optional[float] = 0.0
+    classification_source: Optional[str] = None
     raw_text: Optional[str] = None
     merchantName: Optional[str] = "Merchant" # For UI
     merchantAvatar: Optional[str] = None
@@ -32,9 +40,9 @@ class TicketResponse(BaseModel):
     class Config:
         from_attributes = True
 
-@router.post("/", response_model=TicketResponse)
+@router.post("/", response_model=TicketResponse, status_code=status.HTTP_202_ACCEPTED)
 async def create_ticket(ticket: TicketCreate, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
-    # 1. Create Request ID / Ticket ID
+    # 1. Persist the ticket
     new_ticket = Ticket(
         merchant_id=ticket.merchant_id,
         raw_text=ticket.raw_text,
@@ -45,44 +53,89 @@ async def create_ticket(ticket: TicketCreate, background_tasks: BackgroundTasks,
     db.add(new_ticket)
     await db.commit()
     await db.refresh(new_ticket)
+    get_metrics().ticket_created(new_ticket.status)
+    publish_ticket(new_ticket, "new_ticket")
 
-    # 2. Run Classification
-    from app.services.classifier import TicketClassifier
-    classifier = TicketClassifier()
-    classification = await classifier.classify(ticket.raw_text)
-    
-    # Update Ticket
-    cat = classification.get("category")
-    new_ticket.classification = cat
-    new_ticket.classification_confidence = classification.get("confidence")
-    new_ticket.priority = classification.get("urgency")
-    await db.commit()
-    
-    with open("debug_tickets.log", "a") as f:
-        f.write(f"Ticket {new_ticket.id} Classified as {cat}\n")
-
-    # 3. Trigger Agent (Diagnostician) if technical issue
-    # For Demo speed: If "API_ERROR", "WEBHOOK", "CHECKOUT", run immediately.
-    if cat in ["API_ERROR", "WEBHOOK_FAIL", "CHECKOUT_BREAK", "CONFIG_ERROR"]:
-         with open("debug_tickets.log", "a") as f:
-            f.write(f"Triggering Diagnostician for {new_ticket.id}\n")
-         await run_diagnostician(new_ticket.id, cat)
-    else:
-         with open("debug_tickets.log", "a") as f:
-            f.write(f"Skipping Diagnostician for {cat}\n")
+    # 2. Hand off classification + diagnosis to the intake workers
+    try:
+        await get_intake_queue().enqueue(new_ticket.id)
+    except Exception as e:
+        # Queue unreachable: run the job in-process so the ticket isn't stranded
+        logger.error(f"Intake enqueue failed for {new_ticket.id}: {e}. Running in-process.")
+        background_tasks.add_task(process_ticket, new_ticket.id)
 
     return new_ticket
 
+# Columns of the "summary" view: everything the list needs, none of the large text bodies
+SUMMARY_COLUMNS = (
+    Ticket.id, Ticket.status, Ticket.classification, Ticket.created_at,
+    Ticket.merchant_id, Ticket.priority, Ticket.classification_confidence
+)
+
+def encode_cursor(created_at: datetime, ticket_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{ticket_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, ticket_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(ticket_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def ticket_page_query(limit: int, cursor: Optional[str] = None, skip: int = 0, view: str = "full",
+                      status_filter: Optional[str] = None, merchant_id: Optional[UUID] = None,
+                      classification: Optional[str] = None):
+    """
+    Newest-first page of tickets. With a cursor the page starts right after
+    the (created_at, id) it encodes, which the composite indexes serve
+    without scanning the skipped rows; `skip` is kept for old clients.
+    """
+    query = select(*SUMMARY_COLUMNS) if view == "summary" else select(Ticket)
+    if status_filter:
+        query = query.where(Ticket.status == status_filter)
+    if merchant_id:
+        query = query.where(Ticket.merchant_id == merchant_id)
+    if classification:
+        query = query.where(Ticket.classification == classification)
+    if cursor:
+        created_at, ticket_id = decode_cursor(cursor)
+        query = query.where(tuple_(Ticket.created_at, Ticket.id) < tuple_(created_at, ticket_id))
+    elif skip:
+        query = query.offset(skip)
+    return query.order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(limit)
+
 @router.get("/", response_model=List[TicketResponse])
 async def list_tickets(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    merchant_id: Optional[UUID] = None,
+    classification: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(select(Ticket).offset(skip).limit(limit).order_by(Ticket.created_at.desc()))
-    tickets = result.scalars().all()
-    # Map to schema if needed, but Pydantic should handle if fields match
-    return tickets
+    """
+    Tickets newest first. Pass the X-Next-Cursor response header back as
+    `cursor` for the next page (absent on the last page). view=summary
+    leaves out raw_text.
+    """
+    query = ticket_page_query(limit + 1, cursor, skip, view, status_filter, merchant_id, classification)
+    result = await db.execute(query)
+    rows = result.all() if view == "summary" else result.scalars().all()
+
+    # One extra row tells us whether another page exists
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+
+    if view == "summary":
+        return [{**row._mapping, "confidence": row.classification_confidence} for row in rows]
+    return rows
 
 @router.get("/{ticket_id}", response_model=TicketResponse)
 async def get_ticket(ticket_id: UUID, db: AsyncSession = Depends(get_db)):
@@ -114,6 +167,7 @@ async def get_ticket_diagnosis(ticket_id: UUID, db: AsyncSession = Depends(get_d
         "ticket_id": ticket_id,
         "classification": ticket.classification,
         "confidence": ticket.classification_confidence,
+        "classification_source": ticket.classification_source,
         "hypotheses": decision.reasoning_chain.get("hypotheses", []),
         "recommended_action": decision.reasoning_chain.get("recommended_action"),
         "root_cause": decision.reasoning_chain.get("root_cause"),
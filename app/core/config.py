@@ -9,6 +9,111 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     REDIS_URL: str
 
+    # Database engine: "pgbouncer" (transaction pooler, no statement caching) or "direct"
+    DB_PROFILE: str = "pgbouncer"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_S: float = 10.0  # wait for a free connection before failing the request
+    DB_POOL_RECYCLE_S: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 500  # prepared statements per connection ("direct" only)
+    DB_ECHO: bool = False
+
+    # Ticket intake pipeline
+    INTAKE_QUEUE_BACKEND: str = "redis"  # "redis" or "memory"
+    INTAKE_STREAM: str = "hermes:intake"
+    INTAKE_WORKERS: int = 4
+    INTAKE_CLAIM_IDLE_MS: int = 300_000  # re-deliver jobs left by crashed workers (and failed ones)
+    INTAKE_MAX_ATTEMPTS: int = 3  # then the ticket is marked "failed"
+    INTAKE_RETRY_DELAY_S: float = 5.0  # in-memory backend: wait before re-delivering a failed job
+    INTAKE_RECOVERY_STALE_S: float = 600.0  # in-memory backend: "analyzing" tickets untouched this long are re-enqueued at startup
+
+    # Startup: "background" (serve now, warm up in a task), "eager" or "lazy"
+    WARMUP_MODE: str = "background"
+    WARMUP_RETRY_INITIAL_S: float = 5.0  # backoff before re-warming a failed component, doubling
+    WARMUP_RETRY_MAX_S: float = 300.0
+
+    # LLM gateway
+    LLM_TIMEOUT_S: float = 30.0
+    LLM_MAX_CONCURRENCY: int = 8
+
+    # Classification cache (exact + near-duplicate reuse)
+    CLASSIFY_CACHE_ENABLED: bool = True
+    CLASSIFY_CACHE_TTL_S: float = 900
+    CLASSIFY_CACHE_MAX_ENTRIES: int = 5000
+    CLASSIFY_CACHE_SIMILARITY: float = 0.8  # Jaccard over character 4-grams
+
+    # Micro-batched classification (window 0 disables batching)
+    CLASSIFY_BATCH_WINDOW_MS: float = 50
+    CLASSIFY_BATCH_MAX: int = 16
+
+    # Local first-tier classifier (keyword rules + TF-IDF model)
+    LOCAL_CLASSIFIER_ENABLED: bool = True
+    LOCAL_CLASSIFIER_MODEL_PATH: str = "./data/models/ticket_classifier.joblib"
+    LOCAL_CLASSIFIER_MIN_CONFIDENCE: float = 0.85
+
+    # Diagnostician evidence sources run concurrently, each with its own deadline
+    DIAG_DOCS_BUDGET_MS: float = 1500
+    DIAG_LOGS_BUDGET_MS: float = 1000
+    DIAG_PATTERNS_BUDGET_MS: float = 500
+
+    # Diagnostician prompt size: evidence is deduped, ranked and packed into this many tokens
+    DIAG_CONTEXT_TOKEN_BUDGET: int = 1200
+    DIAG_TICKET_MAX_TOKENS: int = 500
+
+    # Diagnoses reused across similar tickets (same classification and merchant tier)
+    DIAG_CACHE_ENABLED: bool = True
+    DIAG_CACHE_TTL_S: float = 1800
+    DIAG_CACHE_MAX_ENTRIES: int = 2000
+    DIAG_CACHE_SIMILARITY: float = 0.92  # cosine over ticket embeddings
+
+    # Dashboard metrics: in-memory counters, corrected from the tickets table this often
+    METRICS_RECONCILE_INTERVAL_S: float = 60.0
+
+    # Live updates (SSE at /api/v1/events/stream)
+    SSE_BUFFER_EVENTS: int = 256  # per client; a client that falls this far behind is disconnected
+    SSE_REPLAY_EVENTS: int = 1000  # recent events kept for Last-Event-ID resume
+    SSE_HEARTBEAT_S: float = 15.0
+    SSE_METRICS_INTERVAL_S: float = 2.0  # metric deltas pushed at most this often
+    SSE_NOTIFY_ENABLED: bool = True  # fan events out to other API workers via Postgres LISTEN/NOTIFY
+    SSE_NOTIFY_CHANNEL: str = "hermes_events"
+    SSE_LISTEN_URL: str = ""  # direct Postgres URL for LISTEN (not through PgBouncer); defaults to DATABASE_URL
+
+    # Pattern library (patterns table) refresh and match-count flush interval
+    PATTERN_REFRESH_INTERVAL_S: float = 30.0
+    PATTERN_REFRESH_OVERLAP_S: float = 120.0  # re-read this far behind the watermark, for late commits
+
+    # Log analysis (local *.log / *.jsonl files, indexed by time bucket)
+    LOG_PATH: str = "./data/logs"
+    LOG_BUCKET_S: int = 300
+    LOG_RETENTION_H: float = 24
+    LOG_MAX_POSTINGS: int = 2000  # per token per bucket
+    LOG_LOOKBACK_H: float = 6  # window searched for a ticket
+    LOG_REFRESH_INTERVAL_S: float = 10.0
+
+    # Embeddings
+    EMBED_PROVIDER: str = "gemini"  # "gemini" or "fake" (offline, deterministic)
+    EMBEDDING_MODEL: str = "models/text-embedding-004"
+    EMBED_BATCH_SIZE: int = 100  # Gemini batchEmbedContents limit
+    EMBED_CONCURRENCY: int = 4
+    EMBED_MAX_RETRIES: int = 3
+    EMBED_TIMEOUT_S: float = 30.0
+    EMBEDDING_DIM: int = 768
+    EMBED_CACHE_ENABLED: bool = True
+    EMBED_CACHE_PATH: str = "./data/cache/embeddings"
+    EMBED_CACHE_MAX_MB: int = 256
+
+    # RAG retrieval
+    RAG_BACKEND: str = "memory"  # "memory" (per-process) or "pgvector" (shared table)
+    RAG_ANN_INDEX: str = "hnsw"  # "hnsw" or "ivfflat", used by scripts/build_doc_index.py
+    RAG_DENSE_TOP_K: int = 20  # Candidates per retriever before fusion
+    RAG_SPARSE_TOP_K: int = 20
+    RAG_RRF_K: int = 60
+    RAG_DENSE_BUDGET_MS: float = 800  # Past this, answer from BM25 alone
+    RAG_WATCH_DOCS: bool = False  # Re-ingest data/docs on change without a restart
+    RAG_WATCH_INTERVAL_S: float = 5.0
+    RAG_CHUNK_MAX_CHARS: int = 1500  # Longer sections are split, not truncated
+
     class Config:
         env_file = ".env"
 
@@ -1,15 +1,127 @@
 import logging
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, Optional
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.DATABASE_URL, 
-    echo=True, 
-    connect_args={"statement_cache_size": 0}
-)
+class PoolStats:
+    """Connection checkout counts and wait times, fed by InstrumentedPool."""
+
+    def __init__(self, recent: int = 1000):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.recent = deque(maxlen=recent)
+
+    def record(self, wait_ms: float):
+        self.checkouts += 1
+        self.wait_ms_total += wait_ms
+        self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+        self.recent.append(wait_ms)
+
+    def summary(self) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.wait_ms_total / self.checkouts, 3) if self.checkouts else 0.0,
+            "wait_ms_p95": round(recent[int(len(recent) * 0.95) - 1], 3) if len(recent) >= 20 else None,
+            "wait_ms_max": round(self.wait_ms_max, 3)
+        }
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """QueuePool that times how long each checkout waits for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        self.stats.record((time.perf_counter() - start) * 1000)
+        return connection
+
+def _unique_statement_name() -> str:
+    # PgBouncer in transaction mode may hand us a server connection that already
+    # holds another client's "__asyncpg_stmt_1__"; unique names never collide
+    return f"__asyncpg_{uuid.uuid4().hex}__"
+
+def engine_options(profile: Optional[str] = None) -> Dict[str, Any]:
+    """
+    create_async_engine keyword arguments for a DB_PROFILE:
+
+    - "pgbouncer": behind a transaction-mode pooler (e.g. Supabase :6543).
+      No prepared statement caching on either the asyncpg or the SQLAlchemy
+      side, and uniquely named statements, since consecutive transactions
+      can land on different server connections.
+    - "direct": straight to Postgres. asyncpg and SQLAlchemy cache prepared
+      statements per connection, so repeated queries skip parse/plan.
+    """
+    profile = profile or settings.DB_PROFILE
+    if profile == "pgbouncer":
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name
+        }
+    elif profile == "direct":
+        connect_args = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+        }
+    else:
+        raise ValueError(f"Unknown DB_PROFILE: {profile} (expected 'pgbouncer' or 'direct')")
+
+    return {
+        "echo": settings.DB_ECHO,
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_S,
+        "pool_recycle": settings.DB_POOL_RECYCLE_S,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args
+    }
+
+def build_engine(profile: Optional[str] = None, url: Optional[str] = None, **overrides) -> AsyncEngine:
+    options = {**engine_options(profile), **overrides}
+    return create_async_engine(url or settings.DATABASE_URL, **options)
+
+def pool_stats(target: Optional[AsyncEngine] = None) -> Dict[str, Any]:
+    """Pool occupancy plus checkout wait statistics for an engine (the app engine by default)."""
+    pool = (target or engine).pool
+    stats = {
+        "profile": settings.DB_PROFILE,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "idle": pool.checkedin()
+    }
+    if isinstance(pool, InstrumentedPool):
+        stats.update(pool.stats.summary())
+    return stats
+
+engine = build_engine()
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def get_db():
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional
+import numpy as np
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+DIGEST_BYTES = 16
+
+def _try_lock(f) -> bool:
+    """Non-blocking exclusive lock on an open file, held until the file is closed."""
+    try:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except ImportError:
+        import msvcrt
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+    except OSError:
+        return False
+    return True
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache on disk.
+
+    Keys are (model, task_type, sha256(text)). Vectors live in a fixed-capacity
+    memory-mapped float32 file (`<path>.f32`, one row per slot); `<path>.idx.json`
+    maps keys to slots in LRU order. When full, the least recently used slot
+    is reused.
+
+    Each slot also records a digest of the key it holds (`<path>.keys`), and
+    get() checks it, so an index that is older than the vectors (the index
+    is only rewritten every `flush_every` puts, and a crash can come in
+    between) yields a miss rather than another key's vector.
+
+    The caller must hold the path exclusively (see open_embedding_cache).
+    """
+
+    def __init__(self, path: str, dim: int = 768, capacity: int = 100_000, flush_every: int = 256):
+        self.data_path = f"{path}.f32"
+        self.keys_path = f"{path}.keys"
+        self.index_path = f"{path}.idx.json"
+        self.dim = dim
+        self.capacity = capacity
+        self.flush_every = flush_every
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._slots: "OrderedDict[str, int]" = OrderedDict()  # key -> slot, oldest first
+        self._dirty = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._open()
+
+    @staticmethod
+    def key(model: str, task_type: str, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model}|{task_type}|{digest}"
+
+    @staticmethod
+    def _digest(key: str) -> np.ndarray:
+        return np.frombuffer(hashlib.sha256(key.encode("utf-8")).digest()[:DIGEST_BYTES], dtype=np.uint8)
+
+    def _open(self):
+        index = None
+        if all(os.path.exists(p) for p in (self.index_path, self.data_path, self.keys_path)):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                if (index.get("version") != FORMAT_VERSION or index.get("dim") != self.dim
+                        or index.get("capacity") != self.capacity):
+                    logger.info("Embedding cache format or shape changed; starting empty.")
+                    index = None
+            except Exception as e:
+                logger.warning(f"Embedding cache index unreadable ({e}); starting empty.")
+                index = None
+
+        mode = "r+" if index is not None else "w+"
+        self._matrix = np.memmap(self.data_path, dtype=np.float32, mode=mode, shape=(self.capacity, self.dim))
+        self._keys = np.memmap(self.keys_path, dtype=np.uint8, mode=mode, shape=(self.capacity, DIGEST_BYTES))
+
+        if index is not None:
+            self._slots = OrderedDict((k, int(slot)) for k, slot in index["entries"])
+        used = set(self._slots.values())
+        self._free = [slot for slot in range(self.capacity - 1, -1, -1) if slot not in used]
+
+    def __len__(self):
+        return len(self._slots)
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None and not np.array_equal(self._keys[slot], self._digest(key)):
+                # Slot was reused for another key after the index was last written
+                del self._slots[key]
+                slot = None
+            if slot is None:
+                self.misses += 1
+                return None
+            self._slots.move_to_end(key)
+            self.hits += 1
+            return self._matrix[slot].tolist()
+
+    def put(self, key: str, vector: List[float]):
+        if vector is None or len(vector) != self.dim:
+            return
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                if self._free:
+                    slot = self._free.pop()
+                else:
+                    _, slot = self._slots.popitem(last=False)
+                    self.evictions += 1
+            # Invalidate, write, then stamp: a slot is never left labelled with the wrong key
+            self._keys[slot] = 0
+            self._matrix[slot] = vector
+            self._keys[slot] = self._digest(key)
+            self._slots[key] = slot
+            self._slots.move_to_end(key)
+            self._dirty += 1
+            should_flush = self._dirty >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """Persist vectors, then atomically replace the index."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._matrix.flush()
+            self._keys.flush()
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": FORMAT_VERSION,
+                    "dim": self.dim,
+                    "capacity": self.capacity,
+                    "entries": list(self._slots.items())
+                }, f)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = 0
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._slots),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+def open_embedding_cache(path: str, max_processes: int = 8, **kwargs) -> Optional[EmbeddingCache]:
+    """
+    Open a cache this process alone writes to. Each process locks the first
+    free one of `path`, `path.1`, ... `path.<max_processes - 1>`, so several
+    API workers (or the app plus a script) each get their own files, and a
+    restarted worker picks a warm one back up. None if all are taken.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    for i in range(max_processes):
+        candidate = path if i == 0 else f"{path}.{i}"
+        lock = open(f"{candidate}.lock", "a+")
+        if not _try_lock(lock):
+            lock.close()
+            continue
+        try:
+            cache = EmbeddingCache(candidate, **kwargs)
+        except Exception:
+            lock.close()
+            raise
+        cache._lock_file = lock  # released when the process exits
+        return cache
+    logger.warning(f"Embedding cache disabled: all {max_processes} cache files under {path} are in use")
+    return None
+
+@lru_cache()
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Process-wide cache, or None when disabled or the path is unusable."""
+    settings = get_settings()
+    if not settings.EMBED_CACHE_ENABLED:
+        return None
+    capacity = max(1, settings.EMBED_CACHE_MAX_MB * 1024 * 1024 // (settings.EMBEDDING_DIM * 4))
+    try:
+        return open_embedding_cache(settings.EMBED_CACHE_PATH, dim=settings.EMBEDDING_DIM, capacity=capacity)
+    except Exception as e:
+        logger.warning(f"Embedding cache disabled: {e}")
+        return None
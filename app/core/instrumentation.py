@@ -0,0 +1,190 @@
+import bisect
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Ticket being worked on by the current task; attached to LLM latency samples as an exemplar.
+# asyncio tasks copy the context when created, so tasks spawned while handling a ticket inherit it.
+current_ticket_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_ticket_id", default=None)
+
+@contextmanager
+def ticket_context(ticket_id) -> Iterator[None]:
+    token = current_ticket_id.set(str(ticket_id) if ticket_id is not None else None)
+    try:
+        yield
+    finally:
+        current_ticket_id.reset(token)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+class Counter:
+    """Monotonic counter per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def samples(self, openmetrics: bool) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}_total{_labels(self.labelnames, key)} {_number(value)}" for key, value in values]
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "exemplars")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.exemplars: List[Optional[Tuple[str, float, float]]] = [None] * buckets  # (ticket_id, value, timestamp)
+
+class Histogram:
+    """
+    Cumulative-bucket histogram per label combination. Each bucket keeps the
+    most recent observation that carried a ticket id as its exemplar.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32)):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, exemplar: Optional[str] = None, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            series.counts[i] += 1
+            series.sum += value
+            if exemplar:
+                series.exemplars[i] = (exemplar, value, time.time())
+
+    def samples(self, openmetrics: bool) -> List[str]:
+        lines = []
+        with self._lock:
+            series = sorted((key, list(s.counts), s.sum, list(s.exemplars)) for key, s in self._series.items())
+        for key, counts, total, exemplars in series:
+            cumulative = 0
+            for bound, count, exemplar in zip(self.buckets, counts, exemplars):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                line = f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+                if openmetrics and exemplar is not None:
+                    ticket_id, value, stamp = exemplar
+                    line += f' # {{ticket_id="{_escape(ticket_id)}"}} {value:.6g} {stamp:.3f}'
+                lines.append(line)
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total:.6g}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """Metric families exported together in Prometheus text or OpenMetrics format."""
+
+    def __init__(self):
+        self.metrics: List = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self, openmetrics: bool = False) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples(openmetrics))
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+registry = MetricsRegistry()
+
+LLM_LATENCY = registry.register(Histogram(
+    "hermes_llm_request_duration_seconds",
+    "Gemini call latency (slot wait excluded), by operation, call site and model.",
+    ("op", "call_site", "model")
+))
+LLM_REQUESTS = registry.register(Counter(
+    "hermes_llm_requests",
+    "Gemini calls by operation, call site, model and outcome (ok, error, timeout).",
+    ("op", "call_site", "model", "outcome")
+))
+LLM_TOKENS = registry.register(Counter(
+    "hermes_llm_tokens",
+    "Tokens reported by Gemini generate calls, by call site, model and direction (prompt, output).",
+    ("call_site", "model", "direction")
+))
+LLM_EMBEDDED_TEXTS = registry.register(Counter(
+    "hermes_llm_embedded_texts",
+    "Texts sent to the embedding model, by call site and model.",
+    ("call_site", "model")
+))
+LLM_FALLBACKS = registry.register(Counter(
+    "hermes_llm_fallbacks",
+    "Answers produced without the model (rule-based or canned) after a failed call, by call site.",
+    ("call_site",)
+))
+LLM_CACHE = registry.register(Counter(
+    "hermes_llm_cache_lookups",
+    "Cache lookups in front of model calls, by call site, cache and result (hit, miss).",
+    ("call_site", "cache", "result")
+))
+
+def record_llm_call(op: str, call_site: str, model: str, seconds: float, outcome: str = "ok",
+                    prompt_tokens: Optional[int] = None, output_tokens: Optional[int] = None,
+                    texts: int = 0):
+    """One finished generate or embed call; latency is exemplar-tagged with the current ticket."""
+    LLM_REQUESTS.inc(op=op, call_site=call_site, model=model, outcome=outcome)
+    LLM_LATENCY.observe(seconds, exemplar=current_ticket_id.get(), op=op, call_site=call_site, model=model)
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, call_site=call_site, model=model, direction="prompt")
+    if output_tokens:
+        LLM_TOKENS.inc(output_tokens, call_site=call_site, model=model, direction="output")
+    if texts:
+        LLM_EMBEDDED_TEXTS.inc(texts, call_site=call_site, model=model)
+
+def record_fallback(call_site: str, count: int = 1):
+    LLM_FALLBACKS.inc(count, call_site=call_site)
+
+def record_cache(call_site: str, cache: str, hit: bool, count: int = 1):
+    if count:
+        LLM_CACHE.inc(count, call_site=call_site, cache=cache, result="hit" if hit else "miss")
@@ -1,7 +1,20 @@
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from collections import deque
 import google.generativeai as genai
+import numpy as np
+from typing import Dict, List, Optional
 from app.core.config import get_settings
+from app.core.embedding_cache import EmbeddingCache, get_embedding_cache
+from app.core.instrumentation import record_cache, record_llm_call
+from app.core.metrics import get_metrics
 from functools import lru_cache
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
 @lru_cache()
@@ -9,17 +22,278 @@ def configure_genai():
     """Configures the Gemini API client once."""
     genai.configure(api_key=settings.GEMINI_API_KEY)
 
-def get_model(model_name: str = "gemini-2.0-flash-001"):
+DEFAULT_MODEL = "gemini-2.0-flash-001"
+
+def get_model(model_name: str = DEFAULT_MODEL):
     """Returns a configured GenerativeModel instance."""
     configure_genai()
     return genai.GenerativeModel(model_name)
 
-def embed_text(text: str, model: str = "models/text-embedding-004"):
-    """Embeds text using the specified model."""
-    configure_genai()
-    result = genai.embed_content(
-        model=model,
-        content=text,
-        task_type="retrieval_document"
+class EmbeddingProvider:
+    """Embeds a batch of texts in one call."""
+    model_name: str = ""
+
+    async def embed_batch(self, texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+        raise NotImplementedError
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    """Gemini batchEmbedContents: one request per batch of texts."""
+
+    def __init__(self, model_name: str = "models/text-embedding-004", timeout: float = 30.0):
+        self.model_name = model_name
+        self.timeout = timeout
+
+    async def embed_batch(self, texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+        configure_genai()
+        result = await genai.embed_content_async(
+            model=self.model_name,
+            content=texts,
+            task_type=task_type,
+            request_options={"timeout": self.timeout}
+        )
+        return result['embedding']
+
+class FakeEmbeddingProvider(EmbeddingProvider):
+    """
+    Offline stand-in with a simulated round-trip.
+    Vectors are deterministic per text, so results are stable across runs.
+    """
+
+    def __init__(self, dim: int = 768, latency_s: float = 0.05, per_item_s: float = 0.0005,
+                 model_name: str = "fake-embedding"):
+        self.dim = dim
+        self.latency_s = latency_s
+        self.per_item_s = per_item_s
+        self.model_name = model_name
+        self.calls = 0
+
+    async def embed_batch(self, texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+        self.calls += 1
+        await asyncio.sleep(self.latency_s + self.per_item_s * len(texts))
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            vectors.append(np.random.default_rng(seed).standard_normal(self.dim).tolist())
+        return vectors
+
+@lru_cache()
+def get_embedding_provider() -> EmbeddingProvider:
+    if settings.EMBED_PROVIDER == "fake":
+        return FakeEmbeddingProvider()
+    return GeminiEmbeddingProvider(settings.EMBEDDING_MODEL, timeout=settings.EMBED_TIMEOUT_S)
+
+class LLMTimeoutError(asyncio.TimeoutError):
+    pass
+
+def token_usage(response) -> Dict[str, Optional[int]]:
+    """prompt/output token counts from a GenerateContentResponse (None when not reported)."""
+    usage = getattr(response, "usage_metadata", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_token_count", None),
+        "output_tokens": getattr(usage, "candidates_token_count", None)
+    }
+
+class UsageLog:
+    """
+    Per-model totals of generate calls plus the most recent calls
+    (prompt tokens, output tokens, latency), for tracking cost and latency
+    against prompt size.
+    """
+
+    def __init__(self, recent: int = 200):
+        self.totals: Dict[str, Dict[str, float]] = {}
+        self.recent = deque(maxlen=recent)
+
+    def record(self, model_name: str, prompt_tokens: Optional[int], output_tokens: Optional[int], latency_ms: float):
+        totals = self.totals.setdefault(model_name, {"calls": 0, "prompt_tokens": 0, "output_tokens": 0, "latency_ms": 0.0})
+        totals["calls"] += 1
+        totals["prompt_tokens"] += prompt_tokens or 0
+        totals["output_tokens"] += output_tokens or 0
+        totals["latency_ms"] += latency_ms
+        self.recent.append({
+            "model": model_name,
+            "prompt_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "latency_ms": round(latency_ms, 1)
+        })
+
+    def stats(self) -> Dict:
+        return {
+            model: {
+                "calls": t["calls"],
+                "prompt_tokens": t["prompt_tokens"],
+                "output_tokens": t["output_tokens"],
+                "avg_prompt_tokens": round(t["prompt_tokens"] / t["calls"], 1),
+                "avg_latency_ms": round(t["latency_ms"] / t["calls"], 1)
+            }
+            for model, t in self.totals.items()
+        }
+
+class LLMGateway:
+    """
+    Single async entry point for Gemini generate and embed calls.
+    Native async client calls, a per-call timeout (the awaiting task is
+    cancelled on expiry) and bounded concurrency per call type.
+    Cancelling the caller cancels the in-flight request.
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_embed_concurrency: int = 8,
+                 timeout_s: float = 30.0):
+        self.timeout_s = timeout_s
+        self.max_concurrency = max_concurrency
+        self._generate_slots = asyncio.Semaphore(max_concurrency)
+        self._embed_slots = asyncio.Semaphore(max_embed_concurrency)
+        self._models = {}
+        self.usage = UsageLog()
+
+    def in_flight(self) -> int:
+        """Generate calls currently holding a slot."""
+        return self.max_concurrency - self._generate_slots._value
+
+    def model(self, model_name: str = DEFAULT_MODEL):
+        if model_name not in self._models:
+            self._models[model_name] = get_model(model_name)
+        return self._models[model_name]
+
+    async def generate(self, prompt: str, model_name: str = DEFAULT_MODEL,
+                       generation_config=None, timeout: Optional[float] = None,
+                       call_site: str = "other"):
+        """
+        Returns the GenerateContentResponse. Raises asyncio.TimeoutError past the deadline.
+        Token counts and latency of each successful call are recorded in `usage`;
+        every call (failed ones too) is recorded per `call_site` in app.core.instrumentation.
+        """
+        timeout = timeout or self.timeout_s
+        model = self.model(model_name)
+        async with self._generate_slots:
+            start = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    model.generate_content_async(
+                        prompt,
+                        generation_config=generation_config,
+                        request_options={"timeout": timeout}
+                    ),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                record_llm_call("generate", call_site, model_name, time.perf_counter() - start, outcome="timeout")
+                raise LLMTimeoutError(f"{model_name} generate exceeded {timeout}s")
+            except Exception:
+                record_llm_call("generate", call_site, model_name, time.perf_counter() - start, outcome="error")
+                raise
+        latency_ms = (time.perf_counter() - start) * 1000
+        tokens = token_usage(response)
+        self.usage.record(model_name, tokens["prompt_tokens"], tokens["output_tokens"], latency_ms)
+        record_llm_call("generate", call_site, model_name, latency_ms / 1000, **tokens)
+        get_metrics().llm_call(latency_ms)
+        return response
+
+    async def embed(self, texts: List[str], task_type: str = "retrieval_document",
+                    provider: Optional[EmbeddingProvider] = None,
+                    timeout: Optional[float] = None, call_site: str = "other") -> List[List[float]]:
+        provider = provider or get_embedding_provider()
+        timeout = timeout or self.timeout_s
+        async with self._embed_slots:
+            start = time.perf_counter()
+            try:
+                vectors = await asyncio.wait_for(provider.embed_batch(texts, task_type=task_type), timeout)
+            except asyncio.TimeoutError:
+                record_llm_call("embed", call_site, provider.model_name, time.perf_counter() - start,
+                                outcome="timeout", texts=len(texts))
+                raise LLMTimeoutError(f"{provider.model_name} embed exceeded {timeout}s")
+            except Exception:
+                record_llm_call("embed", call_site, provider.model_name, time.perf_counter() - start,
+                                outcome="error", texts=len(texts))
+                raise
+        record_llm_call("embed", call_site, provider.model_name, time.perf_counter() - start, texts=len(texts))
+        return vectors
+
+@lru_cache()
+def get_llm_gateway() -> LLMGateway:
+    return LLMGateway(
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        max_embed_concurrency=settings.EMBED_CONCURRENCY,
+        timeout_s=settings.LLM_TIMEOUT_S
     )
-    return result['embedding']
+
+async def aembed_text(text: str, task_type: str = "retrieval_document", call_site: str = "other") -> List[float]:
+    """Embeds a single text with the configured provider. Raises on failure."""
+    provider = get_embedding_provider()
+    cache = get_embedding_cache()
+    key = EmbeddingCache.key(provider.model_name, task_type, text)
+
+    if cache is not None:
+        cached = cache.get(key)
+        record_cache(call_site, "embedding", hit=cached is not None)
+        if cached is not None:
+            return cached
+
+    vectors = await get_llm_gateway().embed([text], task_type=task_type, provider=provider, call_site=call_site)
+    if cache is not None:
+        cache.put(key, vectors[0])
+    return vectors[0]
+
+async def embed_texts(
+    texts: List[str],
+    task_type: str = "retrieval_document",
+    provider: Optional[EmbeddingProvider] = None,
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    backoff_s: float = 0.5,
+    use_cache: bool = True,
+    call_site: str = "other",
+) -> List[Optional[List[float]]]:
+    """
+    Embeds many texts: batches of `batch_size` per call, at most `concurrency`
+    calls in flight, exponential backoff with jitter between retries.
+    A batch that still fails after retries yields None for each of its texts.
+    Texts already in the embedding cache are not sent.
+    """
+    provider = provider or get_embedding_provider()
+    gateway = get_llm_gateway()
+    cache = get_embedding_cache() if use_cache else None
+    batch_size = batch_size or settings.EMBED_BATCH_SIZE
+    concurrency = concurrency or settings.EMBED_CONCURRENCY
+    max_retries = settings.EMBED_MAX_RETRIES if max_retries is None else max_retries
+
+    semaphore = asyncio.Semaphore(concurrency)
+    results: List[Optional[List[float]]] = [None] * len(texts)
+
+    # Serve what we can from the cache; only misses go to the provider
+    keys = [EmbeddingCache.key(provider.model_name, task_type, t) for t in texts]
+    pending = list(range(len(texts)))
+    if cache is not None:
+        pending = []
+        for i, key in enumerate(keys):
+            results[i] = cache.get(key)
+            if results[i] is None:
+                pending.append(i)
+        record_cache(call_site, "embedding", hit=True, count=len(texts) - len(pending))
+        record_cache(call_site, "embedding", hit=False, count=len(pending))
+
+    async def run_batch(start: int):
+        batch_ids = pending[start:start + batch_size]
+        batch = [texts[i] for i in batch_ids]
+        for attempt in range(max_retries + 1):
+            try:
+                async with semaphore:
+                    vectors = await gateway.embed(batch, task_type=task_type, provider=provider, call_site=call_site)
+                if len(vectors) != len(batch):
+                    raise ValueError(f"Expected {len(batch)} embeddings, got {len(vectors)}")
+                for i, vector in zip(batch_ids, vectors):
+                    results[i] = vector
+                    if cache is not None:
+                        cache.put(keys[i], vector)
+                return
+            except Exception as e:
+                if attempt == max_retries:
+                    logger.warning(f"Embedding batch at {start} failed after {attempt + 1} attempts: {e}")
+                    return
+                await asyncio.sleep(backoff_s * (2 ** attempt) * (0.5 + random.random()))
+
+    await asyncio.gather(*(run_batch(i) for i in range(0, len(pending), batch_size)))
+    if cache is not None:
+        cache.flush()
+    return results
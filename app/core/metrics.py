@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Statuses still moving through the pipeline
+IN_FLIGHT_STATUSES = ("open", "analyzing", "classified", "diagnosed")
+
+class WindowCounter:
+    """Event count over the last `window_s` seconds, in one-second slots (O(window) memory, O(1) per event)."""
+
+    def __init__(self, window_s: int = 60):
+        self.window_s = window_s
+        self._slots = [0] * window_s
+        self._stamps = [-1] * window_s  # which second each slot currently holds
+
+    def add(self, n: int = 1, now: Optional[float] = None):
+        second = int(now if now is not None else time.time())
+        i = second % self.window_s
+        if self._stamps[i] != second:
+            self._stamps[i] = second
+            self._slots[i] = 0
+        self._slots[i] += n
+
+    def total(self, now: Optional[float] = None) -> int:
+        second = int(now if now is not None else time.time())
+        oldest = second - self.window_s
+        return sum(n for n, stamp in zip(self._slots, self._stamps) if stamp > oldest)
+
+class LatencyWindow:
+    """Samples from the last `window_s` seconds (at most `max_samples`), for mean and p95."""
+
+    def __init__(self, window_s: float = 300, max_samples: int = 2000):
+        self.window_s = window_s
+        self._samples = deque(maxlen=max_samples)  # (timestamp, ms)
+
+    def add(self, ms: float, now: Optional[float] = None):
+        self._samples.append((now if now is not None else time.time(), ms))
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        cutoff = (now if now is not None else time.time()) - self.window_s
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        values = sorted(ms for _, ms in self._samples)
+        if not values:
+            return {"count": 0, "avg_ms": None, "p95_ms": None}
+        return {
+            "count": len(values),
+            "avg_ms": round(sum(values) / len(values), 1),
+            "p95_ms": round(values[max(math.ceil(len(values) * 0.95) - 1, 0)], 1)
+        }
+
+class MetricsAggregator:
+    """
+    Dashboard counters kept in memory and updated where tickets change state,
+    so reading them costs nothing regardless of table size.
+
+    Per-status counts are seeded and periodically corrected from the
+    database by reconcile(): transitions made by other processes (or
+    missed ones) only cause drift until the next reconciliation. Rates
+    and latencies are this process's sliding windows.
+    """
+
+    def __init__(self, rate_window_s: int = 60, latency_window_s: float = 300):
+        self.status_counts: Counter = Counter()
+        self.created = WindowCounter(rate_window_s)
+        self.classified = WindowCounter(rate_window_s)
+        self.resolved = WindowCounter(rate_window_s)
+        self.llm_latency = LatencyWindow(latency_window_s)
+        self.last_reconciled: Optional[float] = None
+        self.last_drift = 0
+        self._lock = threading.Lock()
+
+    def ticket_created(self, status: str):
+        with self._lock:
+            self.status_counts[status] += 1
+            self.created.add()
+
+    def ticket_transition(self, old: Optional[str], new: str):
+        if old == new:
+            return
+        with self._lock:
+            if old is not None and self.status_counts[old] > 0:
+                self.status_counts[old] -= 1
+            self.status_counts[new] += 1
+            if new == "classified":
+                self.classified.add()
+            elif new == "resolved":
+                self.resolved.add()
+
+    def llm_call(self, latency_ms: float):
+        with self._lock:
+            self.llm_latency.add(latency_ms)
+
+    async def reconcile(self, session_factory) -> int:
+        """Replace status counts with the database's; returns the drift that was corrected."""
+        from sqlalchemy import func, select
+        from app.core.models import Ticket
+
+        async with session_factory() as session:
+            rows = (await session.execute(
+                select(Ticket.status, func.count(Ticket.id)).group_by(Ticket.status)
+            )).all()
+        actual = Counter({status: count for status, count in rows if status is not None})
+        with self._lock:
+            drift = sum(abs(actual[s] - self.status_counts[s]) for s in set(actual) | set(self.status_counts))
+            self.status_counts = actual
+            self.last_reconciled = time.time()
+            self.last_drift = drift
+        if drift:
+            logger.info(f"Metrics reconciled: corrected drift of {drift} tickets")
+        return drift
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = dict(self.status_counts)
+            return {
+                "status_counts": counts,
+                "queue_depth": sum(counts.get(s, 0) for s in IN_FLIGHT_STATUSES),
+                "created_per_minute": self.created.total() * 60 / self.created.window_s,
+                "classified_per_minute": self.classified.total() * 60 / self.classified.window_s,
+                "resolved_per_minute": self.resolved.total() * 60 / self.resolved.window_s,
+                "llm_latency": self.llm_latency.summary(),
+                "last_reconciled": self.last_reconciled,
+                "last_drift": self.last_drift
+            }
+
+_metrics = MetricsAggregator()
+_reconcile_task: Optional[asyncio.Task] = None
+
+def get_metrics() -> MetricsAggregator:
+    return _metrics
+
+async def _reconcile_loop(session_factory, interval_s: float):
+    while True:
+        try:
+            await _metrics.reconcile(session_factory)
+        except Exception as e:
+            logger.warning(f"Metrics reconciliation failed: {e}")
+        await asyncio.sleep(interval_s)
+
+def start_metrics_reconciler(interval_s: float = 60.0):
+    global _reconcile_task
+    from app.core.database import AsyncSessionLocal
+    if _reconcile_task is None:
+        _reconcile_task = asyncio.create_task(_reconcile_loop(AsyncSessionLocal, interval_s))
+        print(f"✅ Metrics: reconciling ticket counts every {interval_s:.0f}s")
+
+async def stop_metrics_reconciler():
+    global _reconcile_task
+    if _reconcile_task is not None:
+        _reconcile_task.cancel()
+        await asyncio.gather(_reconcile_task, return_exceptions=True)
+        _reconcile_task = None
@@ -35,6 +35,8 @@ class Ticket(Base):
     processed_text = Column(Text)
     classification = Column(String(50))
     classification_confidence = Column(Numeric(3, 2))
+    # Who produced the label: "gemini", "cache" (reused from a duplicate), "local", "rules" (fallback) or "human"
+    classification_source = Column(String(20))
     priority = Column(Integer)
     status = Column(String(20), default="open")
     assigned_agent = Column(Enum("orchestrator", "human", "pending", name="agent_assignment"), default="pending")
@@ -42,10 +44,22 @@ class Ticket(Base):
     resolution_action = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     resolved_at = Column(DateTime(timezone=True))
+    intake_claimed_at = Column(DateTime(timezone=True))  # last time an intake worker started on it
 
     merchant = relationship("Merchant", back_populates="tickets")
     decisions = relationship("AgentDecision", back_populates="ticket")
 
+    # Keyset pagination (created_at, id) newest first, alone or behind one equality filter.
+    # The unfiltered index also covers the summary columns so dashboard pages are index-only.
+    # Existing databases: scripts/migrate_ticket_indexes.py
+    __table_args__ = (
+        Index("ix_tickets_created_id", created_at.desc(), id.desc(),
+              postgresql_include=["status", "classification", "merchant_id", "priority", "classification_confidence"]),
+        Index("ix_tickets_status_created_id", status, created_at.desc(), id.desc()),
+        Index("ix_tickets_merchant_created_id", merchant_id, created_at.desc(), id.desc()),
+        Index("ix_tickets_classification_created_id", classification, created_at.desc(), id.desc()),
+    )
+
 class AgentDecision(Base):
     __tablename__ = "agent_decisions"
 
@@ -63,6 +77,11 @@ class AgentDecision(Base):
 
     ticket = relationship("Ticket", back_populates="decisions")
 
+    __table_args__ = (
+        # One decision per agent per ticket; concurrent writers use ON CONFLICT against it
+        Index("uq_agent_decisions_ticket_agent", ticket_id, agent_id, unique=True),
+    )
+
 class DocumentationChunk(Base):
     __tablename__ = "documentation_chunks"
 
@@ -83,3 +102,6 @@ class Pattern(Base):
     frequency = Column(Integer, default=0)
     last_occurred = Column(DateTime(timezone=True))
     auto_apply_enabled = Column(Boolean, default=False)
+    # Maintained by the patterns_touch_updated_at trigger (app.main) with clock_timestamp(),
+    # for plain SQL writes too; match-count updates leave it alone
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
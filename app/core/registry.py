@@ -0,0 +1,105 @@
+import inspect
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+class ComponentRegistry:
+    """
+    Process-wide components (classifier, LLM gateway, agents) built once on
+    first use and shared by every request and worker.
+
+    Components must be safe to share: they hold no per-request state.
+    Construction is guarded by a lock so two callers never build the same
+    component twice; close hooks run in reverse build order on shutdown.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._closers: Dict[str, Callable[[Any], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any], close: Optional[Callable[[Any], Any]] = None):
+        self._factories[name] = factory
+        if close is not None:
+            self._closers[name] = close
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            if name not in self._instances:
+                if name not in self._factories:
+                    raise KeyError(f"Unknown component: {name}")
+                self._instances[name] = self._factories[name]()
+                logger.info(f"Built component {name}")
+            return self._instances[name]
+
+    def built(self) -> List[str]:
+        return list(self._instances)
+
+    async def aclose(self):
+        for name in reversed(list(self._instances)):
+            closer = self._closers.get(name)
+            if closer is None:
+                continue
+            try:
+                result = closer(self._instances[name])
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Closing component {name} failed: {e}")
+        self._instances.clear()
+
+def _build_classifier():
+    from app.core.config import get_settings
+    from app.services.classifier import TicketClassifier
+    classifier = TicketClassifier()
+    settings = get_settings()
+    if settings.CLASSIFY_BATCH_WINDOW_MS > 0:
+        from app.services.batch_classifier import MicroBatchClassifier
+        classifier = MicroBatchClassifier(
+            classifier,
+            window_ms=settings.CLASSIFY_BATCH_WINDOW_MS,
+            max_batch=settings.CLASSIFY_BATCH_MAX
+        )
+    return classifier
+
+def _close_classifier(classifier):
+    if hasattr(classifier, "aclose"):
+        return classifier.aclose()
+
+def _build_llm():
+    from app.core.llm import get_llm_gateway
+    return get_llm_gateway()
+
+def _build_diagnostician():
+    from agents.diagnostician.agent import DiagnosticianAgent
+    return DiagnosticianAgent()
+
+def _build_pattern_engine():
+    from app.services.pattern_engine import build_pattern_engine
+    return build_pattern_engine()
+
+registry = ComponentRegistry()
+registry.register("llm", _build_llm)
+registry.register("classifier", _build_classifier, close=_close_classifier)
+registry.register("diagnostician", _build_diagnostician)
+registry.register("pattern_engine", _build_pattern_engine, close=lambda engine: engine.aclose())
+
+def get_registry() -> ComponentRegistry:
+    return registry
+
+def provide(name: str) -> Callable[[Request], Any]:
+    """
+    FastAPI dependency resolving a shared component from the app's registry:
+        agent = Depends(provide("diagnostician"))
+    """
+    def dependency(request: Request) -> Any:
+        return getattr(request.app.state, "registry", registry).get(name)
+    dependency.__name__ = f"provide_{name}"
+    return dependency
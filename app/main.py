@@ -1,37 +1,54 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.core.config import get_settings
+from app.core.registry import get_registry
 
 settings = get_settings()
 
-app = FastAPI(
-    title="Hermes Self-Healing Support",
-    version="0.1.0-hackathon",
-    description="Agentic AI system for headless commerce support"
-)
-
-from fastapi.middleware.cors import CORSMiddleware
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@app.get("/")
-async def root():
-    return {"message": "Hermes System Online", "status": "active"}
-
 # EMERGENCY MIGRATION & INITIALIZATION
-from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy import text
+from app.core.database import engine
 from app.core.models import Base
 
-@app.on_event("startup")
+DEDUPE_AGENT_DECISIONS = """
+DELETE FROM agent_decisions WHERE id IN (
+    SELECT id FROM (
+        SELECT id, row_number() OVER (
+            PARTITION BY ticket_id, agent_id
+            ORDER BY (reasoning_chain IS NULL), executed_at DESC NULLS LAST, id
+        ) AS rn
+        FROM agent_decisions
+    ) ranked WHERE rn > 1
+);
+"""
+
+# Pattern refreshes read rows by updated_at. clock_timestamp() (not now(), the
+# transaction start) and a trigger (not ORM onupdate) so every definition
+# change moves it, however it was written.
+PATTERNS_UPDATED_AT_TRIGGER = [
+    """
+    CREATE OR REPLACE FUNCTION patterns_touch_updated_at() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' OR (NEW.error_signature, NEW.error_regex, NEW.solution_template,
+                                NEW.success_rate, NEW.auto_apply_enabled)
+                IS DISTINCT FROM (OLD.error_signature, OLD.error_regex, OLD.solution_template,
+                                  OLD.success_rate, OLD.auto_apply_enabled) THEN
+            NEW.updated_at := clock_timestamp();
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    "DROP TRIGGER IF EXISTS patterns_touch_updated_at ON patterns;",
+    """
+    CREATE TRIGGER patterns_touch_updated_at BEFORE INSERT OR UPDATE ON patterns
+    FOR EACH ROW EXECUTE FUNCTION patterns_touch_updated_at();
+    """
+]
+
 async def startup_db_check():
     try:
-        engine = create_async_engine(settings.DATABASE_URL)
+        # Same engine (and pool) the app serves from
         async with engine.begin() as conn:
             # 1. Ensure vector extension (for RAG)
             await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
@@ -41,16 +58,88 @@ async def startup_db_check():
             
             # 3. Apply any surgical schema updates
             await conn.execute(text("ALTER TABLE tickets ADD COLUMN IF NOT EXISTS resolved_at TIMESTAMP WITH TIME ZONE;"))
+            await conn.execute(text("ALTER TABLE tickets ADD COLUMN IF NOT EXISTS classification_source VARCHAR(20);"))
+            await conn.execute(text("ALTER TABLE tickets ADD COLUMN IF NOT EXISTS intake_claimed_at TIMESTAMP WITH TIME ZONE;"))
+            await conn.execute(text("ALTER TABLE patterns ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT now();"))
+            for statement in PATTERNS_UPDATED_AT_TRIGGER:
+                await conn.execute(text(statement))
+            if (await conn.execute(text("SELECT to_regclass('uq_agent_decisions_ticket_agent')"))).scalar() is None:
+                # Older databases may hold duplicate diagnoses; keep the best row per ticket before enforcing uniqueness
+                await conn.execute(text(DEDUPE_AGENT_DECISIONS))
+                await conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_agent_decisions_ticket_agent ON agent_decisions (ticket_id, agent_id);"))
             
-            print("✅ DATABASE INITIALIZED: Extension created and tables synced.")
-        await engine.dispose()
+            print(f"✅ DATABASE INITIALIZED: Extension created and tables synced ({settings.DB_PROFILE} profile, pool {settings.DB_POOL_SIZE}+{settings.DB_MAX_OVERFLOW}).")
     except Exception as e:
         print(f"⚠️ DATABASE INITIALIZATION WARNING: {e}")
 
-from app.api.v1 import tickets, diagnosis, health, decisions, metrics
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup and shutdown in one place. Shared components (classifier, LLM
+    gateway, agents) live in the registry on app.state and are resolved per
+    request with Depends(provide(...)).
+    """
+    from app.services.intake_worker import start_intake_workers, stop_intake_workers
+    from app.services.warmup import start_warmup, stop_warmup
+    from app.services.rag_engine import start_docs_watcher, stop_docs_watcher
+    from app.services.log_index import start_log_indexer, stop_log_indexer
+    from app.core.embedding_cache import get_embedding_cache
+    from app.core.metrics import start_metrics_reconciler, stop_metrics_reconciler
+    from app.services.event_bus import start_event_bus, stop_event_bus
+    from app.api.v1.metrics import get_system_metrics
+
+    app.state.registry = get_registry()
+    await startup_db_check()
+    await start_intake_workers()
+    await start_warmup()
+    await app.state.registry.get("pattern_engine").start()
+    if settings.RAG_WATCH_DOCS and settings.RAG_BACKEND == "memory":
+        start_docs_watcher()
+    start_log_indexer()
+    start_metrics_reconciler(settings.METRICS_RECONCILE_INTERVAL_S)
+    await start_event_bus(metrics_snapshot=get_system_metrics)
+
+    yield
+
+    await stop_event_bus()
+    await stop_metrics_reconciler()
+    await stop_log_indexer()
+    await stop_docs_watcher()
+    await stop_warmup()
+    await stop_intake_workers()
+    cache = get_embedding_cache()
+    if cache is not None:
+        cache.flush()
+    await app.state.registry.aclose()
+    await engine.dispose()
+
+app = FastAPI(
+    title="Hermes Self-Healing Support",
+    version="0.1.0-hackathon",
+    description="Agentic AI system for headless commerce support",
+    lifespan=lifespan
+)
+
+from fastapi.middleware.cors import CORSMiddleware
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
+)
+
+@app.get("/")
+async def root():
+    return {"message": "Hermes System Online", "status": "active"}
+
+from app.api.v1 import tickets, diagnosis, health, decisions, metrics, events
 
 app.include_router(tickets.router, prefix="/api/v1/tickets", tags=["tickets"])
 app.include_router(diagnosis.router, prefix="/api/v1/tickets", tags=["diagnosis"]) # diagnosis often hangs off tickets or standalone
 app.include_router(health.router, prefix="/api/v1/health", tags=["health"])
 app.include_router(decisions.router, prefix="/api/v1/decisions", tags=["decisions"])
 app.include_router(metrics.router, prefix="/api/v1", tags=["metrics"])
+app.include_router(events.router, prefix="/api/v1/events", tags=["events"])
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.core.instrumentation import record_fallback
+from app.services.classifier import CLASSIFIER_GUIDE, TicketClassifier
+
+logger = logging.getLogger(__name__)
+
+BATCH_INSTRUCTIONS = """
+Now classify each of the following tickets.
+Return a JSON array with exactly one object per ticket, in the same order, each with the
+schema above plus an "index" field holding the ticket's number.
+"""
+
+def build_batch_prompt(texts: List[str]) -> str:
+    tickets = "\n".join(f"[{i}] Ticket: {json.dumps(text)}" for i, text in enumerate(texts))
+    return f"{CLASSIFIER_GUIDE}{BATCH_INSTRUCTIONS}\n{tickets}\nResponse:"
+
+def parse_batch_response(raw: str, size: int) -> List[Optional[Dict[str, Any]]]:
+    """
+    Map a batch answer back to ticket positions.
+    Entries that are missing, duplicated or malformed come back as None.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * size
+    try:
+        items = json.loads(raw)
+    except (TypeError, ValueError):
+        return results
+    if isinstance(items, dict):
+        items = items.get("results", items.get("tickets"))
+    if not isinstance(items, list):
+        return results
+
+    # Trust positions only when the model answered every ticket without indices
+    positional = len(items) == size and not any(isinstance(i, dict) and "index" in i for i in items)
+    for pos, item in enumerate(items):
+        if not isinstance(item, dict) or "category" not in item:
+            continue
+        index = pos if positional else item.pop("index", None)
+        if isinstance(index, int) and 0 <= index < size and results[index] is None:
+            results[index] = item
+    return results
+
+class MicroBatchClassifier:
+    """
+    Drop-in for TicketClassifier.classify that coalesces concurrent callers.
+
+    Tickets arriving within `window_ms` of the first one (or until `max_batch`
+    are waiting) share a single prompt, so the few-shot guide is sent once per
+    batch instead of once per ticket. Tickets missing from a partial or
+    malformed answer are classified individually; if the batch call itself
+    fails, each ticket gets the rule-based fallback.
+    """
+
+    def __init__(self, classifier: Optional[TicketClassifier] = None,
+                 window_ms: float = 50, max_batch: int = 16):
+        self.classifier = classifier or TicketClassifier()
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()  # in-flight batches; the loop only holds weak references
+        self.batches = 0
+        self.batched_tickets = 0
+
+    async def classify(self, text: str) -> Dict[str, Any]:
+        cached = self.classifier.lookup(text)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        texts = [text for text, _ in batch]
+        try:
+            try:
+                results = await self._classify_many(texts)
+            except Exception as e:
+                logger.error(f"Batch classification failed: {e}")
+                results = [self.classifier._rule_based_fallback(text) for text in texts]
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            # Cancelled on shutdown: don't leave callers waiting forever
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    async def aclose(self, timeout_s: float = 10.0):
+        """Send whatever is still queued, give in-flight batches `timeout_s` to finish, cancel the rest."""
+        self._flush()
+        if not self._tasks:
+            return
+        _, unfinished = await asyncio.wait(set(self._tasks), timeout=timeout_s)
+        for task in unfinished:
+            task.cancel()
+        await asyncio.gather(*unfinished, return_exceptions=True)
+        if unfinished:
+            logger.warning(f"Cancelled {len(unfinished)} classification batches on shutdown")
+
+    async def _classify_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        local = self.classifier.local
+        if local is None:
+            return await self._classify_remote(texts)
+
+        # Resolve confident tickets locally in one vectorized pass; only the rest reach Gemini
+        results = local.predict_batch(texts)
+        escalate = [i for i, result in enumerate(results) if result is None]
+        if escalate:
+            remote = await self._classify_remote([texts[i] for i in escalate])
+            for i, result in zip(escalate, remote):
+                results[i] = result
+        return results
+
+    async def _classify_remote(self, texts: List[str]) -> List[Dict[str, Any]]:
+        if len(texts) == 1:
+            return [await self.classifier.classify_with_llm(texts[0])]
+
+        self.batches += 1
+        self.batched_tickets += len(texts)
+        try:
+            response = await self.classifier.llm.generate(
+                build_batch_prompt(texts),
+                generation_config={"response_mime_type": "application/json"},
+                call_site="classifier_batch"
+            )
+            parsed = parse_batch_response(response.text, len(texts))
+        except Exception as e:
+            logger.error(f"Batch classification failed (Gemini): {e}. Switching to Rule-Based Fallback.")
+            record_fallback("classifier_batch", len(texts))
+            return [self.classifier._rule_based_fallback(text) for text in texts]
+
+        missing = [i for i, result in enumerate(parsed) if result is None]
+        if missing:
+            logger.warning(f"Batch answer covered {len(texts) - len(missing)}/{len(texts)} tickets; classifying the rest individually")
+            retried = await asyncio.gather(*(self.classifier.classify_with_llm(texts[i]) for i in missing))
+            for i, result in zip(missing, retried):
+                parsed[i] = result
+
+        retried_set = set(missing)
+        return [
+            result if i in retried_set else self.classifier.accept(text, result)
+            for i, (text, result) in enumerate(zip(texts, parsed))
+        ]
@@ -0,0 +1,182 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Optional, Set, Tuple
+import numpy as np
+from app.core.config import get_settings
+from app.services.keyword_index import tokenize
+
+_MERSENNE = (1 << 31) - 1
+
+def normalize(text: str) -> str:
+    """Lowercase, strip punctuation, collapse whitespace."""
+    return " ".join(tokenize(text))
+
+def shingles(normalized: str, k: int = 4) -> FrozenSet[str]:
+    """Character k-grams; short texts shingle as a whole."""
+    if len(normalized) <= k:
+        return frozenset([normalized])
+    return frozenset(normalized[i:i + k] for i in range(len(normalized) - k + 1))
+
+class MinHasher:
+    """MinHash signatures from universal hashes (a*x + b) mod p over the shingle hashes."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 7):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _MERSENNE, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _MERSENNE, size=num_perm, dtype=np.uint64)
+
+    def signature(self, items: FrozenSet[str]) -> np.ndarray:
+        x = np.array(
+            [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") % _MERSENNE
+             for s in items],
+            dtype=np.uint64
+        )
+        return ((self.a[:, None] * x[None, :] + self.b[:, None]) % _MERSENNE).min(axis=1)
+
+@dataclass
+class _Entry:
+    result: Dict[str, Any]
+    shingles: FrozenSet[str]
+    bands: Tuple[Tuple[int, bytes], ...]
+    created_at: float
+
+class ClassificationCache:
+    """
+    Reuses classifications for identical or near-identical ticket text.
+
+    Exact hits match on the normalized text. Near-duplicates are found with
+    MinHash LSH (bands x rows), then confirmed with the exact Jaccard
+    similarity of character shingles against `threshold`.
+    Entries expire after `ttl_s` and the least recently used are evicted
+    past `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 5000, ttl_s: float = 900, threshold: float = 0.8,
+                 bands: int = 32, rows: int = 4):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.hasher = MinHasher(num_perm=bands * rows)
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def _band_keys(self, normalized: str) -> Tuple[FrozenSet[str], Tuple[Tuple[int, bytes], ...]]:
+        items = shingles(normalized)
+        sig = self.hasher.signature(items)
+        bands = tuple(
+            (i, sig[i * self.rows:(i + 1) * self.rows].tobytes())
+            for i in range(self.bands)
+        )
+        return items, bands
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band in entry.bands:
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return now - entry.created_at > self.ttl_s
+
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        """Cached result with a `cache` provenance field, or None."""
+        normalized = normalize(text)
+        key = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return self._with_provenance(entry, "exact", 1.0, key, now)
+
+            items, bands = self._band_keys(normalized)
+            best_key, best_sim = None, 0.0
+            candidates = set()
+            for band in bands:
+                candidates.update(self._buckets.get(band, ()))
+            for candidate in candidates:
+                other = self._entries[candidate]
+                if self._expired(other, now):
+                    continue
+                sim = len(items & other.shingles) / len(items | other.shingles)
+                if sim > best_sim:
+                    best_key, best_sim = candidate, sim
+
+            if best_key is not None and best_sim >= self.threshold:
+                self._entries.move_to_end(best_key)
+                self.near_hits += 1
+                return self._with_provenance(self._entries[best_key], "near_duplicate", best_sim, best_key, now)
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, result: Dict[str, Any]):
+        normalized = normalize(text)
+        key = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        items, bands = self._band_keys(normalized)
+        clean = {k: v for k, v in result.items() if k != "cache"}
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _Entry(clean, items, bands, time.time())
+            for band in bands:
+                self._buckets[band].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    @staticmethod
+    def _with_provenance(entry: _Entry, hit: str, similarity: float, key: str, now: float) -> Dict[str, Any]:
+        return {
+            **entry.result,
+            "cache": {
+                "hit": hit,
+                "similarity": round(similarity, 3),
+                "source_key": key[:12],
+                "age_s": round(now - entry.created_at, 1)
+            }
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.near_hits + self.misses
+        hits = self.exact_hits + self.near_hits
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "near_duplicate_hits": self.near_hits,
+            "misses": self.misses,
+            "llm_calls_saved": hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+        }
+
+@lru_cache()
+def get_classification_cache() -> Optional[ClassificationCache]:
+    settings = get_settings()
+    if not settings.CLASSIFY_CACHE_ENABLED:
+        return None
+    return ClassificationCache(
+        max_entries=settings.CLASSIFY_CACHE_MAX_ENTRIES,
+        ttl_s=settings.CLASSIFY_CACHE_TTL_S,
+        threshold=settings.CLASSIFY_CACHE_SIMILARITY
+    )
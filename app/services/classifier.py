@@ -1,8 +1,11 @@
 import json
 import logging
 from typing import Dict, Any, Optional
-from app.core.llm import get_model
+from app.core.instrumentation import record_cache, record_fallback
+from app.core.llm import get_llm_gateway
 from app.core.models import Ticket
+from app.services.classification_cache import get_classification_cache
+from app.services.local_classifier import KeywordMatcher, get_local_classifier
 
 logger = logging.getLogger(__name__)
 
@@ -11,7 +14,7 @@ CATEGORIES = [
     "API_ERROR", "CONFIG_ERROR", "WEBHOOK_FAIL", "CHECKOUT_BREAK", "DOCS_CONFUSION"
 ]
 
-SYSTEM_PROMPT = """You are a Tier 3 Support AI for a Headless Commerce platform.
+CLASSIFIER_GUIDE = """You are a Tier 3 Support AI for a Headless Commerce platform.
 Your task is to classify incoming support tickets into specific technical categories.
 
 Output must be valid JSON with the following schema:
@@ -38,68 +41,90 @@ Response: {"category": "CHECKOUT_BREAK", "confidence": 0.99, "urgency": 10, "rea
 
 Ticket: "Rate limit headers are missing from response."
 Response: {"category": "CONFIG_ERROR", "confidence": 0.85, "urgency": 4, "reasoning": "Likely a gateway configuration issue."}
+"""
 
+SYSTEM_PROMPT = CLASSIFIER_GUIDE + """
 Now classify the following ticket:
 """
 
+def classification_source(result: Dict[str, Any]) -> str:
+    """Provenance stored on the ticket: a reused answer is "cache", otherwise the tier that produced it."""
+    if result.get("cache"):
+        return "cache"
+    return result.get("tier", "gemini")
+
 class TicketClassifier:
     def __init__(self):
-        self.model = get_model()
+        self.llm = get_llm_gateway()
+        self.cache = get_classification_cache()
+        self.local = get_local_classifier()
+        self.matcher = self.local.matcher if self.local else KeywordMatcher()
 
     async def classify(self, text: str) -> Dict[str, Any]:
-        """Classifies a ticket using Gemini 1.5 Pro."""
+        """Classifies a ticket: cache, then the local first tier, then Gemini."""
+        cached = self.lookup(text)
+        if cached is not None:
+            return cached
+
+        if self.local is not None:
+            local = self.local.predict(text)
+            if local is not None:
+                return local
+
+        return await self.classify_with_llm(text)
+
+    async def classify_with_llm(self, text: str) -> Dict[str, Any]:
+        """Gemini classification, falling back to keyword rules on failure."""
         try:
             prompt = f"{SYSTEM_PROMPT}\nTicket: \"{text}\"\nResponse:"
-            response = self.model.generate_content(
+            response = await self.llm.generate(
                 prompt,
-                generation_config={"response_mime_type": "application/json"}
+                generation_config={"response_mime_type": "application/json"},
+                call_site="classifier"
             )
             
             # Parse JSON
-            result = json.loads(response.text)
-            
-            # Validate category
-            if result.get("category") not in CATEGORIES:
-                logger.warning(f"Invalid category {result.get('category')} returned. Defaulting to API_ERROR.")
-                result["category"] = "API_ERROR"
-                
-            return result
+            return self.accept(text, json.loads(response.text))
             
         except Exception as e:
             logger.error(f"Classification failed (Gemini): {e}. Switching to Rule-Based Fallback.")
+            record_fallback("classifier")
             return self._rule_based_fallback(text)
 
+    def lookup(self, text: str) -> Optional[Dict[str, Any]]:
+        """Reuse the classification of an identical or near-duplicate ticket."""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(text)
+        record_cache("classifier", "classification", hit=cached is not None)
+        if cached is not None:
+            logger.info(f"Classification served from cache ({cached['cache']['hit']}, similarity {cached['cache']['similarity']})")
+        return cached
+
+    def accept(self, text: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate a model answer and remember it for duplicate tickets."""
+        # Validate category
+        if result.get("category") not in CATEGORIES:
+            logger.warning(f"Invalid category {result.get('category')} returned. Defaulting to API_ERROR.")
+            result["category"] = "API_ERROR"
+
+        # Only model answers are reused; rule-based fallbacks are cheap to recompute
+        if self.cache is not None:
+            self.cache.put(text, result)
+
+        return result
+
     def _rule_based_fallback(self, text: str) -> Dict[str, Any]:
-        text_lower = text.lower()
-        category = "API_ERROR" # Default
-        confidence = 0.5
-        reasoning = "Rule-based fallback triggered due to LLM failure."
-        urgency = 5
-        
-        if "checkout" in text_lower or "cart" in text_lower or "pay" in text_lower:
-            category = "CHECKOUT_BREAK"
-            confidence = 0.9
-            urgency = 10
-        elif "webhook" in text_lower:
-            category = "WEBHOOK_FAIL"
-            confidence = 0.9
-            urgency = 7
-        elif "doc" in text_lower or "how to" in text_lower:
-            category = "DOCS_CONFUSION"
-            confidence = 0.8
-            urgency = 3
-        elif "config" in text_lower or "url" in text_lower:
-            category = "CONFIG_ERROR"
-            confidence = 0.8
-            urgency = 4
-        elif "api" in text_lower or "401" in text_lower or "500" in text_lower:
-            category = "API_ERROR"
-            confidence = 0.9
-            urgency = 8
-            
+        category, _ = self.matcher.match(text)
+        if category is None:
+            category, confidence, urgency = "API_ERROR", 0.5, 5 # Default
+        else:
+            confidence, urgency = self.matcher.rules[category]
+
         return {
             "category": category,
             "confidence": confidence,
             "urgency": urgency,
-            "reasoning": reasoning
+            "reasoning": "Rule-based fallback triggered due to LLM failure.",
+            "tier": "rules"
         }
@@ -0,0 +1,130 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.services.keyword_index import tokenize
+
+# Gemini averages ~4 characters per token on English prose; logs and JSON run denser
+CHARS_PER_TOKEN = 4.0
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+|\n")
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate; usage_metadata on the response gives the real count."""
+    return int(len(text) / CHARS_PER_TOKEN) + 1 if text else 0
+
+def clip_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens, at the last sentence or line break that fits when there is one."""
+    max_chars = int(max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    head = text[:max_chars]
+    breaks = [m.start() for m in SENTENCE_END_RE.finditer(head)]
+    cut = breaks[-1] if breaks and breaks[-1] > max_chars // 2 else max_chars
+    return head[:cut].rstrip() + " …"
+
+@dataclass
+class Evidence:
+    source: str  # section it is rendered under: "docs", "logs", "patterns"
+    text: str
+    score: float = 0.0  # relevance within its source; only the order inside a source matters
+    label: Optional[str] = None  # e.g. doc id, shown before the text
+
+@dataclass
+class PackedContext:
+    sections: Dict[str, List[str]]
+    tokens: int
+    budget: int
+    included: int
+    duplicates: int
+    dropped: int
+    clipped: int
+    by_source: Dict[str, int] = field(default_factory=dict)  # tokens per source
+
+    def render(self, source: str, indent: str = "  ", empty: str = "None") -> str:
+        items = self.sections.get(source)
+        return "\n".join(f"{indent}- {item}" for item in items) if items else f"{indent}{empty}"
+
+    def report(self) -> Dict:
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "included": self.included,
+            "duplicates": self.duplicates,
+            "dropped": self.dropped,
+            "clipped": self.clipped,
+            "by_source": self.by_source
+        }
+
+class ContextPacker:
+    """
+    Packs evidence from several sources into a token budget.
+
+    Evidence is deduplicated first (an item whose terms are mostly covered
+    by a better-ranked item adds nothing), then ranked: each source's items
+    in score order, sources interleaved by `weights` so one verbose source
+    can't crowd out the rest. Items are taken greedily while they fit; the
+    first that doesn't is clipped to the remaining space if that leaves at
+    least `min_clip_tokens`, otherwise skipped in favour of smaller ones.
+    """
+
+    def __init__(self, budget_tokens: int = 1200, weights: Optional[Dict[str, float]] = None,
+                 overlap: float = 0.8, min_clip_tokens: int = 48, max_item_tokens: int = 400):
+        self.budget_tokens = budget_tokens
+        self.weights = weights or {}
+        self.overlap = overlap
+        self.min_clip_tokens = min_clip_tokens
+        self.max_item_tokens = max_item_tokens
+
+    def _dedupe(self, ranked: List[Evidence]) -> Tuple[List[Evidence], int]:
+        kept, kept_terms = [], []
+        for item in ranked:
+            terms = set(tokenize(item.text))
+            if not terms:
+                continue
+            if any(len(terms & other) / len(terms) >= self.overlap for other in kept_terms):
+                continue
+            kept.append(item)
+            kept_terms.append(terms)
+        return kept, len(ranked) - len(kept)
+
+    def _rank(self, items: Sequence[Evidence]) -> List[Evidence]:
+        """Order by weight / (1 + rank within source), so sources alternate by importance."""
+        by_source: Dict[str, List[Evidence]] = {}
+        for item in items:
+            by_source.setdefault(item.source, []).append(item)
+        keyed = []
+        for source, group in by_source.items():
+            group.sort(key=lambda e: -e.score)
+            weight = self.weights.get(source, 1.0)
+            keyed.extend((weight / (1 + rank), source, rank, item) for rank, item in enumerate(group))
+        keyed.sort(key=lambda k: (-k[0], k[1], k[2]))
+        return [item for *_, item in keyed]
+
+    def pack(self, items: Sequence[Evidence], budget_tokens: Optional[int] = None) -> PackedContext:
+        budget = self.budget_tokens if budget_tokens is None else budget_tokens
+        ranked, duplicates = self._dedupe(self._rank(items))
+
+        sections: Dict[str, List[str]] = {}
+        by_source: Dict[str, int] = {}
+        used = included = dropped = clipped = 0
+        for item in ranked:
+            text = " ".join(item.text.split())  # Collapse whitespace; layout costs tokens
+            if item.label:
+                text = f"[{item.label}] {text}"
+            if estimate_tokens(text) > self.max_item_tokens:
+                text = clip_to_tokens(text, self.max_item_tokens)
+                clipped += 1
+            cost = estimate_tokens(text)
+            remaining = budget - used
+            if cost > remaining:
+                if remaining < self.min_clip_tokens:
+                    dropped += 1
+                    continue
+                text = clip_to_tokens(text, remaining - 1)
+                cost = estimate_tokens(text)
+                clipped += 1
+            sections.setdefault(item.source, []).append(text)
+            by_source[item.source] = by_source.get(item.source, 0) + cost
+            used += cost
+            included += 1
+
+        return PackedContext(sections, used, budget, included, duplicates, dropped, clipped, by_source)
@@ -0,0 +1,169 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence, Tuple
+import numpy as np
+from app.core.config import get_settings
+
+Scope = Tuple[str, str]  # (classification, merchant tier)
+
+@dataclass
+class _Entry:
+    result: Dict[str, Any]
+    vector: np.ndarray  # L2-normalized float32
+    scope: Scope
+    corpus_version: Optional[str]
+    created_at: float
+    cost_ms: float  # what producing the result took; credited as saved on each hit
+
+class _Bucket:
+    """Entries of one scope, with their vectors stacked lazily for a single matmul per lookup."""
+
+    def __init__(self):
+        self.ids: Dict[int, _Entry] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._order: Tuple[int, ...] = ()
+
+    def add(self, entry_id: int, entry: _Entry):
+        self.ids[entry_id] = entry
+        self._matrix = None
+
+    def discard(self, entry_id: int):
+        if self.ids.pop(entry_id, None) is not None:
+            self._matrix = None
+
+    def matrix(self) -> Tuple[Tuple[int, ...], np.ndarray]:
+        if self._matrix is None:
+            self._order = tuple(self.ids)
+            self._matrix = np.stack([self.ids[i].vector for i in self._order])
+        return self._order, self._matrix
+
+class DiagnosisCache:
+    """
+    Reuses diagnoses for semantically similar tickets.
+
+    A result is only shared between tickets with the same classification and
+    merchant tier, whose embeddings have cosine similarity >= `threshold`,
+    within `ttl_s`, and produced against the same docs corpus version: when
+    the corpus changes every entry is dropped, since the evidence behind them
+    is stale. The least recently used entries are evicted past `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 2000, ttl_s: float = 1800, threshold: float = 0.92):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.threshold = threshold
+
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: Dict[Scope, _Bucket] = {}
+        self._ids = itertools.count()
+        self._corpus_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.saved_ms = 0.0
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Optional[np.ndarray]:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else None
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        bucket = self._buckets.get(entry.scope)
+        if bucket is not None:
+            bucket.discard(entry_id)
+            if not bucket.ids:
+                del self._buckets[entry.scope]
+
+    def _check_corpus(self, corpus_version: Optional[str]):
+        if corpus_version != self._corpus_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._buckets.clear()
+            self._corpus_version = corpus_version
+
+    def get(self, vector: Sequence[float], scope: Scope, corpus_version: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Cached diagnosis with a `cache` provenance field, or None."""
+        start = time.perf_counter()
+        query = self._normalize(vector)
+        now = time.time()
+
+        with self._lock:
+            self._check_corpus(corpus_version)
+            bucket = self._buckets.get(scope)
+            if query is None or bucket is None:
+                self.misses += 1
+                return None
+
+            order, matrix = bucket.matrix()
+            scores = matrix @ query
+            for row in np.argsort(-scores):
+                if scores[row] < self.threshold:
+                    break
+                entry_id = order[row]
+                entry = self._entries[entry_id]
+                if now - entry.created_at > self.ttl_s:
+                    self._remove(entry_id)
+                    continue
+                self._entries.move_to_end(entry_id)
+                self.hits += 1
+                lookup_ms = (time.perf_counter() - start) * 1000
+                self.saved_ms += max(entry.cost_ms - lookup_ms, 0.0)
+                return {
+                    **entry.result,
+                    "cache": {
+                        "hit": "semantic",
+                        "similarity": round(float(scores[row]), 3),
+                        "age_s": round(now - entry.created_at, 1)
+                    }
+                }
+
+            self.misses += 1
+            return None
+
+    def put(self, vector: Sequence[float], scope: Scope, corpus_version: Optional[str],
+            result: Dict[str, Any], cost_ms: float):
+        normalized = self._normalize(vector)
+        if normalized is None:
+            return
+        clean = {k: v for k, v in result.items() if k != "cache"}
+
+        with self._lock:
+            self._check_corpus(corpus_version)
+            entry_id = next(self._ids)
+            self._entries[entry_id] = _Entry(clean, normalized, scope, corpus_version, time.time(), cost_ms)
+            self._buckets.setdefault(scope, _Bucket()).add(entry_id, self._entries[entry_id])
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "latency_saved_ms": round(self.saved_ms, 1),
+            "corpus_invalidations": self.invalidations
+        }
+
+@lru_cache()
+def get_diagnosis_cache() -> Optional[DiagnosisCache]:
+    settings = get_settings()
+    if not settings.DIAG_CACHE_ENABLED:
+        return None
+    return DiagnosisCache(
+        max_entries=settings.DIAG_CACHE_MAX_ENTRIES,
+        ttl_s=settings.DIAG_CACHE_TTL_S,
+        threshold=settings.DIAG_CACHE_SIMILARITY
+    )
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from app.core.database import AsyncSessionLocal
+from app.core.instrumentation import ticket_context
+from app.core.metrics import get_metrics
+from app.core.models import AgentDecision, Merchant, Ticket
+from app.services.event_bus import get_event_bus, publish_ticket
+
+logger = logging.getLogger(__name__)
+
+AGENT_ID = "diagnostician"
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls per key: the first caller starts the work as a
+    task, later callers with the same key await that task and get its result
+    (or its exception). The key is forgotten as soon as the task finishes.
+    Callers await through shield(), so a client that disconnects doesn't
+    cancel the run the other waiters depend on.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved even if every waiter went away
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+_diagnoses = SingleFlight()
+
+async def _existing_diagnosis(db, ticket_id: UUID) -> Optional[Dict]:
+    result = await db.execute(select(AgentDecision.reasoning_chain).where(
+        AgentDecision.ticket_id == ticket_id,
+        AgentDecision.agent_id == AGENT_ID
+    ))
+    return result.scalars().first()
+
+async def _diagnose_and_store(ticket_id: UUID, agent, classification: Optional[str], executed_by: str) -> Optional[Dict]:
+    # Read what the agent needs, then give the connection back: the LLM calls
+    # take seconds and must not hold a pooled (or PgBouncer server) connection
+    async with AsyncSessionLocal() as db:
+        ticket = (await db.execute(select(Ticket).where(Ticket.id == ticket_id))).scalars().first()
+        if not ticket:
+            logger.error(f"Ticket {ticket_id} not found for diagnosis.")
+            return None
+
+        existing = await _existing_diagnosis(db, ticket_id)
+        if existing:
+            return existing
+
+        # Tier also scopes which cached diagnoses may be reused for this ticket
+        merchant = (await db.execute(
+            select(Merchant.tier, Merchant.migration_stage).where(Merchant.id == ticket.merchant_id)
+        )).first()
+        merchant_context = {
+            "id": str(ticket.merchant_id),
+            "tier": merchant.tier if merchant else "growth",
+            "migration_stage": merchant.migration_stage if merchant else "not_started"
+        }
+        ticket_text = ticket.raw_text
+        classification = classification or ticket.classification or "UNKNOWN"
+
+    if agent is None:
+        # Built only on a miss: serving a stored decision never needs the agent
+        from agents.diagnostician.agent import get_diagnostician
+        agent = get_diagnostician()
+    diagnosis = await agent.diagnose(
+        ticket_text=ticket_text,
+        classification=classification,
+        merchant_context=merchant_context
+    )
+
+    async with AsyncSessionLocal() as db:
+        # The unique (ticket_id, agent_id) index makes this safe across workers:
+        # whoever commits first wins, everyone else reads the winner's row back.
+        # A row left without a reasoning chain is filled in rather than kept.
+        values = dict(
+            ticket_id=ticket_id,
+            agent_id=AGENT_ID,
+            reasoning_chain=diagnosis,
+            proposed_action={"action": diagnosis.get("recommended_action", "Review")},
+            action_type="human_approved",
+            risk_level="medium",
+            executed_at=datetime.now(),
+            executed_by=executed_by
+        )
+        stmt = insert(AgentDecision).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AgentDecision.ticket_id, AgentDecision.agent_id],
+            set_={"reasoning_chain": stmt.excluded.reasoning_chain,
+                  "proposed_action": stmt.excluded.proposed_action,
+                  "executed_at": stmt.excluded.executed_at},
+            where=AgentDecision.reasoning_chain.is_(None)
+        ).returning(AgentDecision.id)
+        stored = (await db.execute(stmt)).first()
+
+        if stored is None:
+            await db.rollback()
+            logger.info(f"Diagnosis for ticket {ticket_id} already stored by another worker")
+            return await _existing_diagnosis(db, ticket_id) or diagnosis
+
+        ticket = (await db.execute(select(Ticket).where(Ticket.id == ticket_id))).scalars().first()
+        ticket.root_cause = diagnosis.get("root_cause") or "See diagnosis"
+        previous_status = ticket.status
+        ticket.status = "diagnosed"
+        await db.commit()
+    get_metrics().ticket_transition(previous_status, "diagnosed")
+    publish_ticket(ticket)
+    get_event_bus().publish("diagnosis", {"ticket_id": str(ticket_id), "diagnosis": diagnosis})
+    return diagnosis
+
+async def get_or_create_diagnosis(ticket_id: UUID, agent=None, classification: Optional[str] = None,
+                                  executed_by: str = "system") -> Optional[Dict]:
+    """
+    The stored diagnosis for a ticket, running the diagnostician if there is
+    none yet. Concurrent callers in this process share one run; the unique
+    index on agent_decisions keeps workers in other processes from storing
+    a second decision. Returns None if the ticket does not exist.
+    Without an `agent`, the shared diagnostician is resolved only if a run is needed.
+    """
+    # The shared run's task copies this context, so its LLM calls are tagged with the ticket id
+    with ticket_context(ticket_id):
+        return await _diagnoses.do(ticket_id, lambda: _diagnose_and_store(ticket_id, agent, classification, executed_by))
+
+def diagnosis_stats() -> Dict[str, int]:
+    return {"inflight": _diagnoses.inflight(), "coalesced": _diagnoses.coalesced}
@@ -0,0 +1,320 @@
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_MAX_BYTES = 7900
+
+def encode_frame(data: Dict[str, Any], event_id: Optional[str] = None) -> bytes:
+    """One SSE message. Unnamed (no `event:` line), so EventSource.onmessage receives it."""
+    body = json.dumps(data, default=str, separators=(",", ":"))
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}data: {body}\n\n".encode("utf-8")
+
+RESYNC_FRAME = encode_frame({"type": "resync", "payload": {}})
+
+def ticket_payload(ticket) -> Dict[str, Any]:
+    """A Ticket row in the shape GET /api/v1/tickets returns (what the UI's store holds)."""
+    return {
+        "id": str(ticket.id),
+        "status": ticket.status,
+        "classification": ticket.classification,
+        "created_at": ticket.created_at.isoformat() if ticket.created_at else None,
+        "merchant_id": str(ticket.merchant_id) if ticket.merchant_id else None,
+        "priority": ticket.priority,
+        "confidence": float(ticket.classification_confidence) if ticket.classification_confidence is not None else None,
+        "raw_text": ticket.raw_text,
+        "merchantName": "Merchant",
+        "merchantAvatar": None
+    }
+
+class Subscriber:
+    """
+    One SSE client: a bounded buffer of encoded frames plus the metric
+    deltas merged since its last read (metrics are state, so a client that
+    reads late gets the latest values rather than every intermediate one).
+    """
+
+    def __init__(self, max_buffer: int):
+        self.max_buffer = max_buffer
+        self.frames: Deque[bytes] = deque()
+        self.closed = False
+        self.shed = False
+        self._metrics: Optional[Dict[str, Any]] = None
+        self._metrics_frame: Optional[bytes] = None
+        self._waiter: Optional[asyncio.Future] = None
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def offer(self, frame: bytes) -> bool:
+        """Queue a frame; a full buffer means the client can't keep up, so it is shed instead."""
+        if self.closed:
+            return False
+        if len(self.frames) >= self.max_buffer:
+            self.shed = True
+            self.frames.clear()
+            self.close()
+            return False
+        self.frames.append(frame)
+        self._wake()
+        return True
+
+    def offer_metrics(self, delta: Dict[str, Any], frame: bytes):
+        if self.closed:
+            return
+        if self._metrics is None:
+            self._metrics, self._metrics_frame = delta, frame
+        else:
+            self._metrics, self._metrics_frame = {**self._metrics, **delta}, None
+        self._wake()
+
+    def close(self):
+        self.closed = True
+        self._wake()
+
+    async def next_frames(self, timeout: float) -> List[bytes]:
+        """Everything pending, waiting up to `timeout` for something to arrive ([] on timeout)."""
+        if not self.frames and self._metrics is None and not self.closed:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(self._waiter, timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self._waiter = None
+        frames = list(self.frames)
+        self.frames.clear()
+        if self._metrics is not None:
+            frames.append(self._metrics_frame or encode_frame({"type": "metrics", "payload": self._metrics}))
+            self._metrics = self._metrics_frame = None
+        return frames
+
+class EventBus:
+    """
+    In-process fan-out of live updates to SSE subscribers.
+
+    Each event is JSON-encoded once and the same bytes are queued for every
+    client. Recent events are kept for Last-Event-ID resume; event ids are
+    "<epoch>-<seq>" with a per-process epoch, so a client resuming against
+    another worker (or after a restart) is told to resync instead.
+    publish() must be called from the event loop thread.
+    """
+
+    def __init__(self, buffer_events: int = 256, replay_events: int = 1000):
+        self.buffer_events = buffer_events
+        self.epoch = uuid.uuid4().hex[:8]
+        self.subscribers: Set[Subscriber] = set()
+        self.relay: Optional["PgEventRelay"] = None
+        self._seq = 0
+        self._replay: Deque[Tuple[int, bytes]] = deque(maxlen=replay_events)
+        self.published = 0
+        self.shed = 0
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        subscriber = Subscriber(self.buffer_events)
+        if last_event_id:
+            subscriber.frames.extend(self._missed_since(last_event_id))
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscriber.close()
+        self.subscribers.discard(subscriber)
+
+    def _missed_since(self, last_event_id: str) -> List[bytes]:
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return [RESYNC_FRAME]
+        seq = int(seq)
+        if seq < self._seq and (not self._replay or self._replay[0][0] > seq + 1):
+            return [RESYNC_FRAME]  # the gap is older than what we kept
+        return [frame for s, frame in self._replay if s > seq]
+
+    def publish(self, event_type: str, payload: Dict[str, Any], relay: bool = True) -> str:
+        self._seq += 1
+        event_id = f"{self.epoch}-{self._seq}"
+        frame = encode_frame({"type": event_type, "payload": payload}, event_id)
+        self._replay.append((self._seq, frame))
+        self.published += 1
+        for subscriber in list(self.subscribers):
+            if not subscriber.offer(frame) and subscriber.shed:
+                self.shed += 1
+                self.subscribers.discard(subscriber)
+        if relay and self.relay is not None:
+            self.relay.send(event_type, payload)
+        return event_id
+
+    def publish_metrics(self, delta: Dict[str, Any]):
+        """Metric deltas are this process's view, so they are not relayed to other workers."""
+        frame = encode_frame({"type": "metrics", "payload": delta})
+        for subscriber in self.subscribers:
+            subscriber.offer_metrics(delta, frame)
+
+    def close(self):
+        """End every open stream (shutdown)."""
+        for subscriber in list(self.subscribers):
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "shed": self.shed,
+            "relay": self.relay.stats() if self.relay is not None else None
+        }
+
+class PgEventRelay:
+    """
+    Keeps API workers consistent: events published here are NOTIFYed on a
+    Postgres channel, and events NOTIFYed by other workers are published on
+    the local bus. Runs on its own connection (LISTEN does not survive a
+    transaction-mode pooler, hence SSE_LISTEN_URL) and reconnects with
+    backoff; while disconnected, events reach this worker's clients only.
+    """
+
+    def __init__(self, bus: EventBus, dsn: str, channel: str, outbox_size: int = 1000):
+        self.bus = bus
+        self.dsn = dsn
+        self.channel = channel
+        self.connected = False
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+        self._outbox: asyncio.Queue = asyncio.Queue(maxsize=outbox_size)
+
+    def send(self, event_type: str, payload: Dict[str, Any]):
+        if not self.connected:
+            return
+        message = self._encode(event_type, payload)
+        if message is None:
+            self.dropped += 1
+            return
+        try:
+            self._outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def _encode(self, event_type: str, payload: Dict[str, Any]) -> Optional[str]:
+        message = json.dumps({"origin": self.bus.epoch, "type": event_type, "payload": payload}, default=str)
+        if len(message.encode("utf-8")) <= NOTIFY_MAX_BYTES:
+            return message
+        # Too big for NOTIFY: send the identifying fields and let clients refetch the rest
+        slim = {k: payload[k] for k in ("id", "ticket_id", "status") if k in payload}
+        message = json.dumps({"origin": self.bus.epoch, "type": event_type,
+                              "payload": {**slim, "truncated": True}}, default=str)
+        return message if len(message.encode("utf-8")) <= NOTIFY_MAX_BYTES else None
+
+    def _on_notify(self, connection, pid, channel, message: str):
+        try:
+            event = json.loads(message)
+        except ValueError:
+            logger.warning(f"Ignoring malformed event on {channel}")
+            return
+        if event.get("origin") == self.bus.epoch:
+            return  # our own NOTIFY coming back
+        self.received += 1
+        self.bus.publish(event["type"], event["payload"], relay=False)
+
+    async def run(self, heartbeat_s: float = 15.0):
+        import asyncpg
+
+        backoff = 1.0
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn, statement_cache_size=0)
+                await connection.add_listener(self.channel, self._on_notify)
+                self.connected = True
+                backoff = 1.0
+                logger.info(f"Event relay listening on {self.channel}")
+                while True:
+                    try:
+                        message = await asyncio.wait_for(self._outbox.get(), heartbeat_s)
+                    except asyncio.TimeoutError:
+                        await connection.execute("SELECT 1")  # notices a dead connection while idle
+                        continue
+                    await connection.execute("SELECT pg_notify($1, $2)", self.channel, message)
+                    self.sent += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event relay disconnected: {type(e).__name__}: {e}; retrying in {backoff:.0f}s")
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"connected": self.connected, "sent": self.sent, "received": self.received, "dropped": self.dropped}
+
+def metrics_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Keys whose values changed (the timestamp alone does not count as a change)."""
+    delta = {k: v for k, v in current.items() if k != "timestamp" and previous.get(k) != v}
+    if delta and "timestamp" in current:
+        delta["timestamp"] = current["timestamp"]
+    return delta
+
+async def _metrics_feed(bus: EventBus, snapshot: Callable[[], Awaitable[Dict[str, Any]]], interval_s: float):
+    previous: Dict[str, Any] = {}
+    while True:
+        await asyncio.sleep(interval_s)
+        if not bus.subscribers:
+            continue
+        try:
+            current = await snapshot()
+        except Exception as e:
+            logger.warning(f"Metrics feed skipped a tick: {e}")
+            continue
+        delta = metrics_delta(previous, current)
+        previous = current
+        if delta:
+            bus.publish_metrics(delta)
+
+@lru_cache()
+def get_event_bus() -> EventBus:
+    return EventBus(buffer_events=settings.SSE_BUFFER_EVENTS, replay_events=settings.SSE_REPLAY_EVENTS)
+
+def publish_ticket(ticket, event_type: str = "ticket_update"):
+    """Push a ticket's current state to live clients ("new_ticket" or "ticket_update")."""
+    get_event_bus().publish(event_type, ticket_payload(ticket))
+
+def _listen_dsn() -> str:
+    from sqlalchemy.engine import make_url
+    url = make_url(settings.SSE_LISTEN_URL or settings.DATABASE_URL)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+_tasks: List[asyncio.Task] = []
+
+async def start_event_bus(metrics_snapshot: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None):
+    """Metric deltas feed and, if enabled, the cross-worker LISTEN/NOTIFY relay."""
+    bus = get_event_bus()
+    if metrics_snapshot is not None:
+        _tasks.append(asyncio.create_task(_metrics_feed(bus, metrics_snapshot, settings.SSE_METRICS_INTERVAL_S)))
+    if settings.SSE_NOTIFY_ENABLED:
+        bus.relay = PgEventRelay(bus, _listen_dsn(), settings.SSE_NOTIFY_CHANNEL)
+        _tasks.append(asyncio.create_task(bus.relay.run(settings.SSE_HEARTBEAT_S)))
+        print(f"✅ Live updates: SSE bus with LISTEN/NOTIFY fan-out on '{settings.SSE_NOTIFY_CHANNEL}'")
+    else:
+        print("⚠️ Live updates: SSE_NOTIFY_ENABLED is off, clients only see events from this worker")
+
+async def stop_event_bus():
+    bus = get_event_bus()
+    bus.close()
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+    bus.relay = None
@@ -0,0 +1,58 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Both retrievers take (query, k) and return keys ranked best-first
+Retriever = Callable[[str, int], Awaitable[List[Hashable]]]
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = 60) -> List[Tuple[float, Hashable]]:
+    """
+    Fuse ranked lists by summing 1 / (k + rank) per key.
+    Only ranks matter, so retrievers with incomparable score scales combine cleanly.
+    Ties keep the order keys were first seen.
+    """
+    fused: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+    order = {key: i for i, key in enumerate(fused)}
+    return sorted(((score, key) for key, score in fused.items()), key=lambda x: (-x[0], order[x[1]]))
+
+async def hybrid_search(
+    query: str,
+    dense: Retriever,
+    sparse: Retriever,
+    top_k: int = 3,
+    dense_k: int = 20,
+    sparse_k: int = 20,
+    dense_budget_ms: float = 800,
+    rrf_k: int = 60,
+) -> List[Tuple[float, Hashable]]:
+    """
+    Run dense and sparse retrieval concurrently and fuse with RRF.
+    The dense side (embedding call + vector search) gets `dense_budget_ms`;
+    if it misses the budget or fails, results are sparse-only.
+    """
+    start = time.perf_counter()
+    dense_task = asyncio.create_task(dense(query, dense_k))
+
+    try:
+        sparse_ranked = await sparse(query, sparse_k)
+    except Exception as e:
+        logger.warning(f"Sparse retrieval failed: {e}")
+        sparse_ranked = []
+
+    remaining = max(0.0, dense_budget_ms / 1000 - (time.perf_counter() - start))
+    try:
+        dense_ranked = await asyncio.wait_for(dense_task, timeout=remaining)
+    except asyncio.TimeoutError:
+        logger.warning(f"Dense retrieval exceeded {dense_budget_ms:.0f}ms budget; using sparse-only results")
+        dense_ranked = []
+    except Exception as e:
+        logger.warning(f"Dense retrieval failed: {e}; using sparse-only results")
+        dense_ranked = []
+
+    return reciprocal_rank_fusion([dense_ranked, sparse_ranked], rrf_k)[:top_k]
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class IntakeJob:
+    ticket_id: UUID
+    receipt: Optional[str] = None  # Backend-specific handle used for ack
+    attempts: int = 1  # deliveries so far, this one included
+
+class IntakeQueue:
+    """
+    Interface for the ticket intake queue.
+    The API enqueues ticket ids; the worker pool dequeues and acks them.
+    """
+    # Durable backends survive a process restart with pending jobs intact
+    durable = False
+
+    async def connect(self) -> None:
+        """Verify the backend is reachable. Raises on failure."""
+        pass
+
+    async def enqueue(self, ticket_id: UUID) -> None:
+        raise NotImplementedError
+
+    async def dequeue(self, timeout: float = 1.0) -> Optional[IntakeJob]:
+        raise NotImplementedError
+
+    async def ack(self, job: IntakeJob) -> None:
+        pass
+
+    async def nack(self, job: IntakeJob) -> None:
+        """The job failed; have it delivered again later."""
+        pass
+
+    async def close(self) -> None:
+        pass
+
+class InMemoryIntakeQueue(IntakeQueue):
+    """In-process stand-in. Used for tests and single-process dev runs."""
+
+    def __init__(self, retry_delay_s: float = 5.0):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.retry_delay_s = retry_delay_s
+
+    async def enqueue(self, ticket_id: UUID) -> None:
+        await self._queue.put(IntakeJob(ticket_id=ticket_id))
+
+    async def dequeue(self, timeout: float = 1.0) -> Optional[IntakeJob]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def nack(self, job: IntakeJob) -> None:
+        retry = IntakeJob(ticket_id=job.ticket_id, attempts=job.attempts + 1)
+        asyncio.get_running_loop().call_later(self.retry_delay_s, self._queue.put_nowait, retry)
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+class RedisStreamIntakeQueue(IntakeQueue):
+    """
+    Redis Streams backend with a consumer group.
+    Jobs stay in the group's pending list until acked, so a crashed worker's
+    jobs, and failed (nacked) ones, are re-claimed by a consumer after
+    `claim_idle_ms`. The group's delivery counter gives the attempt number.
+    """
+    durable = True
+
+    def __init__(self, redis_url: str, stream: str, group: str = "intake-workers",
+                 claim_idle_ms: int = 300_000):
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(redis_url, decode_responses=True, socket_connect_timeout=5)
+        self.stream = stream
+        self.group = group
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.claim_idle_ms = claim_idle_ms
+        self._group_ready = False
+        self._last_claim = 0.0
+
+    async def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def connect(self) -> None:
+        await self.redis.ping()
+        await self._ensure_group()
+
+    async def enqueue(self, ticket_id: UUID) -> None:
+        await self.redis.xadd(self.stream, {"ticket_id": str(ticket_id)})
+
+    async def _claim_stale(self) -> Optional[IntakeJob]:
+        now = time.monotonic()
+        if now - self._last_claim < self.claim_idle_ms / 1000:
+            return None
+        self._last_claim = now
+        _, messages, _ = await self.redis.xautoclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=self.claim_idle_ms, start_id="0-0", count=1
+        )
+        for msg_id, fields in messages:
+            pending = await self.redis.xpending_range(self.stream, self.group, min=msg_id, max=msg_id, count=1)
+            attempts = pending[0]["times_delivered"] if pending else 1
+            logger.warning(f"Re-claimed stale intake job {msg_id} for ticket {fields.get('ticket_id')} (attempt {attempts})")
+            return IntakeJob(ticket_id=UUID(fields["ticket_id"]), receipt=msg_id, attempts=attempts)
+        return None
+
+    async def dequeue(self, timeout: float = 1.0) -> Optional[IntakeJob]:
+        await self._ensure_group()
+
+        job = await self._claim_stale()
+        if job:
+            return job
+
+        resp = await self.redis.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"},
+            count=1, block=int(timeout * 1000)
+        )
+        for _, messages in resp or []:
+            for msg_id, fields in messages:
+                return IntakeJob(ticket_id=UUID(fields["ticket_id"]), receipt=msg_id)
+        return None
+
+    async def ack(self, job: IntakeJob) -> None:
+        if job.receipt:
+            await self.redis.xack(self.stream, self.group, job.receipt)
+            await self.redis.xdel(self.stream, job.receipt)
+
+    async def nack(self, job: IntakeJob) -> None:
+        # Left pending on purpose: _claim_stale re-delivers it once idle
+        pass
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+def create_intake_queue(backend: Optional[str] = None) -> IntakeQueue:
+    settings = get_settings()
+    backend = backend or settings.INTAKE_QUEUE_BACKEND
+
+    if backend == "memory":
+        return InMemoryIntakeQueue(retry_delay_s=settings.INTAKE_RETRY_DELAY_S)
+    if backend == "redis":
+        return RedisStreamIntakeQueue(
+            settings.REDIS_URL,
+            settings.INTAKE_STREAM,
+            claim_idle_ms=settings.INTAKE_CLAIM_IDLE_MS
+        )
+    raise ValueError(f"Unknown intake queue backend: {backend}")
+
+_queue: Optional[IntakeQueue] = None
+
+def get_intake_queue() -> IntakeQueue:
+    global _queue
+    if _queue is None:
+        _queue = create_intake_queue()
+    return _queue
+
+def set_intake_queue(queue: Optional[IntakeQueue]):
+    """Swap the process-wide queue (startup fallback, tests)."""
+    global _queue
+    _queue = queue
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import func, select, update
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.instrumentation import ticket_context
+from app.core.metrics import get_metrics
+from app.core.models import Ticket
+from app.services.agent_runner import run_diagnostician
+from app.services.classifier import classification_source
+from app.services.event_bus import publish_ticket
+from app.services.intake_queue import (
+    IntakeJob, IntakeQueue, InMemoryIntakeQueue, get_intake_queue, set_intake_queue
+)
+
+logger = logging.getLogger(__name__)
+
+# Categories that warrant a Diagnostician run
+TECHNICAL_CATEGORIES = ["API_ERROR", "WEBHOOK_FAIL", "CHECKOUT_BREAK", "CONFIG_ERROR"]
+
+def _get_classifier():
+    from app.core.registry import get_registry
+    return get_registry().get("classifier")
+
+async def process_ticket(ticket_id: UUID):
+    """
+    Intake job: classify the ticket, then diagnose it if it is a technical issue.
+    Status moves analyzing -> classified -> diagnosed; a ticket already past
+    analyzing (a redelivered job) is left as it is.
+    """
+    # LLM calls made for this ticket (here or in tasks spawned from here) are tagged with its id
+    with ticket_context(ticket_id):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
+            ticket = result.scalars().first()
+
+            if not ticket:
+                logger.error(f"Ticket {ticket_id} not found for intake.")
+                return
+
+            # A redelivered job (crash or failed ack after the work was committed) has nothing left to do
+            if ticket.status not in ("open", "analyzing"):
+                logger.info(f"Ticket {ticket_id} already {ticket.status}; skipping intake")
+                return
+
+            # Marks the ticket as being worked on, so startup recovery elsewhere leaves it alone
+            ticket.intake_claimed_at = datetime.now(timezone.utc)
+            await db.commit()
+
+            classification = await _get_classifier().classify(ticket.raw_text)
+
+            cat = classification.get("category")
+            ticket.classification = cat
+            ticket.classification_confidence = classification.get("confidence")
+            ticket.classification_source = classification_source(classification)
+            ticket.priority = classification.get("urgency")
+            previous_status = ticket.status
+            ticket.status = "classified"
+            await db.commit()
+            get_metrics().ticket_transition(previous_status, "classified")
+            publish_ticket(ticket)
+
+        logger.info(f"Ticket {ticket_id} classified as {cat}")
+
+        if cat in TECHNICAL_CATEGORIES:
+            await run_diagnostician(ticket_id, cat)
+        else:
+            logger.info(f"Skipping Diagnostician for {cat}")
+
+class IntakeWorkerPool:
+    """Fixed pool of asyncio workers draining the intake queue."""
+
+    def __init__(self, queue: IntakeQueue, concurrency: int = 4, max_attempts: int = 3):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+
+    async def start(self):
+        self._running = True
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"intake-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.queue.close()
+
+    async def _worker(self, n: int):
+        while self._running:
+            try:
+                job = await self.queue.dequeue(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Intake worker {n} dequeue failed: {e}")
+                await asyncio.sleep(1.0)
+                continue
+
+            if job is None:
+                continue
+
+            try:
+                await process_ticket(job.ticket_id)
+            except asyncio.CancelledError:
+                # Leave the job un-acked so a durable backend re-delivers it
+                raise
+            except Exception as e:
+                if job.attempts < self.max_attempts:
+                    logger.warning(f"Intake job for ticket {job.ticket_id} failed "
+                                   f"(attempt {job.attempts}/{self.max_attempts}), will retry: {e}")
+                    await self._nack(job)
+                    continue
+                logger.error(f"Intake job for ticket {job.ticket_id} failed after {job.attempts} attempts: {e}",
+                             exc_info=True)
+                try:
+                    await mark_ticket_failed(job.ticket_id)
+                except Exception as mark_error:
+                    # Not acked: the job comes back and marking is tried again
+                    logger.error(f"Could not mark ticket {job.ticket_id} failed: {mark_error}")
+                    await self._nack(job)
+                    continue
+
+            try:
+                await self.queue.ack(job)
+            except Exception as e:
+                logger.error(f"Intake ack failed for ticket {job.ticket_id}: {e}")
+
+    async def _nack(self, job: IntakeJob):
+        try:
+            await self.queue.nack(job)
+        except Exception as e:
+            logger.error(f"Intake nack failed for ticket {job.ticket_id}: {e}")
+
+async def mark_ticket_failed(ticket_id: UUID):
+    """Terminal state for a ticket whose intake job kept failing (resolved/escalated tickets are left alone)."""
+    async with AsyncSessionLocal() as db:
+        ticket = (await db.execute(select(Ticket).where(Ticket.id == ticket_id))).scalars().first()
+        if ticket is None or ticket.status not in ("open", "analyzing", "classified"):
+            return
+        previous_status = ticket.status
+        ticket.status = "failed"
+        await db.commit()
+    get_metrics().ticket_transition(previous_status, "failed")
+    publish_ticket(ticket)
+
+async def recover_stranded_tickets(queue: IntakeQueue, stale_s: float = 600.0) -> int:
+    """
+    Re-enqueue tickets still marked `analyzing` that no worker has touched
+    for `stale_s`. Only needed for non-durable backends, whose pending jobs
+    die with the process.
+
+    Tickets are claimed in one UPDATE .. RETURNING, so with several
+    processes starting at once each stranded ticket goes to exactly one of
+    them, and tickets another live process is still working on (recently
+    created or claimed) are skipped.
+    """
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(Ticket)
+            .where(Ticket.status == "analyzing")
+            .where(func.coalesce(Ticket.intake_claimed_at, Ticket.created_at) < now - timedelta(seconds=stale_s))
+            .values(intake_claimed_at=now)
+            .returning(Ticket.id)
+        )
+        ticket_ids = result.scalars().all()
+        await db.commit()
+
+    for ticket_id in ticket_ids:
+        await queue.enqueue(ticket_id)
+    return len(ticket_ids)
+
+_pool: Optional[IntakeWorkerPool] = None
+
+async def start_intake_workers():
+    global _pool
+    settings = get_settings()
+    queue = get_intake_queue()
+
+    if queue.durable:
+        try:
+            await queue.connect()
+        except Exception as e:
+            print(f"⚠️ INTAKE QUEUE WARNING: {e}. Falling back to in-memory queue.")
+            queue = InMemoryIntakeQueue(retry_delay_s=settings.INTAKE_RETRY_DELAY_S)
+            set_intake_queue(queue)
+
+    if not queue.durable:
+        try:
+            recovered = await recover_stranded_tickets(queue, settings.INTAKE_RECOVERY_STALE_S)
+            if recovered:
+                print(f"Intake: re-enqueued {recovered} stranded tickets")
+        except Exception as e:
+            print(f"⚠️ INTAKE RECOVERY WARNING: {e}")
+
+    _pool = IntakeWorkerPool(queue, concurrency=settings.INTAKE_WORKERS, max_attempts=settings.INTAKE_MAX_ATTEMPTS)
+    await _pool.start()
+    print(f"✅ Intake pipeline started ({settings.INTAKE_WORKERS} workers, {type(queue).__name__})")
+
+async def stop_intake_workers():
+    global _pool
+    if _pool:
+        await _pool.stop()
+        _pool = None
@@ -0,0 +1,69 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Shared by ingest and query so both sides agree on terms."""
+    return TOKEN_RE.findall(text.lower())
+
+class KeywordIndex:
+    """
+    Inverted index with BM25 scoring, built once per corpus snapshot.
+    A query only touches the posting lists of its own terms.
+    """
+
+    def __init__(self, docs: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)  # term -> [(doc, tf)]
+        self.doc_len: List[int] = []
+
+        for doc_id, text in enumerate(docs):
+            terms = tokenize(text)
+            self.doc_len.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self.postings[term].append((doc_id, tf))
+
+        self.postings = dict(self.postings)
+        n = len(self.doc_len)
+        self.avgdl = (sum(self.doc_len) / n) if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in self.postings.items()
+        }
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def scores(self, query: str) -> Dict[int, float]:
+        """BM25 score for every document matching at least one query term."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = self.idf[term]
+            for doc_id, tf in plist:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc_id] / self.avgdl)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def overlap(self, query: str) -> Dict[int, float]:
+        """Fraction of distinct query terms present in each matching document."""
+        terms = set(tokenize(query))
+        if not terms:
+            return {}
+        hits: Dict[int, int] = defaultdict(int)
+        for term in terms:
+            for doc_id, _ in self.postings.get(term, ()):
+                hits[doc_id] += 1
+        return {doc_id: count / len(terms) for doc_id, count in hits.items()}
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[float, int]]:
+        """Top-k (score, doc id) by BM25, ties in corpus order."""
+        best = heapq.nsmallest(top_k, ((-s, d) for d, s in self.scores(query).items()))
+        return [(-neg, doc_id) for neg, doc_id in best]
@@ -0,0 +1,157 @@
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# (category, confidence, urgency, keyword patterns) in precedence order.
+# The confidences are for the rule-based fallback after a Gemini failure;
+# a keyword hit alone never resolves a ticket in the local tier.
+KEYWORD_RULES: List[Tuple[str, float, int, List[str]]] = [
+    ("CHECKOUT_BREAK", 0.9, 10, [r"\bcheckouts?\b", r"\bcarts?\b", r"\bpay(?:s|ing|ment|ments)?\b"]),
+    ("WEBHOOK_FAIL", 0.9, 7, [r"\bwebhooks?\b"]),
+    ("DOCS_CONFUSION", 0.8, 3, [r"\bdoc(?:s|umentation)?\b", r"\bhow to\b"]),
+    ("CONFIG_ERROR", 0.8, 4, [r"\bconfig(?:s|uration|ured)?\b", r"\burls?\b"]),
+    ("API_ERROR", 0.9, 8, [r"\bapi\b", r"\b401\b", r"\b500\b"]),
+]
+
+DEFAULT_URGENCY = {category: urgency for category, _, urgency, _ in KEYWORD_RULES}
+
+class KeywordMatcher:
+    """
+    All keyword rules compiled into one alternation with a named group per
+    category, so a ticket is scanned once regardless of how many rules exist.
+    """
+
+    def __init__(self, rules=KEYWORD_RULES):
+        self.rules = {category: (confidence, urgency) for category, confidence, urgency, _ in rules}
+        self.order = [category for category, *_ in rules]
+        self.pattern = re.compile(
+            "|".join(f"(?P<{category}>{'|'.join(patterns)})" for category, _, _, patterns in rules)
+        )
+
+    def hits(self, text: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for m in self.pattern.finditer(text.lower()):
+            counts[m.lastgroup] = counts.get(m.lastgroup, 0) + 1
+        return counts
+
+    def match(self, text: str) -> Tuple[Optional[str], Dict[str, int]]:
+        """Highest-precedence category with a hit, plus all hit counts."""
+        counts = self.hits(text)
+        for category in self.order:
+            if category in counts:
+                return category, counts
+        return None, counts
+
+class LocalClassifier:
+    """
+    First-tier classifier that answers without a network call.
+
+    A ticket is resolved locally only by a trained TF-IDF + logistic
+    regression model whose probability reaches `min_confidence`, and only if
+    the keyword rules don't point at a different category. Keywords alone
+    are too blunt ("can I pay by invoice?" is not a checkout outage), so
+    without a model everything returns None and is escalated to Gemini.
+    """
+
+    def __init__(self, model=None, min_confidence: float = 0.85):
+        self.matcher = KeywordMatcher()
+        self.model = model
+        self.min_confidence = min_confidence
+
+    def predict_batch(self, texts: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        if self.model is None or not texts:
+            return [None] * len(texts)
+        proba = self.model.predict_proba(list(texts))
+        classes = list(self.model.classes_)
+
+        results: List[Optional[Dict[str, Any]]] = []
+        for i, text in enumerate(texts):
+            best = int(np.argmax(proba[i]))
+            category, confidence = classes[best], float(proba[i][best])
+            rule_cat, counts = self.matcher.match(text)
+            # Only an unambiguous keyword hit counts as a vote
+            if len(counts) != 1:
+                rule_cat = None
+
+            if confidence < self.min_confidence or (rule_cat is not None and rule_cat != category):
+                results.append(None)
+                continue
+            source = f"model p={confidence:.2f}" + (", rules agree" if rule_cat == category else "")
+            results.append({
+                "category": category,
+                "confidence": round(confidence, 2),
+                "urgency": DEFAULT_URGENCY.get(category, 5),
+                "reasoning": f"Resolved by local classifier ({source}).",
+                "tier": "local"
+            })
+        return results
+
+    def predict(self, text: str) -> Optional[Dict[str, Any]]:
+        return self.predict_batch([text])[0]
+
+def build_model():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    return make_pipeline(
+        TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, min_df=2),
+        LogisticRegression(max_iter=1000, C=4.0, class_weight="balanced")
+    )
+
+def train_model(texts: Sequence[str], labels: Sequence[str]):
+    if len(set(labels)) < 2:
+        raise ValueError("Need at least two categories to train the local classifier")
+    model = build_model()
+    model.fit(list(texts), list(labels))
+    return model
+
+# Labels worth learning from. Local-tier, cached and rule-fallback labels are
+# excluded so the model never retrains on its own (or the rules') output.
+TRAINING_SOURCES = ("gemini", "human")
+
+async def load_training_data(session, min_confidence: float = 0.8) -> Tuple[List[str], List[str]]:
+    """Tickets labelled by Gemini or a human, skipping low-confidence labels."""
+    from sqlalchemy import select
+    from app.core.models import Ticket
+    from app.services.classifier import CATEGORIES
+    result = await session.execute(
+        select(Ticket.raw_text, Ticket.classification)
+        .where(Ticket.classification.in_(CATEGORIES))
+        .where(Ticket.classification_source.in_(TRAINING_SOURCES))
+        .where(Ticket.classification_confidence >= min_confidence)
+    )
+    rows = result.all()
+    return [r[0] for r in rows], [r[1] for r in rows]
+
+def save_model(model, path: str):
+    import joblib
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    joblib.dump(model, tmp)
+    os.replace(tmp, path)
+
+def load_model(path: str):
+    if not os.path.exists(path):
+        return None
+    import joblib
+    return joblib.load(path)
+
+@lru_cache()
+def get_local_classifier() -> Optional[LocalClassifier]:
+    settings = get_settings()
+    if not settings.LOCAL_CLASSIFIER_ENABLED:
+        return None
+    model = None
+    try:
+        model = load_model(settings.LOCAL_CLASSIFIER_MODEL_PATH)
+    except Exception as e:
+        print(f"⚠️ LOCAL CLASSIFIER WARNING: could not load model ({e}). Every ticket goes to Gemini.")
+    if model is None:
+        logger.info("No trained local classifier model; every ticket goes to Gemini until one is trained")
+    return LocalClassifier(model, min_confidence=settings.LOCAL_CLASSIFIER_MIN_CONFIDENCE)
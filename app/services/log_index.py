@@ -0,0 +1,384 @@
+import asyncio
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import threading
+import time
+from array import array
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Lines worth indexing; everything else is skipped at C speed by the regex scan
+# (matched against lowercased chunks: a case-sensitive scan is several times faster than (?i))
+ERROR_LINE_RE = re.compile(rb"error|exception|fail|fatal|crit|warn|timeout|refused|denied")
+PLAIN_TS_RE = re.compile(rb"^\s*\[?(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?)")
+WORD_RE = re.compile(r"[A-Za-z0-9]+")
+CAMEL_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+JSON_TS_FIELDS = ("ts", "timestamp", "time", "@timestamp")
+JSON_MSG_FIELDS = ("message", "msg", "error", "level", "logger", "event")
+
+# Ticket prose words that say nothing about which log line is relevant
+QUERY_STOPWORDS = {
+    "the", "and", "for", "our", "are", "was", "were", "not", "but", "with", "after", "since",
+    "when", "this", "that", "from", "have", "has", "all", "any", "can", "cannot", "please", "help",
+    "is", "it", "in", "on", "to", "of", "we", "my", "an", "at", "be", "or", "no", "me", "us"
+}
+
+LOG_SUFFIXES = (".log", ".jsonl")
+MAX_LINE = 4096
+CHUNK_BYTES = 8 * 1024 * 1024
+
+def log_tokens(text: str) -> Set[str]:
+    """Lowercased words plus CamelCase parts, so 'SSLHandshakeError' is found by 'ssl' or 'handshake'."""
+    tokens = set()
+    for word in WORD_RE.findall(text):
+        parts = CAMEL_RE.findall(word) if not word.islower() else []
+        for tok in [word, *parts]:
+            tok = tok.lower()
+            # Long digit runs and mixed letter/digit strings are ids or hashes, not vocabulary
+            if len(tok) < 2 or len(tok) > 32 or (tok.isdigit() and len(tok) > 4):
+                continue
+            if len(tok) > 6 and not tok.isalpha() and not tok.isdigit():
+                continue
+            tokens.add(tok)
+    return tokens
+
+def parse_timestamp(value) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) / (1000 if value > 1e11 else 1)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+def parse_line(line: bytes) -> Tuple[Optional[float], str]:
+    """(timestamp, text to tokenize) for a JSONL or plain log line."""
+    text = line.decode("utf-8", "replace")
+    if text.startswith("{"):
+        try:
+            record = json.loads(text)
+            ts = next((parse_timestamp(record[f]) for f in JSON_TS_FIELDS if f in record), None)
+            body = " ".join(str(record[f]) for f in JSON_MSG_FIELDS if f in record) or text
+            return ts, body
+        except (ValueError, TypeError):
+            pass
+    m = PLAIN_TS_RE.match(line)
+    return (parse_timestamp(m.group(1).decode()) if m else None), text
+
+class _Postings:
+    """Parallel arrays of (timestamp, file id, byte offset) for one token in one bucket."""
+    __slots__ = ("ts", "loc")
+
+    def __init__(self):
+        self.ts = array("d")
+        self.loc = array("Q")  # file id << 40 | offset
+
+    def add(self, ts: float, loc: int):
+        self.ts.append(ts)
+        self.loc.append(loc)
+
+    def trim(self, keep: int):
+        """Keep the newest `keep` entries (entries arrive in file order, roughly by time)."""
+        if len(self.loc) > keep:
+            self.ts = self.ts[-keep:]
+            self.loc = self.loc[-keep:]
+
+class _LogFile:
+    __slots__ = ("id", "path", "offset", "mtime")
+
+    def __init__(self, file_id: int, path: str):
+        self.id = file_id
+        self.path = path
+        self.offset = 0
+        self.mtime = 0.0
+
+class LogIndex:
+    """
+    Time-bucketed inverted index of error tokens over local log files.
+
+    Files (*.log plain text, *.jsonl) are read through mmap from the last
+    indexed offset, so growing files are indexed incrementally and rotated
+    files (same inode, new name) are not indexed twice. Only error-like lines
+    are tokenized. Postings hold byte offsets, so a query touches the buckets
+    in its time range and the posting lists of its tokens, then reads just
+    the winning lines.
+
+    Memory is bounded by `retention_s` (buckets older than that, by the
+    wall clock, are dropped) and `max_postings` per token per bucket (the
+    oldest are trimmed), not by the size of the logs. Lines stamped more
+    than `max_skew_s` in the future are filed under the file's mtime, so a
+    bad clock can't pin a far-future bucket in memory.
+    """
+
+    def __init__(self, log_path: str, bucket_s: int = 300, retention_s: float = 86400,
+                 max_postings: int = 2000, max_skew_s: float = 300, clock=time.time):
+        self.log_path = log_path
+        self.bucket_s = bucket_s
+        self.retention_s = retention_s
+        self.max_postings = max_postings
+        self.max_skew_s = max_skew_s
+        self.clock = clock
+
+        self._files: Dict[Tuple[int, int], _LogFile] = {}  # (dev, inode) -> file
+        self._paths: Dict[int, str] = {}
+        self._buckets: Dict[int, Dict[str, _Postings]] = {}
+        self._bucket_lines: Dict[int, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self.lines_indexed = 0
+        self.bytes_scanned = 0
+
+    # Indexing
+
+    def _log_files(self) -> List[str]:
+        if os.path.isfile(self.log_path):
+            return [self.log_path]
+        if not os.path.isdir(self.log_path):
+            return []
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(self.log_path)
+            for name in names if name.endswith(LOG_SUFFIXES) or ".log." in name
+        )
+
+    def refresh(self) -> int:
+        """Index whatever was appended since the last call; returns lines indexed."""
+        with self._scan_lock:
+            indexed = 0
+            for path in self._log_files():
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                key = (st.st_dev, st.st_ino)
+                f = self._files.get(key)
+                if f is None:
+                    f = self._files[key] = _LogFile(len(self._paths), path)
+                f.path = self._paths[f.id] = path
+                if st.st_size < f.offset:
+                    # Truncated in place: forget what we had for it
+                    self._drop_file(f.id)
+                    f.offset = 0
+                if st.st_size > f.offset:
+                    indexed += self._index_file(f, st.st_size, st.st_mtime)
+            self.lines_indexed += indexed
+            return indexed
+
+    def _index_file(self, f: _LogFile, size: int, mtime: float) -> int:
+        count = 0
+        with open(f.path, "rb") as fh:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = mm.rfind(b"\n", f.offset, size)
+                if end == -1:
+                    return 0  # no complete line yet
+                end += 1
+                pos = f.offset
+                while pos < end:
+                    # Bounded window ending on a line boundary, so memory stays flat for any file size
+                    chunk_end = min(pos + CHUNK_BYTES, end)
+                    if chunk_end < end:
+                        nl = mm.rfind(b"\n", pos, chunk_end)
+                        chunk_end = (nl if nl != -1 else mm.find(b"\n", chunk_end, end)) + 1
+                    raw = mm[pos:chunk_end]
+                    low = raw.lower()
+                    latest = self.clock() + self.max_skew_s
+                    partial: Dict[int, Dict[str, _Postings]] = defaultdict(lambda: defaultdict(_Postings))
+                    lines: Dict[int, int] = defaultdict(int)
+                    line_done = 0
+                    for m in ERROR_LINE_RE.finditer(low):
+                        if m.start() < line_done:
+                            continue  # another keyword on a line already indexed
+                        start = low.rfind(b"\n", 0, m.start()) + 1
+                        stop = low.find(b"\n", m.end())
+                        stop = len(low) if stop == -1 else stop
+                        ts, body = parse_line(raw[start:min(stop, start + MAX_LINE)])
+                        ts = ts if ts is not None and ts <= latest else min(mtime, latest)
+                        loc = (f.id << 40) | (pos + start)
+                        bucket_id = int(ts // self.bucket_s)
+                        bucket = partial[bucket_id]
+                        lines[bucket_id] += 1
+                        for token in log_tokens(body):
+                            bucket[token].add(ts, loc)
+                        count += 1
+                        line_done = stop + 1
+
+                    # Merge and prune per window so a large backlog never piles up in memory
+                    self._merge(partial, lines)
+                    self._prune()
+                    self.bytes_scanned += chunk_end - pos
+                    f.offset = pos = chunk_end
+        f.mtime = mtime
+        return count
+
+    def _merge(self, partial: Dict[int, Dict[str, _Postings]], lines: Dict[int, int]):
+        with self._lock:
+            for bucket_id, n in lines.items():
+                self._bucket_lines[bucket_id] += n
+            for bucket_id, tokens in partial.items():
+                bucket = self._buckets.setdefault(bucket_id, {})
+                for token, postings in tokens.items():
+                    existing = bucket.get(token)
+                    if existing is None:
+                        bucket[token] = existing = postings
+                    else:
+                        existing.ts.extend(postings.ts)
+                        existing.loc.extend(postings.loc)
+                    existing.trim(self.max_postings)
+
+    def _drop_file(self, file_id: int):
+        with self._lock:
+            for bucket in self._buckets.values():
+                for postings in bucket.values():
+                    keep = [i for i, loc in enumerate(postings.loc) if loc >> 40 != file_id]
+                    postings.ts = array("d", (postings.ts[i] for i in keep))
+                    postings.loc = array("Q", (postings.loc[i] for i in keep))
+
+    def _prune(self):
+        with self._lock:
+            if not self._buckets:
+                return
+            cutoff = (self.clock() - self.retention_s) // self.bucket_s
+            for bucket_id in [b for b in self._buckets if b < cutoff]:
+                del self._buckets[bucket_id]
+                self._bucket_lines.pop(bucket_id, None)
+
+    # Queries
+
+    def search(self, keywords: Iterable[str], start: Optional[float] = None, end: Optional[float] = None,
+               limit: int = 3) -> Dict:
+        """
+        Error lines in [start, end] matching any keyword, ranked by the summed
+        idf of the keywords they contain, newest first on ties. Tokens on more
+        than half the lines in range only count when nothing rarer matched.
+        """
+        query = set()
+        for kw in keywords:
+            query |= log_tokens(kw)
+        query -= QUERY_STOPWORDS
+
+        with self._lock:
+            lo = int(start // self.bucket_s) if start is not None else -math.inf
+            hi = int(end // self.bucket_s) if end is not None else math.inf
+            in_range = [b for b in self._buckets if lo <= b <= hi]
+            n_lines = sum(self._bucket_lines[b] for b in in_range)
+            lists = {}
+            for token in query:
+                parts = [self._buckets[b][token] for b in in_range if token in self._buckets[b]]
+                if parts:
+                    # Copies, so indexing can keep appending while we score
+                    lists[token] = (
+                        np.concatenate([np.frombuffer(p.ts, dtype=np.float64) for p in parts]),
+                        np.concatenate([np.frombuffer(p.loc, dtype=np.uint64) for p in parts])
+                    )
+
+        weighted = []
+        for token, (ts, loc) in lists.items():
+            mask = np.ones(len(ts), dtype=bool)
+            if start is not None:
+                mask &= ts >= start
+            if end is not None:
+                mask &= ts <= end
+            if mask.any():
+                weighted.append((token, ts[mask], loc[mask]))
+
+        rare = [w for w in weighted if len(w[2]) <= n_lines / 2]
+        weighted = rare or weighted
+        if not weighted:
+            return {"logs_found": 0, "relevant_logs": [], "matched_tokens": []}
+
+        all_loc = np.concatenate([loc for _, _, loc in weighted])
+        all_ts = np.concatenate([ts for _, ts, _ in weighted])
+        all_w = np.concatenate([
+            np.full(len(loc), math.log(1 + n_lines / len(loc))) for _, _, loc in weighted
+        ])
+        uniq, inverse = np.unique(all_loc, return_inverse=True)
+        scores = np.bincount(inverse, weights=all_w)
+        newest = np.zeros(len(uniq))
+        np.maximum.at(newest, inverse, all_ts)
+
+        top = np.lexsort((-newest, -scores))[:limit]
+        return {
+            "logs_found": int(len(uniq)),
+            "relevant_logs": [self._read_line(int(uniq[i])) for i in top],
+            "matched_tokens": sorted(token for token, _, _ in weighted)
+        }
+
+    def _read_line(self, loc: int) -> str:
+        path = self._paths.get(loc >> 40)
+        offset = loc & ((1 << 40) - 1)
+        try:
+            with open(path, "rb") as fh:
+                fh.seek(offset)
+                return fh.readline(MAX_LINE).decode("utf-8", "replace").rstrip("\n")
+        except (OSError, TypeError):
+            return ""
+
+    def stats(self) -> Dict:
+        with self._lock:
+            postings = sum(len(p.loc) for bucket in self._buckets.values() for p in bucket.values())
+            tokens = sum(len(bucket) for bucket in self._buckets.values())
+        return {
+            "files": len(self._files),
+            "buckets": len(self._buckets),
+            "token_lists": tokens,
+            "postings": postings,
+            "lines_indexed": self.lines_indexed,
+            "bytes_scanned": self.bytes_scanned
+        }
+
+_index: Optional[LogIndex] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+def get_log_index() -> LogIndex:
+    global _index
+    if _index is None:
+        settings = get_settings()
+        _index = LogIndex(
+            settings.LOG_PATH,
+            bucket_s=settings.LOG_BUCKET_S,
+            retention_s=settings.LOG_RETENTION_H * 3600,
+            max_postings=settings.LOG_MAX_POSTINGS
+        )
+    return _index
+
+async def refresh_log_index() -> int:
+    return await asyncio.to_thread(get_log_index().refresh)
+
+async def watch_logs(interval_s: float):
+    while True:
+        try:
+            await refresh_log_index()
+        except Exception as e:
+            print(f"⚠️ LOG INDEX WARNING: {e}")
+        await asyncio.sleep(interval_s)
+
+async def ensure_log_index() -> LogIndex:
+    """The index, built on first use when the background indexer isn't running."""
+    index = get_log_index()
+    if _refresh_task is None and not index.lines_indexed:
+        await refresh_log_index()
+    return index
+
+def start_log_indexer():
+    global _refresh_task
+    if _refresh_task is None:
+        settings = get_settings()
+        _refresh_task = asyncio.create_task(watch_logs(settings.LOG_REFRESH_INTERVAL_S))
+        print(f"Logs: Indexing {settings.LOG_PATH} every {settings.LOG_REFRESH_INTERVAL_S}s")
+
+async def stop_log_indexer():
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        await asyncio.gather(_refresh_task, return_exceptions=True)
+        _refresh_task = None
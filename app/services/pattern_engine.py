@@ -0,0 +1,311 @@
+import asyncio
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+from uuid import UUID
+from sqlalchemy import bindparam, func, select, update
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.models import Pattern
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse, sre_constants
+
+logger = logging.getLogger(__name__)
+
+# Used until the patterns table has rows (see scripts/seed_patterns.py)
+DEFAULT_PATTERNS = [
+    {
+        "error_signature": "SSL_WEBHOOK",
+        "error_regex": "SSL.*webhook",
+        "solution_template": "Renew SSL certificate for webhook endpoint",
+        "success_rate": 0.94
+    },
+    {
+        "error_signature": "CHECKOUT_500",
+        "error_regex": "checkout.*500",
+        "solution_template": "Check payment processor configuration",
+        "success_rate": 0.89
+    },
+    {
+        "error_signature": "API_401",
+        "error_regex": "api.*401",
+        "solution_template": "Rotate API keys",
+        "success_rate": 0.92
+    },
+]
+
+MAX_LITERAL = 64
+
+def required_literals(regex: str) -> List[str]:
+    """
+    Literal runs (lowercased) that every match of `regex` must contain.
+    Empty when there isn't a useful one, e.g. a top-level alternation.
+    """
+    runs: List[str] = []
+    current: List[str] = []
+
+    def walk(items):
+        for op, av in items:
+            if op is sre_constants.LITERAL:
+                current.append(chr(av))
+            elif op is sre_constants.SUBPATTERN:
+                walk(av[-1])
+            else:
+                runs.append("".join(current))
+                current.clear()
+
+    try:
+        walk(sre_parse.parse(regex, re.IGNORECASE))
+    except Exception:
+        return []
+    runs.append("".join(current))
+    return sorted({run.lower()[:MAX_LITERAL] for run in runs if len(run) >= 2}, key=len, reverse=True)
+
+def trie_regex(literals: Iterable[str]) -> str:
+    """
+    One regex for a set of literals, factored as a trie so each position in
+    the text costs one walk down the trie rather than a try per literal.
+    Longer literals win at a given position.
+    """
+    trie: Dict[str, Any] = {}
+    for literal in literals:
+        node = trie
+        for ch in literal:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+@dataclass
+class CompiledPattern:
+    id: Optional[UUID]
+    signature: str
+    regex: re.Pattern
+    solution: Optional[str]
+    success_rate: float
+    literals: List[str]
+    updated_at: Optional[datetime] = None
+
+    def as_match(self) -> Dict[str, Any]:
+        return {
+            "id": str(self.id) if self.id else self.signature,
+            "signature": self.signature,
+            "regex": self.regex.pattern,
+            "solution": self.solution,
+            "success_rate": self.success_rate
+        }
+
+class PatternMatcher:
+    """
+    Immutable matcher over a set of compiled patterns.
+
+    Each pattern is keyed by one of its required literals, preferring the one
+    fewest other patterns share (then the longest). A single trie regex over
+    those literals scans the ticket once (as a lookahead, so overlapping
+    literals are all seen); only patterns whose literal occurs are verified
+    with their own regex. Patterns without a usable literal are always verified.
+    """
+
+    def __init__(self, patterns: List[CompiledPattern]):
+        self.patterns = patterns
+        self.by_literal: Dict[str, List[CompiledPattern]] = {}
+        self.always: List[CompiledPattern] = []
+
+        shared = Counter(lit for p in patterns for lit in p.literals)
+        for p in patterns:
+            if p.literals:
+                key = min(p.literals, key=lambda lit: (shared[lit], -len(lit)))
+                self.by_literal.setdefault(key, []).append(p)
+            else:
+                self.always.append(p)
+
+        literals = list(self.by_literal)
+        self.scanner = re.compile(f"(?=({trie_regex(literals)}))") if literals else None
+        # The scanner reports the longest literal at each position; shorter ones sharing that start come from here
+        self.prefixes = {
+            lit: [lit[:k] for k in range(2, len(lit) + 1) if lit[:k] in self.by_literal]
+            for lit in literals
+        }
+
+    def candidates(self, text: str) -> List[CompiledPattern]:
+        found: Set[str] = set()
+        if self.scanner is not None:
+            for m in self.scanner.finditer(text.lower()):
+                found.update(self.prefixes[m.group(1)])
+        return [p for lit in found for p in self.by_literal[lit]] + self.always
+
+    def match(self, text: str) -> List[CompiledPattern]:
+        hits = [p for p in self.candidates(text) if p.regex.search(text)]
+        hits.sort(key=lambda p: -p.success_rate)
+        return hits
+
+def compile_pattern(row: Dict[str, Any]) -> Optional[CompiledPattern]:
+    regex = row.get("error_regex") or re.escape(row.get("error_signature") or "")
+    if not regex:
+        return None
+    try:
+        compiled = re.compile(regex, re.IGNORECASE)
+    except re.error as e:
+        logger.warning(f"Skipping pattern {row.get('error_signature')}: invalid regex ({e})")
+        return None
+    return CompiledPattern(
+        id=row.get("id"),
+        signature=row.get("error_signature") or regex,
+        regex=compiled,
+        solution=row.get("solution_template"),
+        success_rate=float(row.get("success_rate") or 0.0),
+        literals=required_literals(regex),
+        updated_at=row.get("updated_at")
+    )
+
+class PatternEngine:
+    """
+    Pattern library loaded from the `patterns` table.
+
+    refresh() only fetches rows whose updated_at is past the last seen value
+    minus `overlap_s` (plus the id list, to notice deletions) and swaps in a
+    rebuilt matcher when anything changed. The overlap catches rows stamped
+    before the watermark but committed after the previous refresh; rows
+    re-read unchanged are skipped. Match counts are buffered and written
+    back as one batched UPDATE per flush.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, refresh_interval_s: float = 30.0,
+                 overlap_s: float = 120.0):
+        self.session_factory = session_factory
+        self.refresh_interval_s = refresh_interval_s
+        self.overlap = timedelta(seconds=overlap_s)
+        self._patterns: Dict[UUID, CompiledPattern] = {}
+        self._watermark: Optional[datetime] = None
+        self._loaded = False
+        self.matcher = self._default_matcher()
+        self._pending: Dict[UUID, List] = {}  # id -> [count, last_occurred]
+        self._refresh_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _default_matcher() -> PatternMatcher:
+        return PatternMatcher([p for p in map(compile_pattern, DEFAULT_PATTERNS) if p])
+
+    async def refresh(self) -> bool:
+        """Apply table changes since the last refresh; True if the matcher was rebuilt."""
+        async with self._refresh_lock:
+            async with self.session_factory() as session:
+                ids = set((await session.execute(select(Pattern.id))).scalars().all())
+                query = select(Pattern)
+                if self._watermark is not None:
+                    query = query.where(Pattern.updated_at >= self._watermark - self.overlap)
+                rows = (await session.execute(query)).scalars().all()
+
+            changed = False
+            for gone in set(self._patterns) - ids:
+                del self._patterns[gone]
+                changed = True
+            for row in rows:
+                known = self._patterns.get(row.id)
+                if known is not None and known.updated_at == row.updated_at:
+                    continue
+                compiled = compile_pattern({c.name: getattr(row, c.name) for c in Pattern.__table__.columns})
+                if compiled is not None:
+                    self._patterns[row.id] = compiled
+                    changed = True
+                if row.updated_at and (self._watermark is None or row.updated_at > self._watermark):
+                    self._watermark = row.updated_at
+
+            if changed or not self._loaded:
+                self.matcher = PatternMatcher(list(self._patterns.values())) if self._patterns else self._default_matcher()
+                logger.info(f"Pattern engine loaded {len(self.matcher.patterns)} patterns")
+            self._loaded = True
+            return changed
+
+    async def ensure_loaded(self):
+        if not self._loaded:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Pattern table unavailable ({e}); using built-in patterns")
+                self._loaded = True
+
+    def match(self, text: str) -> List[CompiledPattern]:
+        hits = self.matcher.match(text)
+        now = datetime.now(timezone.utc)
+        for p in hits:
+            if p.id is not None:
+                entry = self._pending.setdefault(p.id, [0, now])
+                entry[0] += 1
+                entry[1] = now
+        return hits
+
+    async def flush(self) -> int:
+        """Write buffered match counts to frequency/last_occurred in one batched statement."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        params = [{"pid": pid, "n": n, "ts": ts} for pid, (n, ts) in pending.items()]
+        table = Pattern.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("pid"))
+            .values(
+                frequency=func.coalesce(table.c.frequency, 0) + bindparam("n"),
+                last_occurred=bindparam("ts"),
+                # Counters aren't a definition change; keep them out of refresh()
+                updated_at=table.c.updated_at
+            )
+        )
+        try:
+            async with self.session_factory() as session:
+                await session.execute(stmt, params)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Pattern frequency flush failed: {e}")
+            for pid, (n, ts) in pending.items():
+                entry = self._pending.setdefault(pid, [0, ts])
+                entry[0] += n
+                entry[1] = max(entry[1], ts)
+            return 0
+        return len(params)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval_s)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Pattern refresh failed: {e}")
+            await self.flush()
+
+    async def start(self):
+        await self.ensure_loaded()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            print(f"✅ Pattern engine started ({len(self.matcher.patterns)} patterns, refresh every {self.refresh_interval_s}s)")
+
+    async def aclose(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+def build_pattern_engine() -> PatternEngine:
+    settings = get_settings()
+    return PatternEngine(refresh_interval_s=settings.PATTERN_REFRESH_INTERVAL_S,
+                         overlap_s=settings.PATTERN_REFRESH_OVERLAP_S)
+
+def get_pattern_engine() -> PatternEngine:
+    from app.core.registry import get_registry
+    return get_registry().get("pattern_engine")
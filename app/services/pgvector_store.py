@@ -0,0 +1,117 @@
+import logging
+from typing import Dict, List, Optional
+from sqlalchemy import select, delete, func, text
+from app.core.database import AsyncSessionLocal
+from app.core.models import DocumentationChunk
+
+logger = logging.getLogger(__name__)
+
+ANN_INDEXES = {
+    "hnsw": (
+        "CREATE INDEX IF NOT EXISTS ix_documentation_chunks_embedding_hnsw "
+        "ON documentation_chunks USING hnsw (embedding vector_cosine_ops) "
+        "WITH (m = {m}, ef_construction = {ef_construction})"
+    ),
+    "ivfflat": (
+        "CREATE INDEX IF NOT EXISTS ix_documentation_chunks_embedding_ivfflat "
+        "ON documentation_chunks USING ivfflat (embedding vector_cosine_ops) "
+        "WITH (lists = {lists})"
+    ),
+}
+
+class PgVectorStore:
+    """
+    Documentation corpus persisted in `documentation_chunks`.
+    Shared by every API worker; queried with pgvector's cosine operator.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    async def replace_corpus(self, chunks: List[Dict]) -> int:
+        """Swap the whole corpus in one transaction so readers never see a partial load."""
+        async with self.session_factory() as db:
+            await db.execute(delete(DocumentationChunk))
+            db.add_all([
+                DocumentationChunk(
+                    content=chunk["content"],
+                    embedding=chunk.get("embedding"),
+                    metadata_json={"chunk_id": chunk["id"]},
+                    source_url=chunk["source"]
+                )
+                for chunk in chunks
+            ])
+            await db.commit()
+        return len(chunks)
+
+    async def build_index(self, kind: str = "hnsw", lists: Optional[int] = None,
+                          m: int = 16, ef_construction: int = 64):
+        """
+        (Re)build the ANN index. IVFFlat clusters existing rows, so build it after loading.
+        """
+        if kind not in ANN_INDEXES:
+            raise ValueError(f"Unknown ANN index type: {kind}")
+
+        async with self.session_factory() as db:
+            if lists is None:
+                # pgvector guidance: rows / 1000 lists, at least 1
+                rows = await self.count(db)
+                lists = max(1, rows // 1000)
+
+            for other in ANN_INDEXES:
+                await db.execute(text(f"DROP INDEX IF EXISTS ix_documentation_chunks_embedding_{other}"))
+            await db.execute(text(ANN_INDEXES[kind].format(
+                lists=int(lists), m=int(m), ef_construction=int(ef_construction)
+            )))
+            await db.execute(text("ANALYZE documentation_chunks"))
+            await db.commit()
+
+    async def count(self, db=None) -> int:
+        if db is not None:
+            return (await db.execute(select(func.count(DocumentationChunk.id)))).scalar() or 0
+        async with self.session_factory() as db:
+            return await self.count(db)
+
+    async def search(self, query_embedding: List[float], top_k: int = 3) -> List[Dict]:
+        """Nearest chunks by cosine distance: one ORDER BY embedding <=> :q LIMIT k."""
+        distance = DocumentationChunk.embedding.cosine_distance(query_embedding)
+        stmt = (
+            select(DocumentationChunk, (1 - distance).label("score"))
+            .where(DocumentationChunk.embedding.is_not(None))
+            .order_by(distance)
+            .limit(top_k)
+        )
+        async with self.session_factory() as db:
+            result = await db.execute(stmt)
+            return [self._to_result(chunk, score) for chunk, score in result.all()]
+
+    async def keyword_search(self, query: str, top_k: int = 3) -> List[Dict]:
+        """Full-text fallback used when the query can't be embedded."""
+        document = func.to_tsvector("english", DocumentationChunk.content)
+        ts_query = func.plainto_tsquery("english", query)
+        rank = func.ts_rank(document, ts_query)
+        stmt = (
+            select(DocumentationChunk, rank.label("score"))
+            .order_by(rank.desc())
+            .limit(top_k)
+        )
+        async with self.session_factory() as db:
+            result = await db.execute(stmt)
+            return [self._to_result(chunk, score) for chunk, score in result.all()]
+
+    @staticmethod
+    def _to_result(chunk: DocumentationChunk, score) -> Dict:
+        return {
+            "id": (chunk.metadata_json or {}).get("chunk_id", str(chunk.id)),
+            "content": chunk.content,
+            "score": float(score or 0.0),
+            "source": chunk.source_url
+        }
+
+_store: Optional[PgVectorStore] = None
+
+def get_pgvector_store() -> PgVectorStore:
+    global _store
+    if _store is None:
+        _store = PgVectorStore()
+    return _store
@@ -1,169 +1,372 @@
 import os
 import json
-from typing import List, Dict, Any
+import hashlib
+from dataclasses import dataclass
+from typing import List, Dict, Any, Iterable, Optional
 from sqlalchemy.orm import Session
 # from app.core.database import get_db, SessionLocal # Unused in fallback mode
 import glob
 import asyncio
-from app.core.llm import embed_text
+import concurrent.futures
+from app.core.config import get_settings
+from app.core.embedding_cache import get_embedding_cache
+from app.core.llm import aembed_text, embed_texts
+from app.services.hybrid_retriever import hybrid_search
+from app.services.keyword_index import KeywordIndex
+from app.services.pgvector_store import get_pgvector_store
+from app.services.vector_index import VectorIndex
 
-# Fallback in-memory storage for hackathon (switch to DB if time permits)
-_doc_chunks = []
+settings = get_settings()
 
-def ingest_docs(docs_path: str = "./data/docs"):
+# Fallback in-memory storage for hackathon (switch to DB if time permits)
+@dataclass(frozen=True)
+class Corpus:
     """
-    Read markdown files, chunk by H2 headers, embed, store in memory.
-    For hackathon: In-memory is faster than DB writes. Scale to pgvector if needed.
+    Immutable snapshot of the in-memory corpus.
+    Ingest builds a new one and swaps the module reference, so readers that
+    grabbed the old snapshot never see a half-built corpus.
     """
-    global _doc_chunks
-    
+    chunks: List[Dict]
+    index: VectorIndex
+    keywords: KeywordIndex
+    version: str  # Fingerprint of chunk hashes and which are embedded; changes whenever either does
+
+    @classmethod
+    def build(cls, chunks: List[Dict]) -> "Corpus":
+        fingerprint = hashlib.sha256("".join(
+            c["hash"] + ("" if c["embedding"] is not None else "-") for c in chunks
+        ).encode()).hexdigest()[:16]
+        return cls(
+            chunks=chunks,
+            index=VectorIndex.from_chunks(chunks),
+            keywords=KeywordIndex([c["content"] for c in chunks]),
+            version=fingerprint
+        )
+
+@dataclass
+class _FileState:
+    mtime: float
+    size: int
+    sha256: str
+    chunks: List[Dict]
+
+_corpus: Optional[Corpus] = None  # None until first ingest
+_file_states: Dict[str, _FileState] = {}
+_ingest_lock = asyncio.Lock()
+_watch_task: Optional[asyncio.Task] = None
+_first_ingest: Optional[asyncio.Task] = None
+
+SAMPLE_DOC = """## Webhook SSL Configuration
+When migrating to headless, SSL certificates must be renewed.
+Error: SSLHandshakeError indicates certificate mismatch.
+Fix: Renew cert at Settings > Webhooks > Advanced."""
+
+def _ensure_docs_path(docs_path: str):
     if not os.path.exists(docs_path):
         # Create sample docs if folder doesn't exist
         os.makedirs(docs_path, exist_ok=True)
         with open(f"{docs_path}/webhooks.md", "w") as f:
-            f.write("""## Webhook SSL Configuration
-When migrating to headless, SSL certificates must be renewed.
-Error: SSLHandshakeError indicates certificate mismatch.
-Fix: Renew cert at Settings > Webhooks > Advanced.""")
+            f.write(SAMPLE_DOC)
 
-    _doc_chunks = []  # Reset
-    
-    for md_file in glob.glob(f"{docs_path}/*.md"):
+def split_section(body: str, max_chars: int) -> List[str]:
+    """
+    Split a section body into parts of at most max_chars, on paragraph
+    breaks, then line breaks, then hard cuts for a single overlong line.
+    """
+    if len(body) <= max_chars:
+        return [body]
+    parts, current = [], ""
+    pieces = [p for para in body.split("\n\n") for p in ([para] if len(para) <= max_chars else para.split("\n"))]
+    for piece in pieces:
+        while len(piece) > max_chars:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(piece[:max_chars])
+            piece = piece[max_chars:]
+        sep = "\n\n" if current else ""
+        if len(current) + len(sep) + len(piece) > max_chars:
+            parts.append(current)
+            current, sep = "", ""
+        current += sep + piece
+    if current.strip():
+        parts.append(current)
+    return [p for p in parts if p.strip()]
+
+def chunk_markdown(md_file: str, content: str) -> List[Dict]:
+    """
+    Split one markdown file into chunks on H2 headers (no embeddings).
+    Long sections become several chunks (each led by the section title)
+    instead of being cut off, so nothing past the limit is lost.
+    """
+    chunks = []
+    sections = content.split('## ')
+    for section in sections[1:]:  # Skip first (usually title)
+        lines = section.strip().split('\n')
+        title = lines[0]
+        body = '\n'.join(lines[1:])
+
+        parts = split_section(body, max(settings.RAG_CHUNK_MAX_CHARS - len(title) - 1, 200))
+        for n, part in enumerate(parts, start=1):
+            chunk_text = f"{title}\n{part}"
+            chunks.append({
+                "id": f"{os.path.basename(md_file)}_{title[:20]}" + (f"#{n}" if n > 1 else ""),
+                "content": chunk_text,
+                "source": md_file,
+                "hash": hashlib.sha256(chunk_text.encode("utf-8")).hexdigest(),
+                "text": chunk_text  # Embedded then dropped
+            })
+    return chunks
+
+def iter_doc_chunks(docs_path: str = "./data/docs"):
+    """
+    Read markdown files and yield chunks split on H2 headers (no embeddings).
+    """
+    _ensure_docs_path(docs_path)
+
+    for md_file in sorted(glob.glob(f"{docs_path}/*.md")):
         try:
             with open(md_file, 'r', encoding='utf-8') as f:
                 content = f.read()
-                
-            # Simple chunking by H2 headers
-            sections = content.split('## ')
-            for section in sections[1:]:  # Skip first (usually title)
-                lines = section.strip().split('\n')
-                title = lines[0]
-                body = '\n'.join(lines[1:])
-                
-                chunk_text = f"{title}\n{body}"
-                
-                try:
-                    # Generate embedding
-                    embedding = embed_text(chunk_text)
-                    
-                    _doc_chunks.append({
-                        "id": f"{os.path.basename(md_file)}_{title[:20]}",
-                        "content": chunk_text[:1000],  # Limit size
-                        "embedding": embedding,
-                        "source": md_file
-                    })
-                except Exception as e:
-                    print(f"Warning: Could not embed chunk: {e}")
-                    # Add without embedding as fallback
-                    _doc_chunks.append({
-                        "id": f"{os.path.basename(md_file)}_{title[:20]}",
-                        "content": chunk_text[:1000],
-                        "embedding": None,
-                        "source": md_file
-                    })
         except Exception as e:
             print(f"Error reading file {md_file}: {e}")
-    
-    print(f"RAG: Ingested {len(_doc_chunks)} chunks from {docs_path}")
-    return len(_doc_chunks)
+            continue
+        yield from chunk_markdown(md_file, content)
 
-def cosine_similarity(vec1, vec2):
-    """Calculate cosine similarity between two vectors"""
-    if vec1 is None or vec2 is None:
-        return 0.0
-    
-    dot_product = sum(a * b for a, b in zip(vec1, vec2))
-    magnitude1 = sum(a * a for a in vec1) ** 0.5
-    magnitude2 = sum(a * a for b in vec2) ** 0.5
-    
-    if magnitude1 == 0 or magnitude2 == 0:
-        return 0.0
-    
-    return dot_product / (magnitude1 * magnitude2)
+async def embed_chunks(chunks: Iterable[Dict]) -> List[Dict]:
+    """
+    Stream chunks through the batched embedder, one window of
+    batch_size * concurrency chunks at a time.
+    Chunks whose batch fails keep embedding=None (keyword fallback).
+    """
+    window_size = settings.EMBED_BATCH_SIZE * settings.EMBED_CONCURRENCY
+    embedded = []
+    window = []
 
-def keyword_score(query: str, content: str) -> float:
-    """Simple keyword matching score"""
-    query_words = set(query.lower().split())
-    content_words = set(content.lower().split())
-    
-    if not query_words:
-        return 0.0
-    
-    matches = len(query_words.intersection(content_words))
-    return matches / len(query_words)
+    async def flush():
+        vectors = await embed_texts([c.pop("text", c["content"]) for c in window], call_site="rag_ingest")
+        for chunk, vector in zip(window, vectors):
+            chunk["embedding"] = vector
+        embedded.extend(window)
+        window.clear()
+
+    for chunk in chunks:
+        window.append(chunk)
+        if len(window) >= window_size:
+            await flush()
+    if window:
+        await flush()
+
+    missing = sum(1 for c in embedded if c["embedding"] is None)
+    if missing:
+        print(f"Warning: Could not embed {missing} chunks")
+    return embedded
+
+def _scan_changes(docs_path: str):
+    """
+    Compare data/docs against the last ingest.
+    Returns (new file states, chunks that need embedding, whether anything changed).
+    mtime+size short-circuits the read; the content hash decides whether to re-chunk.
+    A file with chunks whose embedding failed last time counts as changed,
+    so those chunks are retried on every scan until they embed.
+    """
+    _ensure_docs_path(docs_path)
+
+    states: Dict[str, _FileState] = {}
+    to_embed: List[Dict] = []
+    changed = False
+
+    for md_file in sorted(glob.glob(f"{docs_path}/*.md")):
+        previous = _file_states.get(md_file)
+        incomplete = previous is not None and any(c["embedding"] is None for c in previous.chunks)
+        try:
+            stat = os.stat(md_file)
+            if previous and not incomplete and previous.mtime == stat.st_mtime and previous.size == stat.st_size:
+                states[md_file] = previous
+                continue
+            with open(md_file, 'rb') as f:
+                raw = f.read()
+        except Exception as e:
+            print(f"Error reading file {md_file}: {e}")
+            continue
+
+        digest = hashlib.sha256(raw).hexdigest()
+        if previous and not incomplete and previous.sha256 == digest:
+            # Touched but identical: keep chunks, remember the new mtime
+            states[md_file] = _FileState(stat.st_mtime, stat.st_size, digest, previous.chunks)
+            continue
+
+        changed = True
+        # Reuse embeddings of sections whose text didn't change
+        known = {c["hash"]: c for c in previous.chunks} if previous else {}
+        chunks = []
+        for chunk in chunk_markdown(md_file, raw.decode("utf-8")):
+            old = known.get(chunk["hash"])
+            if old is not None and old["embedding"] is not None:
+                chunk.pop("text")
+                chunk["embedding"] = old["embedding"]
+            else:
+                to_embed.append(chunk)
+            chunks.append(chunk)
+        states[md_file] = _FileState(stat.st_mtime, stat.st_size, digest, chunks)
 
-def keyword_retrieval(query: str, top_k: int = 3) -> List[Dict]:
-    """Pure keyword fallback"""
-    global _doc_chunks
+    if set(states) != set(_file_states):
+        changed = True  # Files added or removed
+    return states, to_embed, changed
+
+async def aingest_docs(docs_path: str = "./data/docs", force: bool = False):
+    """
+    Read markdown files, chunk by H2 headers, embed, store in memory.
+    Incremental: only sections whose content changed since the last ingest
+    are re-embedded, and the corpus is swapped in one assignment.
+    For the shared pgvector corpus use scripts/build_doc_index.py instead.
+    """
+    global _corpus, _file_states
     
-    scored = []
-    for chunk in _doc_chunks:
-        score = keyword_score(query, chunk["content"])
-        scored.append((score, chunk))
+    async with _ingest_lock:
+        if force:
+            _file_states = {}
+        states, to_embed, changed = _scan_changes(docs_path)
+
+        if not changed and _corpus is not None:
+            _file_states = states
+            return len(_corpus.chunks)
+
+        await embed_chunks(to_embed)  # Fills chunk["embedding"] in place
+
+        chunks = [chunk for state in states.values() for chunk in state.chunks]
+        _corpus = Corpus.build(chunks)
+        _file_states = states
     
-    scored.sort(reverse=True, key=lambda x: x[0])
+    print(f"RAG: Ingested {len(chunks)} chunks from {docs_path} ({len(to_embed)} embedded, version {_corpus.version})")
+    cache = get_embedding_cache()
+    if cache is not None:
+        print(f"RAG: Embedding cache {cache.stats()}")
+    return len(chunks)
+
+def ingest_docs(docs_path: str = "./data/docs", force: bool = False):
+    """Synchronous entry point for scripts and module load."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(aingest_docs(docs_path, force))
+    # Called from inside a running loop (e.g. uvicorn importing the app)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, aingest_docs(docs_path, force)).result()
+
+def get_corpus() -> Optional[Corpus]:
+    return _corpus
+
+async def ensure_corpus():
+    """
+    Wait for the first ingest, started once as its own task. Callers wrap
+    retrieval in short timeouts; shielding means a timed-out caller only
+    stops waiting, and the ingest carries on for the next query.
+    """
+    global _first_ingest
+    if _corpus is not None:
+        return
+    if _first_ingest is None or (_first_ingest.done() and _first_ingest.exception() is not None):
+        _first_ingest = asyncio.create_task(aingest_docs())  # retried on next use if it failed
+    await asyncio.shield(_first_ingest)
+
+async def watch_docs(docs_path: str = "./data/docs", interval_s: float = 5.0):
+    """Poll data/docs and re-ingest incrementally when files change."""
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await aingest_docs(docs_path)
+        except Exception as e:
+            print(f"⚠️ RAG watcher warning: {e}")
+
+def start_docs_watcher(docs_path: str = "./data/docs"):
+    global _watch_task
+    if _watch_task is None:
+        _watch_task = asyncio.create_task(watch_docs(docs_path, settings.RAG_WATCH_INTERVAL_S))
+        print(f"RAG: Watching {docs_path} every {settings.RAG_WATCH_INTERVAL_S}s")
+
+async def stop_docs_watcher():
+    global _watch_task
+    if _watch_task is not None:
+        _watch_task.cancel()
+        await asyncio.gather(_watch_task, return_exceptions=True)
+        _watch_task = None
+
+def keyword_retrieval(query: str, top_k: int = 3, corpus: Optional[Corpus] = None) -> List[Dict]:
+    """Pure keyword fallback: BM25 over the corpus inverted index"""
+    corpus = corpus or _corpus
+    if corpus is None:
+        return []
     
     return [
         {
-            "id": chunk["id"],
-            "content": chunk["content"],
+            "id": corpus.chunks[pos]["id"],
+            "content": corpus.chunks[pos]["content"],
             "score": score,
-            "source": chunk["source"]
+            "source": corpus.chunks[pos]["source"]
         }
-        for score, chunk in scored[:top_k]
+        for score, pos in corpus.keywords.search(query, top_k)
     ]
 
+def _hybrid_params(top_k: int) -> Dict:
+    return {
+        "top_k": top_k,
+        "dense_k": max(top_k, settings.RAG_DENSE_TOP_K),
+        "sparse_k": max(top_k, settings.RAG_SPARSE_TOP_K),
+        "dense_budget_ms": settings.RAG_DENSE_BUDGET_MS,
+        "rrf_k": settings.RAG_RRF_K,
+    }
+
+async def pgvector_retrieval(query: str, top_k: int = 3) -> List[Dict]:
+    """Hybrid retrieval from the shared documentation_chunks table."""
+    store = get_pgvector_store()
+    found: Dict[str, Dict] = {}
+
+    async def dense(q: str, k: int) -> List[str]:
+        query_embedding = await aembed_text(q, call_site="rag_query")
+        results = await store.search(query_embedding, k)
+        found.update((r["id"], r) for r in results)
+        return [r["id"] for r in results]
+
+    async def sparse(q: str, k: int) -> List[str]:
+        results = await store.keyword_search(q, k)
+        found.update((r["id"], r) for r in results)
+        return [r["id"] for r in results]
+
+    fused = await hybrid_search(query, dense, sparse, **_hybrid_params(top_k))
+    return [{**found[chunk_id], "score": score} for score, chunk_id in fused]
+
 async def retrieve_context(query: str, top_k: int = 3) -> List[Dict]:
     """
     Retrieve relevant documentation chunks for a query.
-    Uses embedding similarity if available, keyword fallback if not.
-    Async wrapper for compatibility.
+    Dense (vector index) and sparse (BM25) retrieval run concurrently and are
+    fused with reciprocal rank fusion; `score` is the fused RRF score.
+    A slow or failed embedding call degrades to sparse-only results.
     """
-    global _doc_chunks
-    
-    # Lazy load if empty
-    if not _doc_chunks:
-        ingest_docs()
+    if settings.RAG_BACKEND == "pgvector":
+        return await pgvector_retrieval(query, top_k)
     
-    try:
-        # Get query embedding
-        # Run in thread/executor if needed, but for hackathon sync is fine for this call
-        # or await to_thread if strictly async needed
-        query_embedding = embed_text(query)
-        
-        # Score all chunks
-        scored_chunks = []
-        for chunk in _doc_chunks:
-            if chunk["embedding"]:
-                score = cosine_similarity(query_embedding, chunk["embedding"])
-            else:
-                # Fallback: keyword matching
-                score = keyword_score(query, chunk["content"])
-            
-            scored_chunks.append((score, chunk))
-        
-        # Sort by score descending
-        scored_chunks.sort(reverse=True, key=lambda x: x[0])
-        
-        # Return top_k
-        return [
-            {
-                "id": chunk["id"],
-                "content": chunk["content"],
-                "score": score,
-                "source": chunk["source"]
-            }
-            for score, chunk in scored_chunks[:top_k]
-        ]
-        
-    except Exception as e:
-        print(f"RAG Error: {e}, using keyword fallback")
-        # Emergency fallback
-        return keyword_retrieval(query, top_k)
-
-# Initialize on module load
-try:
-    ingest_docs()
-    print("✅ RAG Engine initialized")
-except Exception as e:
-    print(f"⚠️ RAG init warning (non-critical): {e}")
+    # Lazy load on first use (an empty docs folder is still a loaded corpus)
+    await ensure_corpus()
+    # One snapshot for the whole query, even if ingest swaps mid-way
+    corpus = _corpus
+    chunks = corpus.chunks
+
+    async def dense(q: str, k: int) -> List[int]:
+        # Same embedding provider as the ingested chunks
+        query_embedding = await aembed_text(q, call_site="rag_query")
+        return [pos for _, pos in corpus.index.search(query_embedding, k)]
+
+    async def sparse(q: str, k: int) -> List[int]:
+        return [pos for _, pos in corpus.keywords.search(q, k)]
+
+    fused = await hybrid_search(query, dense, sparse, **_hybrid_params(top_k))
+    return [
+        {
+            "id": chunks[pos]["id"],
+            "content": chunks[pos]["content"],
+            "score": score,
+            "source": chunks[pos]["source"]
+        }
+        for score, pos in fused
+    ]
@@ -0,0 +1,71 @@
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+class VectorIndex:
+    """
+    Brute-force cosine index over chunk embeddings.
+    Rows are L2-normalized once at build time and kept in one contiguous
+    float32 matrix, so a query is a single matrix-vector product.
+    """
+
+    def __init__(self, matrix: np.ndarray, positions: np.ndarray, missing: Optional[List[int]] = None):
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.positions = np.asarray(positions, dtype=np.int64)  # row -> position in the chunk list
+        self.missing = missing or []  # chunk positions that have no embedding
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, positions: Optional[Sequence[int]] = None,
+                    copy: bool = True) -> "VectorIndex":
+        """Build from an (n, dim) array. With copy=False a float32 input is normalized in place."""
+        matrix = np.array(matrix, dtype=np.float32, copy=copy)
+        # Normalize in row blocks to keep peak memory near one matrix
+        for start in range(0, len(matrix), 65536):
+            block = matrix[start:start + 65536]
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0  # zero vectors stay zero and score 0.0
+            block /= norms
+        if positions is None:
+            positions = np.arange(len(matrix))
+        return cls(matrix, positions)
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Dict]) -> "VectorIndex":
+        rows, positions, missing = [], [], []
+        for pos, chunk in enumerate(chunks):
+            if chunk.get("embedding"):
+                rows.append(chunk["embedding"])
+                positions.append(pos)
+            else:
+                missing.append(pos)
+
+        if rows:
+            index = cls.from_matrix(np.array(rows, dtype=np.float32), positions)
+        else:
+            index = cls(np.zeros((0, 0), dtype=np.float32), [])
+        index.missing = missing
+        return index
+
+    def __len__(self):
+        return len(self.positions)
+
+    def search(self, query_embedding: Sequence[float], top_k: int = 3) -> List[Tuple[float, int]]:
+        """Return up to top_k (score, chunk position) pairs, best first."""
+        if len(self) == 0 or top_k <= 0:
+            return []
+
+        q = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm == 0:
+            return []
+
+        scores = self.matrix @ (q / norm)
+
+        k = min(top_k, len(scores))
+        if k < len(scores):
+            rows = np.argpartition(-scores, k - 1)[:k]
+        else:
+            rows = np.arange(len(scores))
+
+        # Score descending, then chunk position ascending (stable like list.sort)
+        rows = rows[np.lexsort((self.positions[rows], -scores[rows]))]
+        return [(float(scores[r]), int(self.positions[r])) for r in rows]
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# component -> {"status": pending|warming|retrying|ready|failed|lazy, "seconds": float, "error": str, "attempts": int}
+_components: Dict[str, Dict] = {}
+_warmup_task: Optional[asyncio.Task] = None
+
+async def _warm_rag():
+    if settings.RAG_BACKEND == "memory":
+        from app.services.rag_engine import aingest_docs
+        await aingest_docs()
+
+async def _warm_classifier():
+    from app.core.registry import get_registry
+    get_registry().get("classifier")
+
+async def _warm_diagnostician():
+    from agents.diagnostician.agent import get_diagnostician
+    get_diagnostician()
+
+WARMUP_STEPS = {
+    "rag": _warm_rag,
+    "classifier": _warm_classifier,
+    "diagnostician": _warm_diagnostician,
+}
+
+async def _run_step(name: str):
+    attempts = _components.get(name, {}).get("attempts", 0) + 1
+    _components[name] = {"status": "warming" if attempts == 1 else "retrying", "attempts": attempts}
+    start = time.perf_counter()
+    try:
+        await WARMUP_STEPS[name]()
+        _components[name] = {"status": "ready", "seconds": round(time.perf_counter() - start, 3), "attempts": attempts}
+    except Exception as e:
+        logger.error(f"Warm-up of {name} failed (attempt {attempts}): {e}")
+        _components[name] = {"status": "failed", "error": str(e), "attempts": attempts}
+
+def _failed():
+    return [name for name, c in _components.items() if c["status"] == "failed"]
+
+async def warm_up():
+    for name in WARMUP_STEPS:
+        await _run_step(name)
+    if _failed():
+        print(f"⚠️ Warm-up incomplete, retrying {_failed()} in the background: {readiness()['components']}")
+    else:
+        print(f"✅ Warm-up complete: {readiness()['components']}")
+
+async def _retry_failed():
+    """Re-run failed steps with exponential backoff until they all load."""
+    delay = settings.WARMUP_RETRY_INITIAL_S
+    while _failed():
+        await asyncio.sleep(delay)
+        for name in _failed():
+            await _run_step(name)
+        delay = min(delay * 2, settings.WARMUP_RETRY_MAX_S)
+    print(f"✅ Warm-up complete after retries: {readiness()['components']}")
+
+async def _warm_up_and_retry():
+    await warm_up()
+    await _retry_failed()
+
+async def start_warmup():
+    """
+    WARMUP_MODE:
+      eager      - load everything before the server accepts requests
+      background - accept requests immediately, load in a task (readiness reports progress)
+      lazy       - load on first use only
+    """
+    global _warmup_task
+    mode = settings.WARMUP_MODE
+    for name in WARMUP_STEPS:
+        _components[name] = {"status": "lazy" if mode == "lazy" else "pending"}
+
+    if mode == "eager":
+        await warm_up()
+        if _failed():
+            _warmup_task = asyncio.create_task(_retry_failed())
+    elif mode == "background":
+        _warmup_task = asyncio.create_task(_warm_up_and_retry())
+
+async def stop_warmup():
+    global _warmup_task
+    if _warmup_task is not None:
+        _warmup_task.cancel()
+        await asyncio.gather(_warmup_task, return_exceptions=True)
+        _warmup_task = None
+
+def readiness() -> Dict:
+    """
+    Ready once no component is still loading. A failed component doesn't
+    hold readiness back: like lazy mode it loads on first use (and is
+    retried in the background), so it is only reported in the body.
+    """
+    ready = all(c["status"] in ("ready", "lazy", "failed", "retrying") for c in _components.values())
+    return {"ready": ready, "mode": settings.WARMUP_MODE, "components": dict(_components)}
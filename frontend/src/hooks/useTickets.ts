@@ -2,6 +2,7 @@ import { useQuery } from '@tanstack/react-query';
 import { api } from '@/lib/api';
 import { Ticket } from '@/types';
 import { useAppStore } from '@/lib/store';
+import { sse } from '@/lib/sse';
 import { useEffect } from 'react';
 
 export const useTickets = () => {
@@ -13,9 +14,12 @@ export const useTickets = () => {
             const res = await api.get<Ticket[]>('/tickets');
             return res.data; // Assuming backend returns [Ticket] directly or { data: [] }
         },
-        refetchInterval: 5000,
+        // Live changes arrive over SSE; this slow poll only backs it up
+        refetchInterval: 30000,
     });
 
+    useEffect(() => sse.on('resync', () => { query.refetch(); }), [query.refetch]);
+
     useEffect(() => {
         if (query.data) {
             // Only update if different? store handles it
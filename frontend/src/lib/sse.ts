@@ -1,31 +1,61 @@
 import { useAppStore } from './store';
 
+type Listener = (payload: any) => void;
+
 class SSEManager {
     private eventSource: EventSource | null = null;
     private reconnectAttempts = 0;
-    private maxReconnect = 5;
+    // Keep retrying forever (a dropped stream freezes the dashboard), backing off up to this delay
+    private maxReconnectDelayMs = 30000;
+    private reconnectTimer: ReturnType<typeof setTimeout> | null = null;
     private url: string = '';
+    // Resume point after a reconnect (the server replays what we missed)
+    private lastEventId = '';
+    private listeners: Record<string, Set<Listener>> = {};
+
+    // Subscribe to 'metrics' deltas or 'resync' requests; returns an unsubscribe function
+    on(type: 'metrics' | 'resync', listener: Listener) {
+        (this.listeners[type] ??= new Set()).add(listener);
+        return () => { this.listeners[type]?.delete(listener); };
+    }
+
+    private emit(type: string, payload: any) {
+        this.listeners[type]?.forEach(listener => listener(payload));
+    }
 
     connect(url: string) {
         this.url = url;
-        // Close existing connection if any
-        if (this.eventSource) {
-            this.eventSource.close();
-        }
+        // Close existing connection (or pending retry) if any
+        this.disconnect();
 
-        this.eventSource = new EventSource(url);
+        const resumeUrl = this.lastEventId
+            ? `${url}${url.includes('?') ? '&' : '?'}last_event_id=${encodeURIComponent(this.lastEventId)}`
+            : url;
+        this.eventSource = new EventSource(resumeUrl);
 
         this.eventSource.onopen = () => {
             console.log("SSE Connected");
+            if (this.reconnectAttempts > 0) {
+                // Metric deltas sent while we were away are gone; refetch the snapshot
+                this.emit('resync', null);
+            }
             this.reconnectAttempts = 0;
         };
 
         this.eventSource.onmessage = (e) => {
             try {
                 const data = JSON.parse(e.data);
+                if (e.lastEventId) {
+                    this.lastEventId = e.lastEventId;
+                }
                 // Handle different event types if structure exists, else assume Ticket
                 // For Hackathon, assuming loose protocol
-                if (data.type === 'ticket_update') {
+                if (data.type === 'metrics' || data.type === 'resync') {
+                    this.emit(data.type, data.payload);
+                } else if (data.payload?.truncated) {
+                    // Relayed from another worker without the full ticket; the next refetch brings it
+                    return;
+                } else if (data.type === 'ticket_update') {
                     useAppStore.getState().updateTicket(data.payload);
                 } else if (data.type === 'new_ticket') {
                     useAppStore.getState().addTicket(data.payload);
@@ -41,15 +71,17 @@ class SSEManager {
         this.eventSource.onerror = () => {
             console.error("SSE Error");
             this.eventSource?.close();
-            if (this.reconnectAttempts < this.maxReconnect) {
-                const timeout = 2000 * Math.pow(1.5, this.reconnectAttempts);
-                setTimeout(() => this.connect(this.url), timeout);
-                this.reconnectAttempts++;
-            }
+            const timeout = Math.min(2000 * Math.pow(1.5, this.reconnectAttempts), this.maxReconnectDelayMs);
+            this.reconnectTimer = setTimeout(() => this.connect(this.url), timeout);
+            this.reconnectAttempts++;
         };
     }
 
     disconnect() {
+        if (this.reconnectTimer) {
+            clearTimeout(this.reconnectTimer);
+            this.reconnectTimer = null;
+        }
         this.eventSource?.close();
         this.eventSource = null;
     }
@@ -2,6 +2,8 @@ import { useState, useEffect } from 'react';
 import { useTickets } from '@/hooks/useTickets';
 import { useDiagnosis } from '@/hooks/useDiagnosis';
 import { useAppStore } from '@/lib/store';
+import { sse } from '@/lib/sse';
+import { API_BASE_URL } from '@/lib/api';
 import { AreaChart, Area, ResponsiveContainer } from 'recharts';
 import { Ticket } from '@/types';
 import AgentErrorBoundary from '@/components/AgentErrorBoundary';
@@ -39,11 +41,11 @@ export const Dashboard = () => {
     // Mock data for the brainwave chart
     const [chartData, setChartData] = useState<{ value: number }[]>([]);
 
-    // Poll metrics every 3 seconds
+    // Fetch metrics once, then apply the deltas pushed over SSE
     useEffect(() => {
         const fetchMetrics = async () => {
             try {
-                const response = await fetch('/api/v1/metrics');
+                const response = await fetch(`${API_BASE_URL}/metrics`);
                 if (response.ok) {
                     const data = await response.json();
                     setMetrics(data);
@@ -54,9 +56,15 @@ export const Dashboard = () => {
         };
 
         fetchMetrics(); // Initial fetch
-        const metricsInterval = setInterval(fetchMetrics, 3000);
-
-        return () => clearInterval(metricsInterval);
+        const offMetrics = sse.on('metrics', (delta) => setMetrics(prev => ({ ...prev, ...delta })));
+        const offResync = sse.on('resync', fetchMetrics);
+        sse.connect(`${API_BASE_URL}/events/stream`);
+
+        return () => {
+            offMetrics();
+            offResync();
+            sse.disconnect();
+        };
     }, []);
 
     useEffect(() => {
@@ -13,7 +13,7 @@ export interface Ticket {
     merchantAvatar?: string;
     classification: 'API_ERROR' | 'CONFIG_ERROR' | 'WEBHOOK_FAIL' | 'CHECKOUT_BREAK' | 'DOCS_CONFUSION' | 'UNKNOWN';
     confidence: number;
-    status: 'open' | 'analyzing' | 'resolved' | 'escalated' | 'diagnosed';
+    status: 'open' | 'analyzing' | 'resolved' | 'escalated' | 'diagnosed' | 'failed';
     priority: number; // 1-10
     rawText: string;
     createdAt: string;
@@ -0,0 +1,67 @@
+"""
+Cold-start benchmark: time from launching uvicorn to the first served request.
+
+Starts the API once per WARMUP_MODE and reports:
+  - first response : first 200 from /api/v1/health/live
+  - ready          : first 200 from /api/v1/health/ready (needs the database)
+
+Usage:
+    python scripts/bench_cold_start.py
+    python scripts/bench_cold_start.py --modes eager,background --runs 3
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import requests
+
+def wait_for(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(url, timeout=0.5).status_code == 200:
+                return time.perf_counter()
+        except requests.RequestException:
+            pass
+        time.sleep(0.05)
+    return None
+
+def measure(mode, port, timeout):
+    env = dict(os.environ, WARMUP_MODE=mode)
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        base = f"http://127.0.0.1:{port}/api/v1/health"
+        live = wait_for(f"{base}/live", start + timeout)
+        ready = wait_for(f"{base}/ready", start + timeout) if live else None
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+    fmt = lambda t: f"{t - start:8.2f}s" if t else f"{'timeout':>9}"
+    return fmt(live), fmt(ready)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", default="eager,background,lazy")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12} | {'run':>3} | {'first response':>14} | {'ready':>9}")
+    print("-" * 48)
+    for mode in args.modes.split(","):
+        for run in range(1, args.runs + 1):
+            live, ready = measure(mode, args.port, args.timeout)
+            print(f"{mode:<12} | {run:>3} | {live:>14} | {ready}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Per-request cost of building components vs. resolving them from the registry.
+
+"construct" repeats what the request and intake paths used to do per
+ticket: a new TicketClassifier, GeminiADKClient and DiagnosticianAgent, plus
+the GenerativeModel the agent used to create through get_model. "registry"
+resolves the shared classifier and diagnostician instead. Allocation is
+measured with tracemalloc; no network calls are made.
+
+Usage:
+    python scripts/bench_components.py
+    python scripts/bench_components.py --requests 5000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+sys.path.append(os.getcwd())
+warnings.filterwarnings("ignore")
+
+import google.generativeai as genai
+from agents.diagnostician.agent import DiagnosticianAgent
+from app.core.llm import DEFAULT_MODEL
+from app.core.registry import ComponentRegistry, get_registry
+from app.services.agent_runner import GeminiADKClient
+from app.services.classifier import TicketClassifier
+
+def construct():
+    TicketClassifier()
+    GeminiADKClient()
+    DiagnosticianAgent()
+    genai.GenerativeModel(DEFAULT_MODEL)
+
+def resolve(registry: ComponentRegistry):
+    registry.get("classifier")
+    registry.get("diagnostician")
+
+def measure(label, fn, n):
+    fn()  # first call pays one-off imports and registry builds
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    allocated = sum(stat.size for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    print(f"{label:<10} | {elapsed / n * 1e6:10.1f}us | {peak / 1024:9.1f} KiB | {allocated / 1024:9.1f} KiB")
+    return elapsed / n
+
+def main(args):
+    registry = get_registry()
+    print(f"{args.requests} simulated requests\n")
+    print(f"{'path':<10} | {'per request':>12} | {'peak heap':>13} | {'retained':>13}")
+    print("-" * 58)
+    built = measure("construct", construct, args.requests)
+    shared = measure("registry", lambda: resolve(registry), args.requests)
+    print(f"\nRegistry lookup is {built / shared:.0f}x cheaper per request")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    main(parser.parse_args())
@@ -0,0 +1,94 @@
+"""
+Size of the diagnostician's evidence section: previous prompt assembly vs. the context packer.
+
+Generates random evidence sets of varying volume (doc chunks up to the
+chunk size, log lines, pattern matches, with overlapping duplicates) and
+reports the distribution of evidence tokens for both, how much doc text
+each keeps, and the packing time. Tokens are the local estimate
+(~4 chars/token); no API calls are made.
+
+Usage:
+    python scripts/bench_context_packer.py
+    python scripts/bench_context_packer.py --cases 2000 --budget 800
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.getcwd())
+from app.services.context_packer import ContextPacker, estimate_tokens
+from agents.diagnostician.agent import evidence_items
+
+WORDS = ("webhook ssl certificate handshake checkout payment gateway api key token rate limit retry "
+         "timeout endpoint merchant order sync erp inventory catalog template config migration headless "
+         "renew rotate settings advanced header signature deploy rollback cache region").split()
+
+def sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+def doc(rng, i):
+    body = " ".join(sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(2, 14)))
+    return {"id": f"doc_{i}", "content": f"Section {i}\n{body}", "score": 1 / (60 + i)}
+
+def evidence_set(rng):
+    docs = [doc(rng, i) for i in range(rng.randint(0, 5))]
+    if docs and rng.random() < 0.4:
+        docs.append({**docs[0], "id": docs[0]["id"] + "#2", "score": docs[0]["score"] / 2})  # overlapping chunk
+    # Mostly one-liners, sometimes a line carrying a whole stack trace or payload
+    logs = [f"2026-10-18T10:{i:02d}:00Z ERROR [{rng.choice(WORDS)}] "
+            f"{sentence(rng, rng.randint(300, 600) if rng.random() < 0.1 else rng.randint(6, 40))}"
+            for i in range(rng.randint(0, 8))]
+    patterns = [{"signature": f"PATTERN_{i}", "solution": sentence(rng, 8), "success_rate": rng.random()}
+                for i in range(rng.randint(0, 4))]
+    return {
+        "docs": docs,
+        "logs": {"logs_found": len(logs), "relevant_logs": logs},
+        "patterns": {"matches_found": len(patterns), "top_match": patterns[0] if patterns else None,
+                     "all_matches": patterns}
+    }
+
+def previous_section(evidence):
+    """What the prompt used to embed: top-3 docs cut to 200 chars, 3 raw log lines, the top pattern."""
+    return "\n".join([
+        json.dumps([r["content"][:200] for r in evidence["docs"][:3]]),
+        json.dumps(evidence["logs"]["relevant_logs"][:3]),
+        json.dumps(evidence["patterns"]["top_match"] or "None"),
+    ])
+
+def summary(values):
+    values = sorted(values)
+    return (f"min {values[0]:>5} | p50 {statistics.median(values):>6.0f} | "
+            f"p95 {values[int(len(values) * 0.95) - 1]:>5} | max {values[-1]:>5}")
+
+def main(args):
+    rng = random.Random(11)
+    packer = ContextPacker(budget_tokens=args.budget, weights={"patterns": 1.2, "docs": 1.0, "logs": 0.9})
+    before, after, doc_chars_before, doc_chars_after, pack_us = [], [], [], [], []
+
+    for _ in range(args.cases):
+        evidence = evidence_set(rng)
+        before.append(estimate_tokens(previous_section(evidence)))
+        doc_chars_before.append(sum(len(r["content"][:200]) for r in evidence["docs"][:3]))
+
+        start = time.perf_counter()
+        packed = packer.pack(evidence_items(evidence))
+        pack_us.append((time.perf_counter() - start) * 1e6)
+        after.append(sum(estimate_tokens(packed.render(s)) for s in ("docs", "logs", "patterns")))
+        doc_chars_after.append(sum(len(t) for t in packed.sections.get("docs", [])))
+
+    print(f"{args.cases} evidence sets, budget {args.budget} tokens\n")
+    print(f"previous tokens | {summary(before)}")
+    print(f"packed tokens   | {summary(after)}")
+    print(f"\ndoc text kept per prompt: previous {statistics.mean(doc_chars_before):.0f} chars, "
+          f"packed {statistics.mean(doc_chars_after):.0f} chars")
+    print(f"pack time: p50 {statistics.median(pack_us):.0f}us, max {max(pack_us):.0f}us")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=1000)
+    parser.add_argument("--budget", type=int, default=1200)
+    main(parser.parse_args())
@@ -0,0 +1,127 @@
+"""
+Load benchmark of the ticket read endpoints under each database profile.
+
+For every profile in --profiles an engine is built with build_engine(profile),
+the app's get_db dependency is pointed at it, and --concurrency clients hit
+GET /api/v1/tickets/ and GET /api/v1/tickets/{id} in-process (httpx
+ASGITransport, no lifespan, so no workers or warmup) for --seconds.
+Reports requests/s, latency percentiles, pool checkout waits and timeouts.
+
+Needs a reachable Postgres at DATABASE_URL (or --url); tickets for a bench
+merchant are seeded on first run. Point --pgbouncer-url at a PgBouncer in
+transaction mode to measure the "pgbouncer" profile through a real pooler.
+
+Usage:
+    python scripts/bench_db_pool.py
+    python scripts/bench_db_pool.py --profiles direct,pgbouncer --concurrency 64 --pool-size 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.append(os.getcwd())
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.core.config import get_settings
+from app.core.database import build_engine, get_db, pool_stats
+from app.core.models import Base, Merchant, Ticket
+from app.main import app
+
+BENCH_MERCHANT_ID = uuid.UUID("00000000-0000-4000-8000-00000000b0b0")
+
+async def seed(engine, tickets: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as db:
+        if await db.get(Merchant, BENCH_MERCHANT_ID) is None:
+            db.add(Merchant(id=BENCH_MERCHANT_ID, external_id="bench-merchant", tier="growth",
+                            migration_stage="in_progress"))
+            await db.commit()
+        have = (await db.execute(select(func.count()).select_from(Ticket)
+                                 .where(Ticket.merchant_id == BENCH_MERCHANT_ID))).scalar()
+        for start in range(have, tickets, 1000):
+            db.add_all([
+                Ticket(merchant_id=BENCH_MERCHANT_ID, channel="api", raw_text=f"bench ticket {i}",
+                       status="open", classification="API_ERROR", priority=5)
+                for i in range(start, min(start + 1000, tickets))
+            ])
+            await db.commit()
+        ids = (await db.execute(select(Ticket.id).where(Ticket.merchant_id == BENCH_MERCHANT_ID)
+                                .limit(5000))).scalars().all()
+    return ids
+
+async def run_profile(profile: str, url: str, ids, args):
+    engine = build_engine(profile, url=url, pool_size=args.pool_size, max_overflow=args.max_overflow)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def bench_db():
+        async with Session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = bench_db
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + args.seconds
+    rng = random.Random(5)
+
+    async def client_loop(client):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            path = ("/api/v1/tickets/?limit=20" if rng.random() < args.list_ratio
+                    else f"/api/v1/tickets/{rng.choice(ids)}")
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/api/v1/tickets/?limit=1")  # open the first connection outside the timing
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    stats = pool_stats(engine)
+    await engine.dispose()
+    app.dependency_overrides.pop(get_db, None)
+
+    latencies.sort()
+    print(f"{profile:<10} | {len(latencies) / elapsed:8.0f} | {statistics.median(latencies):7.1f}ms | "
+          f"{latencies[int(len(latencies) * 0.95) - 1]:7.1f}ms | {latencies[int(len(latencies) * 0.99) - 1]:7.1f}ms | "
+          f"{stats['wait_ms_p95'] or 0:8.2f}ms | {stats['timeouts']:>8} | {errors:>6}")
+
+async def main(args):
+    url = args.url or get_settings().DATABASE_URL
+    seed_engine = build_engine("direct", url=url)
+    ids = await seed(seed_engine, args.tickets)
+    await seed_engine.dispose()
+
+    print(f"{args.concurrency} clients, pool {args.pool_size}+{args.max_overflow}, {args.seconds}s per profile, "
+          f"{args.list_ratio:.0%} list / {1 - args.list_ratio:.0%} get-by-id\n")
+    print(f"{'profile':<10} | {'req/s':>8} | {'p50':>9} | {'p95':>9} | {'p99':>9} | {'pool wait p95':>10} | "
+          f"{'timeouts':>8} | {'errors':>6}")
+    print("-" * 96)
+    for profile in args.profiles.split(","):
+        profile_url = args.pgbouncer_url if profile == "pgbouncer" and args.pgbouncer_url else url
+        await run_profile(profile, profile_url, ids, args)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", default="pgbouncer,direct")
+    parser.add_argument("--url", default=None, help="Database URL (defaults to DATABASE_URL)")
+    parser.add_argument("--pgbouncer-url", default=None, help="URL through PgBouncer for the pgbouncer profile")
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--max-overflow", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--list-ratio", type=float, default=0.3)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,140 @@
+"""
+Benchmark the local first-tier classifier.
+
+Reports, per tier, the fraction of tickets resolved locally, the accuracy of
+those answers and the latency per ticket. Tickets come from the tickets table
+(--source db) or a labelled synthetic set (default); synthetic tickets are
+templated, so accuracy there is optimistic. The Gemini tier is only
+timed when --llm-sample > 0, since it needs an API key and network.
+
+Usage:
+    python scripts/bench_local_classifier.py
+    python scripts/bench_local_classifier.py --tickets 20000 --threshold 0.8
+    python scripts/bench_local_classifier.py --source db --llm-sample 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from app.services.local_classifier import LocalClassifier, train_model
+
+TEMPLATES = {
+    "CHECKOUT_BREAK": [
+        "The checkout page is blank after the {change}",
+        "Customers can't pay, the payment step spins forever since the {change}",
+        "Cart total shows {n} but order fails at checkout",
+        "Buy button does nothing on mobile after the {change}",
+    ],
+    "WEBHOOK_FAIL": [
+        "Orders are not syncing to our ERP, the webhook logs show timeout",
+        "order.created webhook retried {n} times then gave up",
+        "We stopped receiving events at our endpoint after the {change}",
+        "Signature verification fails for every webhook delivery",
+    ],
+    "DOCS_CONFUSION": [
+        "How to reset my secret key in the dashboard?",
+        "Where is the documentation for bulk product import?",
+        "Is there a guide for migrating {n} SKUs from the old catalog?",
+        "Which page explains the difference between live and test mode?",
+    ],
+    "CONFIG_ERROR": [
+        "Rate limit headers are missing from response after the {change}",
+        "Redirect URL is wrong in production settings",
+        "CORS blocks our storefront domain since the {change}",
+        "Environment variables for the tax service were not applied",
+    ],
+    "API_ERROR": [
+        "POST /v1/cart returns 500 error when sending skus array",
+        "GET /v1/products returns 401 with a valid token",
+        "Inventory endpoint times out for {n} items",
+        "Bulk update responds with 422 for valid payload since the {change}",
+    ],
+}
+
+# Tickets too vague for any tier but Gemini (labelled at random)
+VAGUE = [
+    "Something is broken since the {change}, please help",
+    "Our store behaves strangely after the {change}",
+    "Lots of customer complaints today, not sure why",
+]
+
+def synthetic(n, seed=7, vague=0.1):
+    rng = random.Random(seed)
+    changes = ["latest migration", "v2 upgrade", "deploy yesterday", "theme update", "plugin install"]
+    rows = []
+    for _ in range(n):
+        category = rng.choice(list(TEMPLATES))
+        template = rng.choice(VAGUE if rng.random() < vague else TEMPLATES[category])
+        text = template.format(change=rng.choice(changes), n=rng.randint(2, 5000))
+        if rng.random() < 0.5:
+            text = rng.choice(["Urgent: ", "Hi team, ", "", "Merchant #%d: " % rng.randint(1, 999)]) + text
+        rows.append((text, category))
+    return [r[0] for r in rows], [r[1] for r in rows]
+
+async def from_db():
+    from app.core.database import AsyncSessionLocal, engine
+    from app.services.local_classifier import load_training_data
+    async with AsyncSessionLocal() as session:
+        data = await load_training_data(session)
+    await engine.dispose()
+    return data
+
+def evaluate(label, clf, texts, labels):
+    start = time.perf_counter()
+    results = clf.predict_batch(texts)
+    elapsed = time.perf_counter() - start
+    resolved = [(r, y) for r, y in zip(results, labels) if r is not None]
+    correct = sum(r["category"] == y for r, y in resolved)
+    print(f"{label:<22} | {len(resolved) / len(texts):8.1%} | "
+          f"{(correct / len(resolved)) if resolved else 0:8.1%} | {elapsed / len(texts) * 1e6:10.1f}us")
+    return results
+
+async def time_llm(texts):
+    from app.services.classifier import TicketClassifier
+    classifier = TicketClassifier()
+    start = time.perf_counter()
+    for text in texts:
+        await classifier.classify_with_llm(text)
+    return (time.perf_counter() - start) / len(texts)
+
+def main(args):
+    texts, labels = asyncio.run(from_db()) if args.source == "db" else synthetic(args.tickets)
+    split = int(len(texts) * 0.8)
+    train_x, train_y, test_x, test_y = texts[:split], labels[:split], texts[split:], labels[split:]
+    print(f"{len(train_x)} training / {len(test_x)} evaluation tickets, threshold {args.threshold}\n")
+
+    print(f"{'tier':<22} | {'local':>8} | {'correct':>8} | {'per ticket':>12}")
+    print("-" * 62)
+    evaluate("no model", LocalClassifier(None, args.threshold), test_x, test_y)
+
+    start = time.perf_counter()
+    model = train_model(train_x, train_y)
+    train_s = time.perf_counter() - start
+    results = evaluate("tf-idf model + rules", LocalClassifier(model, args.threshold), test_x, test_y)
+
+    single = LocalClassifier(model, args.threshold)
+    start = time.perf_counter()
+    for text in test_x[:1000]:
+        single.predict(text)
+    print(f"{'  (one at a time)':<22} | {'':>8} | {'':>8} | "
+          f"{(time.perf_counter() - start) / min(len(test_x), 1000) * 1e6:10.1f}us")
+    print(f"\nModel trained in {train_s:.2f}s")
+
+    escalated = [t for t, r in zip(test_x, results) if r is None]
+    print(f"Escalated to Gemini: {len(escalated)}/{len(test_x)}")
+    if args.llm_sample and escalated:
+        per = asyncio.run(time_llm(escalated[:args.llm_sample]))
+        print(f"Gemini tier: {per * 1000:.0f}ms per ticket ({min(args.llm_sample, len(escalated))} sampled)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", choices=["synthetic", "db"], default="synthetic")
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--llm-sample", type=int, default=0, help="Escalated tickets to time against Gemini")
+    main(parser.parse_args())
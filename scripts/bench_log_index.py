@@ -0,0 +1,139 @@
+"""
+Benchmark the log index on a growing synthetic log corpus.
+
+Appends plain-text and JSONL logs in steps (e.g. 64MB -> 256MB -> 1GB) at a
+fixed simulated rate, indexes only what each step added, and reports
+indexing throughput, index size and the latency of ticket-style queries over
+the last hour. A naive full scan is timed for comparison up to
+--naive-max-mb. Logs are written to a temporary directory and removed
+afterwards unless --keep is given.
+
+Usage:
+    python scripts/bench_log_index.py
+    python scripts/bench_log_index.py --sizes-mb 32,128 --keep /tmp/hermes-logs
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.getcwd())
+from app.services.log_index import LogIndex
+
+SERVICES = ["checkout", "cart", "webhook-dispatcher", "catalog", "payments", "auth", "inventory"]
+INFO = ["request completed in {ms}ms", "cache hit for key {id}", "GET /v1/products 200",
+        "worker heartbeat ok", "POST /v1/cart 201", "synced {n} orders"]
+ERRORS = ["SSLHandshakeError connecting to merchant webhook {host}", "POST /v1/cart returned 500 for skus payload",
+          "Timeout after {ms}ms calling payment provider", "401 Unauthorized: API key revoked for merchant {n}",
+          "RateLimitExceeded for merchant {n} (429)", "Failed to render checkout template: KeyError 'tax'",
+          "Connection refused by ERP endpoint {host}", "Warning: inventory drift of {n} units detected"]
+LINES_PER_MIN = 3000
+
+def render(rng, templates):
+    return rng.choice(templates).format(ms=rng.randint(5, 30000), id=f"{rng.getrandbits(48):x}",
+                                        n=rng.randint(1, 9999), host=f"erp{rng.randint(1, 50)}.example.com")
+
+def append_logs(directory, target_bytes, state, rng):
+    """Append lines until the corpus reaches target_bytes; timestamps advance at LINES_PER_MIN."""
+    with open(os.path.join(directory, "app.log"), "a") as plain, \
+         open(os.path.join(directory, "events.jsonl"), "a") as structured:
+        while state["bytes"] < target_bytes:
+            state["ts"] += 60 / LINES_PER_MIN
+            is_error = rng.random() < 0.08
+            service = rng.choice(SERVICES)
+            message = render(rng, ERRORS if is_error else INFO)
+            level = ("WARN" if message.startswith("Warning") else "ERROR") if is_error else "INFO"
+            stamp = datetime.fromtimestamp(state["ts"], timezone.utc).isoformat()
+            if rng.random() < 0.5:
+                line = f"{stamp} {level} [{service}] {message}\n"
+                plain.write(line)
+            else:
+                line = json.dumps({"ts": stamp, "level": level, "service": service, "message": message}) + "\n"
+                structured.write(line)
+            state["bytes"] += len(line)
+
+def naive_search(directory, keywords, start, end):
+    hits = 0
+    for name in os.listdir(directory):
+        with open(os.path.join(directory, name), "r") as fh:
+            for line in fh:
+                lower = line.lower()
+                if any(k in lower for k in keywords):
+                    ts = line[:32].lstrip('{"ts": ').split(" ")[0].rstrip('",')
+                    try:
+                        t = datetime.fromisoformat(ts).timestamp()
+                    except ValueError:
+                        continue
+                    if start <= t <= end:
+                        hits += 1
+    return hits
+
+QUERIES = [
+    ["API_ERROR", "error", "fail", "POST /v1/cart returns 500 when sending skus"],
+    ["WEBHOOK_FAIL", "error", "fail", "Orders not syncing to ERP, webhook SSL handshake errors"],
+    ["CHECKOUT_BREAK", "error", "fail", "checkout page blank, KeyError in template"],
+    ["API_ERROR", "error", "fail", "getting 401 unauthorized with a valid api key"],
+]
+
+def main(args):
+    directory = args.keep or tempfile.mkdtemp(prefix="hermes-logs-")
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(3)
+    state = {"bytes": 0, "ts": time.time() - 7 * 86400}
+    # The synthetic logs start a week back; the index's clock follows the newest line written
+    index = LogIndex(directory, bucket_s=300, retention_s=args.retention_h * 3600, max_postings=args.max_postings,
+                     clock=lambda: state["ts"])
+
+    print(f"{'corpus':>8} | {'index step':>10} | {'MB/s':>6} | {'postings':>9} | {'~index MB':>9} | "
+          f"{'query':>8} | {'naive scan':>10}")
+    print("-" * 82)
+    try:
+        for size_mb in [int(s) for s in args.sizes_mb.split(",")]:
+            before = state["bytes"]
+            append_logs(directory, size_mb * 1024 * 1024, state, rng)
+
+            start = time.perf_counter()
+            index.refresh()
+            step_s = time.perf_counter() - start
+            added_mb = (state["bytes"] - before) / 1024 / 1024
+
+            window_end = state["ts"]
+            window_start = window_end - 3600
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for q in QUERIES:
+                    result = index.search(q, start=window_start, end=window_end)
+            query_ms = (time.perf_counter() - start) / (args.repeat * len(QUERIES)) * 1000
+            assert result["relevant_logs"], "query found nothing"
+
+            naive = "-"
+            if size_mb <= args.naive_max_mb:
+                start = time.perf_counter()
+                naive_search(directory, ["500", "cart"], window_start, window_end)
+                naive = f"{(time.perf_counter() - start) * 1000:8.0f}ms"
+
+            stats = index.stats()
+            # 16 bytes per posting plus ~120 bytes of dict/array overhead per token list
+            approx_mb = (stats["postings"] * 16 + stats["token_lists"] * 120) / 1024 / 1024
+            print(f"{size_mb:>6}MB | {step_s:>9.1f}s | {added_mb / step_s:6.1f} | {stats['postings']:>9} | "
+                  f"{approx_mb:>9.1f} | {query_ms:>6.2f}ms | {naive:>10}")
+
+        print(f"\nSample result: {json.dumps(result['relevant_logs'][0])[:120]}")
+    finally:
+        if not args.keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes-mb", default="64,256,1024")
+    parser.add_argument("--retention-h", type=float, default=24)
+    parser.add_argument("--max-postings", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--naive-max-mb", type=int, default=256)
+    parser.add_argument("--keep", default=None, help="Write logs to this directory and keep them")
+    main(parser.parse_args())
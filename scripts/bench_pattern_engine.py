@@ -0,0 +1,80 @@
+"""
+Match latency of the pattern engine vs. a re.search loop over every pattern.
+
+Generates a synthetic pattern library shaped like the built-in ones
+("<component>.*<code>") plus some with no usable literal, and times both
+approaches per ticket. No database needed.
+
+Usage:
+    python scripts/bench_pattern_engine.py
+    python scripts/bench_pattern_engine.py --patterns 10000 --tickets 2000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.getcwd())
+from app.services.pattern_engine import PatternMatcher, compile_pattern
+
+WORDS = ["ssl", "webhook", "checkout", "cart", "payment", "inventory", "tax", "shipping",
+         "oauth", "token", "graphql", "catalog", "refund", "invoice", "storefront", "cdn"]
+CODES = ["400", "401", "403", "404", "409", "422", "429", "500", "502", "503", "504"]
+
+def synthetic_patterns(n, rng):
+    rows = []
+    for i in range(n):
+        if i % 50 == 0:
+            regex = rf"(?:{rng.choice(CODES)}|{rng.choice(CODES)})\s*(?:ms|s)\b"  # no required literal
+        else:
+            regex = rf"{rng.choice(WORDS)}[_-]?{rng.choice(WORDS)}{i}.*{rng.choice(CODES)}"
+        rows.append({"id": None, "error_signature": f"PAT_{i}", "error_regex": regex,
+                     "solution_template": "fix", "success_rate": rng.random()})
+    return rows
+
+def synthetic_tickets(n, rng, rows):
+    """Half the tickets mention a pattern's components, usually with its status code."""
+    tickets = []
+    for _ in range(n):
+        words = rng.choices(WORDS, k=20)
+        code = rng.choice(CODES)
+        if rng.random() < 0.5:
+            regex = rng.choice(rows)["error_regex"]
+            m = re.match(r"(\w+)\[_-\]\?(\w+)\.\*(\d+)$", regex)
+            if m:
+                words.insert(5, f"{m.group(1)}-{m.group(2)}")
+                code = m.group(3) if rng.random() < 0.8 else code
+        tickets.append(f"Merchant reports {' '.join(words)} failing with {code} after deploy")
+    return tickets
+
+def main(args):
+    rng = random.Random(1)
+    start = time.perf_counter()
+    rows = synthetic_patterns(args.patterns, rng)
+    compiled = [p for p in map(compile_pattern, rows) if p]
+    matcher = PatternMatcher(compiled)
+    print(f"Compiled {len(compiled)} patterns in {time.perf_counter() - start:.2f}s "
+          f"({len(matcher.always)} without a literal)\n")
+    tickets = synthetic_tickets(args.tickets, rng, rows)
+
+    start = time.perf_counter()
+    naive = [[p.signature for p in compiled if p.regex.search(t)] for t in tickets]
+    naive_s = (time.perf_counter() - start) / len(tickets)
+
+    start = time.perf_counter()
+    fast = [[p.signature for p in matcher.match(t)] for t in tickets]
+    fast_s = (time.perf_counter() - start) / len(tickets)
+
+    assert all(sorted(a) == sorted(b) for a, b in zip(naive, fast)), "matchers disagree"
+    avg_hits = sum(map(len, fast)) / len(fast)
+    print(f"{'re.search loop':<16} | {naive_s * 1000:8.3f}ms per ticket")
+    print(f"{'pattern engine':<16} | {fast_s * 1000:8.3f}ms per ticket ({avg_hits:.1f} matches avg)")
+    print(f"\nSpeed-up: {naive_s / fast_s:.0f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patterns", type=int, default=5000)
+    parser.add_argument("--tickets", type=int, default=500)
+    main(parser.parse_args())
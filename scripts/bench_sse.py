@@ -0,0 +1,106 @@
+"""
+Broadcast latency and memory of the SSE event bus with many subscribers.
+
+--subscribers clients each consume GET /api/v1/events/stream in-process
+(the endpoint's own frame generator, no HTTP server), while --events
+ticket updates are published at --rate per second. Reports publish (fan-out)
+cost, delivery latency percentiles from publish() to the client reading the
+frame, memory per subscriber, and how many --slow clients (reading with a
+delay) were shed. No database needed: LISTEN/NOTIFY is turned off.
+
+Usage:
+    python scripts/bench_sse.py
+    python scripts/bench_sse.py --subscribers 1000 --events 500 --rate 200 --slow 0.02
+"""
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.getcwd())
+os.environ.setdefault("SSE_NOTIFY_ENABLED", "false")
+from app.api.v1.events import stream_events
+from app.services.event_bus import get_event_bus
+
+def percentile(values, q):
+    return values[max(int(len(values) * q) - 1, 0)] if values else float("nan")
+
+async def consume(frames, sent_at, latencies, slow_s: float):
+    async for chunk in frames:
+        now = time.perf_counter()
+        for frame in chunk.split(b"\n\n"):
+            if frame.startswith(b"id: "):
+                seq = int(frame[4:frame.index(b"\n")].rsplit(b"-", 1)[1])
+                latencies.append((now - sent_at[seq]) * 1000)
+        if slow_s:
+            await asyncio.sleep(slow_s)
+
+async def main(args):
+    bus = get_event_bus()
+    ticket = {"id": "00000000-0000-4000-8000-000000000000", "status": "classified", "classification": "API_ERROR",
+              "priority": 5, "confidence": 0.9, "raw_text": "checkout returns 500 after migration " * 8}
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    streams = []
+    for _ in range(args.subscribers):
+        response = await stream_events(None, None)
+        streams.append(response.body_iterator)
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / args.subscribers
+    tracemalloc.stop()  # too slow to leave on while publishing; the backlog is measured directly below
+
+    sent_at, latencies = {}, []
+    slow_every = int(1 / args.slow) if args.slow else 0
+    consumers = [
+        asyncio.create_task(consume(frames, sent_at, latencies,
+                                    args.slow_delay if slow_every and i % slow_every == 0 else 0.0))
+        for i, frames in enumerate(streams)
+    ]
+    await asyncio.sleep(0.1)  # let every client reach its first wait
+
+    publish_ms, peak_backlog = [], 0
+    interval = 1 / args.rate
+    started = time.perf_counter()
+    for n in range(args.events):
+        start = time.perf_counter()
+        sent_at[bus._seq + 1] = start
+        bus.publish("ticket_update", {**ticket, "priority": n % 10})
+        publish_ms.append((time.perf_counter() - start) * 1000)
+        if n % 10 == 0:
+            # Frames are shared between clients, so count each buffered frame's bytes once
+            queued = {id(f): len(f) for s in bus.subscribers for f in s.frames}
+            peak_backlog = max(peak_backlog, sum(queued.values()))
+        await asyncio.sleep(max(0.0, started + (n + 1) * interval - time.perf_counter()))
+    await asyncio.sleep(1.0)  # drain
+    elapsed = time.perf_counter() - started
+
+    stats = bus.stats()
+    bus.close()
+    await asyncio.gather(*consumers, return_exceptions=True)
+
+    latencies.sort()
+    publish_ms.sort()
+    expected = args.events * (args.subscribers - stats["shed"])
+    print(f"{args.subscribers} subscribers, {args.events} events at {args.rate}/s "
+          f"({elapsed:.1f}s), {args.slow:.0%} slow clients\n")
+    print(f"publish (fan-out)     p50 {statistics.median(publish_ms):.3f}ms  p99 {percentile(publish_ms, 0.99):.3f}ms")
+    print(f"delivery latency      p50 {statistics.median(latencies):.2f}ms  p95 {percentile(latencies, 0.95):.2f}ms  "
+          f"p99 {percentile(latencies, 0.99):.2f}ms  max {latencies[-1]:.2f}ms")
+    print(f"frames delivered      {len(latencies)} (>= {expected} expected from non-shed clients)")
+    print(f"memory                {per_subscriber / 1024:.1f}KB per idle subscriber, "
+          f"peak {peak_backlog / 1024:.0f}KB of queued frames, "
+          f"RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f}MB")
+    print(f"shed slow consumers   {stats['shed']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=300)
+    parser.add_argument("--rate", type=float, default=100, help="Events published per second")
+    parser.add_argument("--slow", type=float, default=0.0, help="Fraction of clients that read slowly")
+    parser.add_argument("--slow-delay", type=float, default=3.0, help="Seconds a slow client pauses per read")
+    asyncio.run(main(parser.parse_args()))
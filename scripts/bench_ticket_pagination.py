@@ -0,0 +1,117 @@
+"""
+Page latency of GET /api/v1/tickets queries: OFFSET vs keyset, full vs summary view.
+
+Seeds --tickets rows (default 1M, ~1KB raw_text each) for a bench merchant
+with one INSERT .. SELECT generate_series, then times the statements built
+by ticket_page_query at increasing page depths, unfiltered and filtered by
+status. The keyset cursor for a depth is fetched once outside the timing.
+Run scripts/migrate_ticket_indexes.py first to measure with the indexes;
+--drop-indexes measures without them.
+
+Usage:
+    python scripts/bench_ticket_pagination.py
+    python scripts/bench_ticket_pagination.py --tickets 200000 --depths 1,10,100,1000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.append(os.getcwd())
+from sqlalchemy import func, select, text
+from app.api.v1.tickets import encode_cursor, ticket_page_query
+from app.core.database import build_engine
+from app.core.models import Base, Merchant, Ticket
+
+BENCH_MERCHANT_ID = uuid.UUID("00000000-0000-4000-8000-00000000b0b0")
+
+SEED_SQL = """
+INSERT INTO tickets (id, merchant_id, channel, raw_text, classification, classification_confidence,
+                     priority, status, assigned_agent, created_at)
+SELECT gen_random_uuid(), :merchant, 'api',
+       'Bench ticket ' || g || ': ' || repeat('checkout returns 500 after migration, payload attached. ', 18),
+       (ARRAY['API_ERROR','CONFIG_ERROR','WEBHOOK_FAIL','CHECKOUT_BREAK','DOCS_CONFUSION'])[1 + g % 5],
+       0.9, 1 + g % 10,
+       (ARRAY['open','analyzing','diagnosed','resolved','resolved','resolved'])[1 + g % 6],
+       'pending',
+       now() - (g || ' seconds')::interval
+FROM generate_series(:start, :stop) AS g
+"""
+
+async def seed(conn, tickets: int):
+    await conn.run_sync(Base.metadata.create_all)
+    if (await conn.execute(select(Merchant.id).where(Merchant.id == BENCH_MERCHANT_ID))).first() is None:
+        await conn.execute(Merchant.__table__.insert().values(
+            id=BENCH_MERCHANT_ID, external_id="bench-merchant", tier="growth", migration_stage="in_progress"))
+    have = (await conn.execute(select(func.count()).select_from(Ticket))).scalar()
+    if have < tickets:
+        print(f"Seeding {tickets - have} tickets...")
+        start = time.perf_counter()
+        for low in range(have, tickets, 100_000):
+            await conn.execute(text(SEED_SQL), {"merchant": BENCH_MERCHANT_ID, "start": low + 1,
+                                                "stop": min(low + 100_000, tickets)})
+        await conn.execute(text("ANALYZE tickets"))
+        print(f"Seeded in {time.perf_counter() - start:.0f}s")
+    return max(have, tickets)
+
+async def timed(conn, query, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        (await conn.execute(query)).all()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+async def main(args):
+    engine = build_engine("direct")
+    try:
+        async with engine.begin() as conn:
+            total = await seed(conn, args.tickets)
+            if args.drop_indexes:
+                for index in Ticket.__table__.indexes:
+                    await conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+            present = (await conn.execute(text(
+                "SELECT count(*) FROM pg_indexes WHERE tablename = 'tickets' AND indexname LIKE 'ix_tickets_%'"
+            ))).scalar()
+
+        print(f"\n{total} tickets, page size {args.limit}, {present} pagination indexes present, "
+              f"median of {args.repeat}\n")
+        print(f"{'filter':<14} | {'page':>6} | {'offset full':>11} | {'offset summ':>11} | "
+              f"{'keyset full':>11} | {'keyset summ':>11}")
+        print("-" * 80)
+        async with engine.connect() as conn:
+            for status in (None, "open"):
+                for depth in [int(d) for d in args.depths.split(",")]:
+                    skip = (depth - 1) * args.limit
+                    # Cursor = last row of the previous page
+                    anchor = None
+                    if skip:
+                        anchor = (await conn.execute(
+                            ticket_page_query(1, skip=skip - 1, view="summary", status_filter=status)
+                        )).first()
+                        if anchor is None:
+                            continue
+                    cursor = encode_cursor(anchor.created_at, anchor.id) if anchor else None
+
+                    row = []
+                    for mode in ("offset", "keyset"):
+                        for view in ("full", "summary"):
+                            query = ticket_page_query(args.limit, cursor=cursor if mode == "keyset" else None,
+                                                      skip=skip if mode == "offset" else 0,
+                                                      view=view, status_filter=status)
+                            row.append(await timed(conn, query, args.repeat))
+                    print(f"{status or 'none':<14} | {depth:>6} | " + " | ".join(f"{ms:9.2f}ms" for ms in row))
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--depths", default="1,10,100,1000,5000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--drop-indexes", action="store_true", help="Measure without the pagination indexes")
+    asyncio.run(main(parser.parse_args()))
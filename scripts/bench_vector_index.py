@@ -0,0 +1,76 @@
+"""
+Benchmark RAG query latency: pure-Python cosine scan vs the NumPy VectorIndex.
+
+Usage:
+    python scripts/bench_vector_index.py
+    python scripts/bench_vector_index.py --sizes 10000,100000,1000000 --queries 50
+
+1M x 768 float32 needs ~3GB of RAM for the matrix alone.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.getcwd())
+from app.services.vector_index import VectorIndex
+
+def python_cosine(vec1, vec2):
+    dot_product = sum(a * b for a, b in zip(vec1, vec2))
+    magnitude1 = sum(a * a for a in vec1) ** 0.5
+    magnitude2 = sum(b * b for b in vec2) ** 0.5
+    return dot_product / (magnitude1 * magnitude2)
+
+def bench_python(rows, queries, top_k):
+    start = time.perf_counter()
+    for q in queries:
+        scored = [(python_cosine(q, r), i) for i, r in enumerate(rows)]
+        scored.sort(reverse=True, key=lambda x: x[0])
+        scored[:top_k]
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+def bench_index(index, queries, top_k):
+    index.search(queries[0], top_k)  # warm-up
+    start = time.perf_counter()
+    for q in queries:
+        index.search(q, top_k)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--python-max", type=int, default=10000,
+                        help="Skip the pure-Python baseline above this corpus size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+    print(f"{'chunks':>10} | {'python ms/q':>12} | {'numpy ms/q':>11} | {'build s':>8} | {'matrix MB':>9}")
+    print("-" * 62)
+    for size in [int(s) for s in args.sizes.split(",")]:
+        matrix = rng.standard_normal((size, args.dim), dtype=np.float32)
+
+        start = time.perf_counter()
+        index = VectorIndex.from_matrix(matrix, copy=False)
+        build_s = time.perf_counter() - start
+        del matrix
+
+        numpy_ms = bench_index(index, queries, args.top_k)
+
+        if size <= args.python_max:
+            rows = index.matrix.tolist()
+            python_ms = f"{bench_python(rows, queries[:3].tolist(), args.top_k):12.1f}"
+            del rows
+        else:
+            python_ms = f"{'skipped':>12}"
+
+        print(f"{size:>10} | {python_ms} | {numpy_ms:11.2f} | {build_s:8.2f} | {index.matrix.nbytes / 1e6:9.0f}")
+        del index
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Build the shared pgvector documentation corpus.
+
+Chunks and embeds data/docs, replaces the rows in `documentation_chunks`
+and (re)builds the ANN index. Run once per docs change, then set
+RAG_BACKEND=pgvector so every API worker queries the same table.
+
+Usage:
+    python scripts/build_doc_index.py
+    python scripts/build_doc_index.py --index ivfflat --lists 100
+    python scripts/build_doc_index.py --index-only
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+# Fix for Windows Event Loop
+if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+from sqlalchemy import text
+from app.core.config import get_settings
+from app.core.database import engine
+from app.core.models import Base
+from app.services.pgvector_store import PgVectorStore
+from app.services.rag_engine import iter_doc_chunks, embed_chunks
+
+async def build(args):
+    store = PgVectorStore()
+
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.run_sync(Base.metadata.create_all)
+
+    if not args.index_only:
+        start = time.perf_counter()
+        chunks = await embed_chunks(iter_doc_chunks(args.docs_path))
+        embedded = sum(1 for c in chunks if c["embedding"] is not None)
+        print(f"📄 Chunked and embedded {embedded}/{len(chunks)} chunks in {time.perf_counter() - start:.1f}s")
+
+        written = await store.replace_corpus(chunks)
+        print(f"💾 Wrote {written} rows to documentation_chunks")
+
+    start = time.perf_counter()
+    await store.build_index(args.index, lists=args.lists, m=args.m, ef_construction=args.ef_construction)
+    print(f"✅ Built {args.index} index in {time.perf_counter() - start:.1f}s")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Build the pgvector documentation index")
+    parser.add_argument("--docs-path", default="./data/docs")
+    parser.add_argument("--index", choices=["hnsw", "ivfflat"], default=settings.RAG_ANN_INDEX)
+    parser.add_argument("--lists", type=int, default=None, help="IVFFlat lists (default rows/1000)")
+    parser.add_argument("--m", type=int, default=16, help="HNSW max connections per layer")
+    parser.add_argument("--ef-construction", type=int, default=64, help="HNSW build candidate list size")
+    parser.add_argument("--index-only", action="store_true", help="Skip re-ingest, only rebuild the index")
+    asyncio.run(build(parser.parse_args()))
@@ -0,0 +1,60 @@
+"""
+Create the tickets pagination indexes declared on app.core.models.Ticket on an
+existing database.
+
+Indexes are built with CREATE INDEX CONCURRENTLY, so the table keeps taking
+reads and writes while they build. A build that was interrupted leaves an
+INVALID index behind; it is dropped and rebuilt. Safe to re-run.
+
+Usage:
+    python scripts/migrate_ticket_indexes.py
+    python scripts/migrate_ticket_indexes.py --dry-run
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+from app.core.database import build_engine
+from app.core.models import Ticket
+
+def index_statements():
+    for index in sorted(Ticket.__table__.indexes, key=lambda ix: ix.name):
+        ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+        yield index.name, ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY IF NOT EXISTS", 1)
+
+async def migrate(dry_run: bool):
+    if dry_run:
+        for _, ddl in index_statements():
+            print(ddl)
+        return
+
+    # CONCURRENTLY can't run inside a transaction block
+    engine = build_engine("direct", isolation_level="AUTOCOMMIT")
+    try:
+        async with engine.connect() as conn:
+            for name, ddl in index_statements():
+                print(f"🔨 {ddl}")
+                valid = (await conn.execute(text(
+                    "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+                ), {"name": name})).scalar()
+                if valid is False:
+                    print(f"⚠️ {name} is INVALID (interrupted build); dropping it first")
+                    await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                start = time.perf_counter()
+                await conn.execute(text(ddl))
+                print(f"✅ {name} ready ({time.perf_counter() - start:.1f}s)")
+            await conn.execute(text("ANALYZE tickets"))
+            print("✅ tickets analyzed")
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true", help="Print the statements without running them")
+    asyncio.run(migrate(parser.parse_args().dry_run))
@@ -0,0 +1,35 @@
+"""
+Seed the patterns table with the built-in pattern library.
+
+Inserts each DEFAULT_PATTERNS entry whose error_signature isn't in the table
+yet; running API workers pick the rows up on their next pattern refresh.
+
+Usage:
+    python scripts/seed_patterns.py
+"""
+import sys
+import os
+sys.path.append(os.getcwd())
+import asyncio
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal, engine
+from app.core.models import Pattern
+from app.services.pattern_engine import DEFAULT_PATTERNS
+
+async def seed():
+    async with AsyncSessionLocal() as db:
+        try:
+            existing = set((await db.execute(select(Pattern.error_signature))).scalars().all())
+            new = [Pattern(**p) for p in DEFAULT_PATTERNS if p["error_signature"] not in existing]
+            db.add_all(new)
+            await db.commit()
+            print(f"✅ Seeded {len(new)} patterns ({len(existing)} already present).")
+        except Exception as e:
+            print(f"❌ Seed failed: {e}")
+            await db.rollback()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(seed())
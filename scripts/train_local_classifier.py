@@ -0,0 +1,67 @@
+"""
+Train the local first-tier ticket classifier from the tickets table.
+
+Fits TF-IDF + logistic regression on tickets already classified with
+confidence >= --min-confidence, reports held-out accuracy and how many
+held-out tickets would resolve locally, then saves the model to
+LOCAL_CLASSIFIER_MODEL_PATH for the API to load at startup.
+
+Usage:
+    python scripts/train_local_classifier.py
+    python scripts/train_local_classifier.py --min-confidence 0.9 --holdout 0.3
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+# Fix for Windows Event Loop
+if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal, engine
+from app.services.local_classifier import (
+    LocalClassifier, load_training_data, save_model, train_model
+)
+
+async def main(args):
+    async with AsyncSessionLocal() as session:
+        texts, labels = await load_training_data(session, args.min_confidence)
+    await engine.dispose()
+
+    print(f"📄 Loaded {len(texts)} classified tickets")
+    if len(texts) < args.min_samples:
+        print(f"⚠️ Need at least {args.min_samples} tickets to train; every ticket keeps going to Gemini")
+        return
+
+    from sklearn.model_selection import train_test_split
+    stratify = labels if min(labels.count(c) for c in set(labels)) >= 2 else None
+    x_train, x_test, y_train, y_test = train_test_split(
+        texts, labels, test_size=args.holdout, random_state=42, stratify=stratify
+    )
+
+    model = train_model(x_train, y_train)
+    accuracy = model.score(x_test, y_test)
+    local = LocalClassifier(model, min_confidence=args.threshold).predict_batch(x_test)
+    resolved = [(r, y) for r, y in zip(local, y_test) if r is not None]
+    local_acc = sum(r["category"] == y for r, y in resolved) / len(resolved) if resolved else 0.0
+    print(f"🎯 Held-out accuracy {accuracy:.3f}; "
+          f"{len(resolved)}/{len(y_test)} resolved locally at >= {args.threshold} ({local_acc:.3f} correct)")
+
+    # Final model uses every labelled ticket
+    model = train_model(texts, labels)
+    save_model(model, args.output)
+    print(f"✅ Saved model to {args.output}")
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Train the local ticket classifier")
+    parser.add_argument("--output", default=settings.LOCAL_CLASSIFIER_MODEL_PATH)
+    parser.add_argument("--min-confidence", type=float, default=0.8, help="Minimum label confidence to train on")
+    parser.add_argument("--threshold", type=float, default=settings.LOCAL_CLASSIFIER_MIN_CONFIDENCE)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--min-samples", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))